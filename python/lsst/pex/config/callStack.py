@@ -20,8 +20,10 @@
 # see <https://www.lsstcorp.org/LegalNotices/>.
 #
 
-__all__ = ['getCallerFrame', 'getStackFrame', 'StackFrame', 'getCallStack']
+__all__ = ['getCallerFrame', 'getStackFrame', 'StackFrame', 'LazyCallStack', 'getCallStack']
 
+import collections.abc
+import functools
 import inspect
 import linecache
 
@@ -91,11 +93,18 @@ class StackFrame:
     stack trace by the fact that it does not look up the source code until it
     is absolutely necessary, reducing the I/O.
 
+    The same lines of code (a ``setDefaults`` method, for example) appear in
+    the history of many configs, so the `StackFrame` instances made by
+    `fromFrame`, `fromCode` and `intern` are shared: they must be treated as
+    read-only.
+
     See also
     --------
     getStackFrame
     """
 
+    __slots__ = ("filename", "lineno", "function", "_content")
+
     _STRIP = "/python/lsst/"
     """String to strip from the ``filename`` in the constructor."""
 
@@ -138,10 +147,52 @@ class StackFrame:
         >>> import inspect
         >>> stackFrame = StackFrame.fromFrame(inspect.currentframe())
         """
-        filename = frame.f_code.co_filename
-        lineno = frame.f_lineno
-        function = frame.f_code.co_name
-        return cls(filename, lineno, function)
+        return cls.fromCode(frame.f_code, frame.f_lineno)
+
+    @classmethod
+    def intern(cls, filename, lineno, function):
+        """Get a shared instance for a given location in the code.
+
+        Parameters
+        ----------
+        filename : `str`
+            Name of file containing the code being executed.
+        lineno : `int`
+            Line number of file being executed.
+        function : `str`
+            Function name being executed.
+
+        Returns
+        -------
+        stackFrame : `StackFrame`
+            A `StackFrame` instance, which is the same object for every call
+            with the same arguments while it remains in the (bounded) cache.
+        """
+        return _internStackFrame(cls, filename, lineno, function)
+
+    @classmethod
+    def fromCode(cls, code, lineno):
+        """Construct from a code object and line number.
+
+        Parameters
+        ----------
+        code : `types.CodeType`
+            Code object being executed, such as ``frame.f_code``.
+        lineno : `int`
+            Line number being executed.
+
+        Returns
+        -------
+        stackFrame : `StackFrame`
+            A `StackFrame` instance.
+        """
+        return cls.intern(code.co_filename, lineno, code.co_name)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
 
     def __repr__(self):
         return "%s(%s, %s, %s)" % (self.__class__.__name__, self.filename, self.lineno, self.function)
@@ -166,27 +217,134 @@ class StackFrame:
         return result
 
 
-def getCallStack(skip=0):
+@functools.lru_cache(maxsize=16384)
+def _internStackFrame(cls, filename, lineno, function):
+    """Make the `StackFrame` shared by `StackFrame.intern`.
+    """
+    return cls(filename, lineno, function)
+
+
+class LazyCallStack(collections.abc.MutableSequence):
+    """A call stack that creates its `StackFrame` elements on demand.
+
+    Parameters
+    ----------
+    entries : iterable, optional
+        Elements of the stack, ordered with the most recent frame last. Each
+        element is either a `StackFrame` or a ``(code, lineno)`` tuple as
+        recorded by `getCallStack`.
+
+    Notes
+    -----
+    Recording a call stack happens every time a config field is modified,
+    while the stack is only examined when the history is formatted. This
+    class therefore records only a ``(code, lineno)`` tuple per frame, and
+    builds the `StackFrame` for an element the first time it is accessed.
+
+    Other than that, a ``LazyCallStack`` behaves like a `list` of
+    `StackFrame`: it may be indexed, iterated, extended, and concatenated
+    with a `list`.
+    """
+
+    __slots__ = ("_entries",)
+
+    def __init__(self, entries=()):
+        self._entries = list(entries)
+
+    @classmethod
+    def fromFrame(cls, frame, depth=None):
+        """Record the stack of frames ending with ``frame``.
+
+        Parameters
+        ----------
+        frame : `Frame`
+            Most recent frame of the stack, such as from
+            `inspect.currentframe`.
+        depth : `int`, optional
+            Maximum number of frames to record, counting from ``frame``. All
+            frames are recorded if `None`.
+
+        Returns
+        -------
+        stack : `LazyCallStack`
+            The call stack, ordered with the most recent frame last.
+        """
+        entries = []
+        while frame and (depth is None or len(entries) < depth):
+            entries.append((frame.f_code, frame.f_lineno))
+            frame = frame.f_back
+        entries.reverse()
+        return cls(entries)
+
+    def _resolve(self, index):
+        entry = self._entries[index]
+        if not isinstance(entry, StackFrame):
+            entry = StackFrame.fromCode(*entry)
+            self._entries[index] = entry
+        return entry
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return LazyCallStack(self._entries[index])
+        return self._resolve(index)
+
+    def __setitem__(self, index, value):
+        self._entries[index] = value
+
+    def __delitem__(self, index):
+        del self._entries[index]
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        for index in range(len(self._entries)):
+            yield self._resolve(index)
+
+    def insert(self, index, value):
+        self._entries.insert(index, value)
+
+    def __add__(self, other):
+        if isinstance(other, LazyCallStack):
+            return LazyCallStack(self._entries + other._entries)
+        return LazyCallStack(self._entries + list(other))
+
+    def __radd__(self, other):
+        return LazyCallStack(list(other) + self._entries)
+
+    def __iadd__(self, other):
+        if isinstance(other, LazyCallStack):
+            other = other._entries
+        self._entries.extend(other)
+        return self
+
+    def __repr__(self):
+        return "%s(%r)" % (self.__class__.__name__, list(self))
+
+
+def getCallStack(skip=0, depth=None):
     """Retrieve the call stack for the caller.
 
     Parameters
     ----------
     skip : `int`, non-negative
         Number of stack frames above caller to skip.
+    depth : `int`, optional
+        Maximum number of (most recent) frames to retrieve. The whole stack
+        is retrieved if `None`.
 
     Returns
     -------
-    output : `list` of `StackFrame`
-        The call stack. The `list` is ordered with the most recent frame to
-        last.
+    output : `LazyCallStack`
+        The call stack, which behaves like a `list` of `StackFrame`. It is
+        ordered with the most recent frame last.
 
     Notes
     -----
     This function is excluded from the call stack.
+
+    Only the code object and line number of each frame is recorded; the
+    `StackFrame` elements are created when they are first accessed.
     """
     frame = getCallerFrame(skip + 1)
-    stack = []
-    while frame:
-        stack.append(StackFrame.fromFrame(frame))
-        frame = frame.f_back
-    return list(reversed(stack))
+    return LazyCallStack.fromFrame(frame, depth=depth)
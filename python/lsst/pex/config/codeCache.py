@@ -0,0 +1,340 @@
+#
+# LSST Data Management System
+# Copyright 2008, 2009, 2010 LSST Corporation.
+#
+# This product includes software developed by the
+# LSST Project (http://www.lsstcorp.org/).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the LSST License Statement and
+# the GNU General Public License along with this program.  If not,
+# see <http://www.lsstcorp.org/LegalNotices/>.
+#
+"""An on-disk cache of compiled configuration override files.
+
+`lsst.pex.config.Config.load` compiles the file it is given every time it is
+called. A `CodeCache` stores the compiled code, like the ``__pycache__``
+directories of Python modules, so that other processes that load the same
+file do not compile it again.
+
+The cache is off unless a directory is given, either with `setCache` or with
+the ``PEX_CONFIG_CODE_CACHE`` environment variable. The code in the cache is
+executed, so the directory must be private to the user: it is not used if
+another user owns it or can write to it.
+"""
+
+__all__ = ('CodeCache', 'compileFile', 'getCache', 'setCache')
+
+import hashlib
+import hmac
+import importlib.util
+import io
+import marshal
+import os
+import stat
+import tempfile
+import warnings
+
+
+class _DirectoryCache:
+    """A directory of cached objects, each in its own file, that concurrent
+    processes can share.
+
+    Parameters
+    ----------
+    directory : `str`
+        The cache directory; it is created, private to the user, if it does
+        not exist.
+    maxSize : `int` or `None`, optional
+        The maximum total size of the cached files in bytes, or `None` for no
+        limit. When it is exceeded, the least recently used files are removed.
+
+    Raises
+    ------
+    PermissionError
+        Raised if the directory is owned by another user, or other users can
+        write to it.
+
+    Notes
+    -----
+    Files are written under a temporary name and renamed into place, so a
+    process never reads a partly written file, and files that cannot be read
+    (for example because another process removed them) are treated as
+    missing.
+
+    Loading a cached object may run code, so only the user's own processes
+    may write to the directory. Each file is also signed with an HMAC keyed
+    by a random key kept in the directory, and files whose signature does
+    not match are treated as missing too.
+
+    Subclasses set ``suffix``, the extension of the cached files, and
+    implement ``_load`` and ``_dump`` to read and write an object.
+    """
+
+    suffix = None
+
+    def __init__(self, directory, maxSize=256*1024*1024):
+        self.directory = directory
+        self.maxSize = maxSize
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        info = os.stat(directory)
+        if hasattr(os, "getuid") and info.st_uid != os.getuid():
+            raise PermissionError("Cache directory %r is owned by another user" % directory)
+        if info.st_mode & (stat.S_IWGRP | stat.S_IWOTH):
+            raise PermissionError("Cache directory %r can be written by other users" % directory)
+        self._key = self._getKey()
+
+    def _getKey(self):
+        """Read the key that signs the files of the cache, making it if it
+        does not exist yet.
+        """
+        path = os.path.join(self.directory, ".key")
+        if not os.path.exists(path):
+            with tempfile.NamedTemporaryFile(dir=self.directory, prefix=".", suffix=".tmp",
+                                             delete=False) as f:
+                f.write(os.urandom(32))
+            try:
+                # Unlike a rename, this fails if another process made the
+                # key first, so that all use the same one.
+                os.link(f.name, path)
+            except FileExistsError:
+                pass
+            finally:
+                os.remove(f.name)
+        with open(path, "rb") as f:
+            return f.read()
+
+    def __repr__(self):
+        return "%s(%r, maxSize=%r)" % (type(self).__name__, self.directory, self.maxSize)
+
+    def _getPath(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def get(self, key):
+        """Get an object from the cache.
+
+        Parameters
+        ----------
+        key : `str`
+            The key of the object, which must be usable as a file name.
+
+        Returns
+        -------
+        obj : object
+            The cached object, or `None` if it is not in the cache.
+        """
+        path = self._getPath(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            digest, data = data[:32], data[32:]
+            if not hmac.compare_digest(digest, hmac.new(self._key, data, hashlib.sha256).digest()):
+                return None
+            obj = self._load(io.BytesIO(data))
+        except Exception:
+            # Missing, damaged, or (for pickles) no longer loadable.
+            return None
+        try:
+            # Record the use, for eviction.
+            os.utime(path)
+        except OSError:
+            # e.g. a read-only or shared cache; the object is still good
+            pass
+        return obj
+
+    def put(self, key, obj):
+        """Put an object in the cache, then evict files if the cache is too
+        large.
+
+        Parameters
+        ----------
+        key : `str`
+            The key of the object, which must be usable as a file name.
+        obj : object
+            The object to cache.
+        """
+        try:
+            buffer = io.BytesIO()
+            self._dump(obj, buffer)
+            data = buffer.getvalue()
+            with tempfile.NamedTemporaryFile(dir=self.directory, prefix=".", suffix=".tmp",
+                                             delete=False) as f:
+                f.write(hmac.new(self._key, data, hashlib.sha256).digest())
+                f.write(data)
+            os.replace(f.name, self._getPath(key))
+        except Exception:
+            # The cache is an optimization: failing to write it (or to
+            # serialize the object) is not an error.
+            return
+        if self.maxSize is not None:
+            self.evict(self.maxSize)
+
+    def evict(self, maxSize=0):
+        """Remove the least recently used files from the cache.
+
+        Parameters
+        ----------
+        maxSize : `int`, optional
+            The total size in bytes of the files to keep; by default, all of
+            the files are removed.
+        """
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(self.suffix):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                total += stat.st_size
+        if total <= maxSize:
+            return
+        entries.sort()
+        for _, size, path in entries:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+            if total <= maxSize:
+                break
+
+
+class CodeCache(_DirectoryCache):
+    """A directory of compiled configuration override files.
+
+    Parameters
+    ----------
+    directory : `str`
+        The cache directory; it is created, private to the user, if it does
+        not exist.
+    maxSize : `int` or `None`, optional
+        The maximum total size of the cached files in bytes (256 MiB by
+        default), or `None` for no limit. When it is exceeded, the least
+        recently used files are removed.
+
+    Notes
+    -----
+    Each compiled file is stored under a hash of the Python version, the
+    path, modification time and size of the source file, and the source
+    itself, so that an edited file is never served stale code.
+
+    The cached code is executed, so the directory is not used if another
+    user owns it or can write to it, and each file is signed with a random
+    key kept in the directory; files that are not are treated as missing.
+    """
+
+    suffix = ".pyc"
+
+    def _load(self, f):
+        return marshal.load(f)
+
+    def _dump(self, obj, f):
+        marshal.dump(obj, f)
+
+    def compile(self, filename, source):
+        """Compile the source of a file, or get the code from the cache.
+
+        Parameters
+        ----------
+        filename : `str`
+            The name of the file.
+        source : `str`
+            The contents of the file.
+
+        Returns
+        -------
+        code : `types.CodeType`
+            The compiled code, as returned by `compile`.
+        """
+        stat = os.stat(filename)
+        key = hashlib.sha256(importlib.util.MAGIC_NUMBER)
+        key.update(("%s\0%d\0%d\0" % (os.path.abspath(filename), stat.st_mtime_ns, stat.st_size))
+                   .encode("utf-8", "surrogateescape"))
+        key.update(source.encode("utf-8", "surrogateescape"))
+        key = key.hexdigest()
+        code = self.get(key)
+        if code is None:
+            code = compile(source, filename=filename, mode="exec")
+            self.put(key, code)
+        return code
+
+
+def _makeDefaultCache():
+    directory = os.environ.get("PEX_CONFIG_CODE_CACHE")
+    if not directory:
+        return None
+    try:
+        return CodeCache(directory)
+    except OSError as e:
+        # The cache is an optimization: do not fail to import because of it.
+        warnings.warn("Not using the cache in PEX_CONFIG_CODE_CACHE=%r: %s" % (directory, e))
+        return None
+
+
+_cache = _makeDefaultCache()
+
+
+def getCache():
+    """Get the process-wide code cache.
+
+    Returns
+    -------
+    cache : `CodeCache` or `None`
+        The cache used by `compileFile`, or `None` if there is none.
+    """
+    return _cache
+
+
+def setCache(cache):
+    """Set the process-wide code cache.
+
+    Parameters
+    ----------
+    cache : `CodeCache`, `str` or `None`
+        The new cache, the directory of a new cache, or `None` to turn
+        caching off.
+
+    Returns
+    -------
+    oldCache : `CodeCache` or `None`
+        The previous cache, so that it can be restored.
+    """
+    global _cache
+    if isinstance(cache, str):
+        cache = CodeCache(cache)
+    oldCache, _cache = _cache, cache
+    return oldCache
+
+
+def compileFile(filename):
+    """Compile a configuration override file, using the process-wide code
+    cache if there is one.
+
+    Parameters
+    ----------
+    filename : `str`
+        Name of the file.
+
+    Returns
+    -------
+    code : `types.CodeType`
+        The compiled code.
+    """
+    with open(filename, "r") as f:
+        source = f.read()
+    if _cache is None:
+        return compile(source, filename=filename, mode="exec")
+    return _cache.compile(filename, source)
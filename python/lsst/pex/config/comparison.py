@@ -24,11 +24,13 @@
 Theses function should be use for any comparison in a `lsst.pex.Config.compare`
 or `lsst.pex.config.Field._compare` implementation, as they take care of
 writing messages as well as floating-point comparisons and shortcuts.
+`~lsst.pex.config.Field._addComparisons` implementations use the equivalent
+methods of the comparison they are given instead.
 """
 
 import numpy
 
-__all__ = ("getComparisonName", "compareScalars", "compareConfigs")
+__all__ = ("getComparisonName", "compareScalars", "compareConfigs", "groupConfigs")
 
 
 def getComparisonName(name1, name2):
@@ -138,33 +140,337 @@ def compareConfigs(name, c1, c2, shortcut=True, rtol=1E-8, atol=1E-8, output=Non
 
     Notes
     -----
-    Floating point comparisons are performed by `numpy.allclose`.
+    Floating point comparisons are performed by `numpy.isclose`, on all of
+    the floating point values of the configs at once.
 
     If ``c1`` or ``c2`` contain `~lsst.pex.config.RegistryField` or
     `~lsst.pex.config.ConfigChoiceField` instances, *unselected*
     `~lsst.pex.config.Config` instances will not be compared.
     """
     assert name is not None
-    if c1 is None:
-        if c2 is None:
+    comparison = _Comparison(shortcut=shortcut, rtol=rtol, atol=atol, output=output)
+    comparison.compareConfigs(name, c1, c2)
+    return comparison.finish()
+
+
+_baseCompare = None
+"""`lsst.pex.config.Field._compare`, once it has been looked up.
+"""
+
+
+def _overridesCompare(field):
+    """Test whether the class of a field overrides
+    `lsst.pex.config.Field._compare`, which takes precedence over its
+    ``_addComparisons`` method if it does.
+    """
+    global _baseCompare
+    if _baseCompare is None:
+        # config imports this module, so Field cannot be imported at the top
+        from .config import Field
+        _baseCompare = Field._compare
+    return type(field)._compare is not _baseCompare
+
+
+class _Unflattenable(Exception):
+    """Raised by `_Flattening` for configs with fields that are compared by
+    their own ``_compare`` method.
+    """
+
+
+def groupConfigs(configs, rtol=1E-8, atol=1E-8):
+    """Partition `lsst.pex.config.Config` instances into classes of configs
+    that compare equal.
+
+    Parameters
+    ----------
+    configs : iterable of `lsst.pex.config.Config`
+        The configs to group.
+    rtol : `float`, optional
+        Relative tolerance for floating point comparisons.
+    atol : `float`, optional
+        Absolute tolerance for floating point comparisons.
+
+    Returns
+    -------
+    groups : `list` of `tuple`
+        One ``(representative, indices)`` pair for each class, in the order
+        of their first members: ``representative`` is the first config of the
+        class, and ``indices`` the positions in ``configs`` of all of its
+        members (including the representative).
+
+    See also
+    --------
+    lsst.pex.config.compareConfigs
+
+    Notes
+    -----
+    Every member ``config`` of a class satisfies
+    ``representative.compare(config, rtol=rtol, atol=atol)``, with the same
+    rules as `lsst.pex.config.Config.compare`. Comparisons with tolerances
+    are not transitive, so a config is put in the first class whose
+    representative it is equal to.
+
+    Rather than comparing the configs pairwise, each config is flattened once
+    into the values that `~lsst.pex.config.Config.compare` looks at. Configs
+    with the same exact (non-floating point) values are bucketed together
+    with a `dict`, and the floating point values of a config are compared to
+    those of all of the representatives in its bucket at once. The cost is
+    therefore close to linear in the number of configs when they fall into
+    few classes. Configs with fields that override
+    `lsst.pex.config.Field._compare` cannot be flattened, and are compared
+    with the representatives of all of the classes in turn instead; they are
+    not put in the classes of configs that can be flattened.
+    """
+    groups = []
+    # Class index for each flattened config already seen.
+    seen = {}
+    # Class indices and floating point values of the representatives with
+    # the same exact values.
+    buckets = {}
+    for index, config in enumerate(configs):
+        try:
+            key, values = _Flattening.flatten(config)
+        except _Unflattenable:
+            for group, (representative, indices) in enumerate(groups):
+                if representative.compare(config, rtol=rtol, atol=atol):
+                    indices.append(index)
+                    break
+            else:
+                groups.append((config, [index]))
+            continue
+        group = seen.get((key, values))
+        if group is None:
+            bucket = buckets.setdefault(key, ([], []))
+            groupIndices, representativeValues = bucket
+            if groupIndices:
+                if values:
+                    close = numpy.isclose(numpy.array(representativeValues), numpy.array(values),
+                                          rtol=rtol, atol=atol, equal_nan=True).all(axis=1)
+                    matches = numpy.flatnonzero(close)
+                    if len(matches):
+                        group = groupIndices[matches[0]]
+                else:
+                    group = groupIndices[0]
+            if group is None:
+                group = len(groups)
+                groups.append((config, []))
+                groupIndices.append(group)
+                representativeValues.append(values)
+            seen[(key, values)] = group
+        groups[group][1].append(index)
+    return groups
+
+
+class _Comparison:
+    """The comparison of two `lsst.pex.config.Config` instances, in which
+    all floating-point values are compared at once.
+
+    Parameters
+    ----------
+    shortcut : `bool`
+        If `True`, stop at the first inequality.
+    rtol : `float`
+        Relative tolerance for floating point comparisons.
+    atol : `float`
+        Absolute tolerance for floating point comparisons.
+    output : callable or `None`
+        A callable that takes a string, used (possibly repeatedly) to report
+        inequalities.
+
+    Notes
+    -----
+    `compareConfigs` and `lsst.pex.config.Field._compare` walk both configs
+    together, passing every pair of values to `compareScalars`. Values that
+    can be compared exactly are compared immediately, while floating-point
+    values are gathered into arrays that `finish` compares with a single call
+    to `numpy.isclose` (the same test as `numpy.allclose`, with NaNs equal to
+    each other). `finish` then reports the inequalities in the order in which
+    they were found.
+
+    Fields whose class overrides `lsst.pex.config.Field._compare` are compared
+    by calling it instead of their ``_addComparisons``; they report their
+    inequalities immediately.
+    """
+
+    def __init__(self, shortcut, rtol, atol, output):
+        self.shortcut = shortcut
+        self.rtol = rtol
+        self.atol = atol
+        self.output = output
+        self.failed = False
+        # Inequalities and floating-point comparisons, in order: either a
+        # message, or the index of the values in the arrays.
+        self._entries = []
+        self._names = []
+        self._values1 = []
+        self._values2 = []
+        self._isComplex = False
+
+    @property
+    def done(self):
+        """Whether the rest of the configs need not be compared (`bool`).
+        """
+        return self.failed and self.shortcut
+
+    def report(self, message):
+        """Record an inequality.
+
+        Parameters
+        ----------
+        message : `str`
+            Message that describes the inequality.
+        """
+        self.failed = True
+        self._entries.append(message)
+
+    def compareScalars(self, name, v1, v2, dtype=None):
+        """Compare two scalar values (see
+        `lsst.pex.config.comparison.compareScalars`).
+
+        Returns
+        -------
+        areEqual : `bool` or `None`
+            `True` if the values are equal, `False` if they are not, or `None`
+            if they are floating-point values that are compared by `finish`.
+        """
+        if v1 is not None and v2 is not None and dtype in (float, complex):
+            self._isComplex = self._isComplex or dtype is complex
+            self._entries.append(len(self._names))
+            self._names.append(name)
+            self._values1.append(v1)
+            self._values2.append(v2)
+            return None
+        if v1 == v2:
             return True
-        else:
-            if output is not None:
-                output("LHS is None for %s" % name)
-            return False
-    else:
-        if c2 is None:
-            if output is not None:
-                output("RHS is None for %s" % name)
-            return False
-    if type(c1) != type(c2):
-        if output is not None:
-            output("Config types do not match for %s: %s != %s" % (name, type(c1), type(c2)))
+        self.report("Inequality in %s: %r != %r" % (name, v1, v2))
         return False
-    equal = True
-    for field in c1._fields.values():
-        result = field._compare(c1, c2, shortcut=shortcut, rtol=rtol, atol=atol, output=output)
-        if not result and shortcut:
-            return False
-        equal = equal and result
-    return equal
+
+    def compareConfigs(self, name, c1, c2):
+        """Compare two configs (see
+        `lsst.pex.config.comparison.compareConfigs`).
+        """
+        if c1 is None:
+            if c2 is not None:
+                self.report("LHS is None for %s" % name)
+            return
+        elif c2 is None:
+            self.report("RHS is None for %s" % name)
+            return
+        if type(c1) != type(c2):
+            self.report("Config types do not match for %s: %s != %s" % (name, type(c1), type(c2)))
+            return
+        for field in c1._fields.values():
+            if self.done:
+                return
+            if _overridesCompare(field):
+                if not field._compare(c1, c2, shortcut=self.shortcut, rtol=self.rtol, atol=self.atol,
+                                      output=self.output):
+                    # the field has reported the inequalities itself
+                    self.failed = True
+                    self._entries.append(None)
+            else:
+                field._addComparisons(c1, c2, self)
+
+    def finish(self):
+        """Compare the floating-point values and report the inequalities.
+
+        Returns
+        -------
+        areEqual : `bool`
+            `True` if everything compared was equal, `False` otherwise.
+        """
+        if self._names:
+            dtype = complex if self._isComplex else float
+            close = numpy.isclose(numpy.array(self._values1, dtype=dtype),
+                                  numpy.array(self._values2, dtype=dtype),
+                                  rtol=self.rtol, atol=self.atol, equal_nan=True)
+        equal = True
+        for entry in self._entries:
+            if entry is None:
+                equal = False
+                if self.shortcut:
+                    break
+                continue
+            if isinstance(entry, int):
+                if close[entry]:
+                    continue
+                entry = "Inequality in %s: %r != %r" % (
+                    self._names[entry], self._values1[entry], self._values2[entry])
+            equal = False
+            if self.output is not None:
+                self.output(entry)
+            if self.shortcut:
+                break
+        return equal
+
+
+class _Flattening:
+    """The values of a `lsst.pex.config.Config` that
+    `lsst.pex.config.Config.compare` looks at, for `groupConfigs`.
+
+    This class provides the methods of `_Comparison` that
+    `lsst.pex.config.Field._addComparisons` uses, and is passed to it with the
+    same config on both sides.
+
+    Parameters
+    ----------
+    prefix : `str` or `None`
+        Name of the config that is flattened, which is removed from the names
+        of its values.
+    """
+
+    done = False
+
+    def __init__(self, prefix):
+        self._prefixLength = 0 if prefix is None else len(prefix) + 1
+        self._exact = []
+        self._floats = []
+
+    @classmethod
+    def flatten(cls, config):
+        """Flatten a config.
+
+        Parameters
+        ----------
+        config : `lsst.pex.config.Config`
+            The config to flatten.
+
+        Returns
+        -------
+        key : `tuple`
+            The names and types of the values in a canonical order, and the
+            values that are compared exactly.
+        values : `tuple`
+            The floating point values, in the same order as their names in
+            ``key``.
+        """
+        flattening = cls(config._name)
+        flattening.compareConfigs(None, config, config)
+        flattening._exact.sort(key=lambda item: item[0])
+        flattening._floats.sort(key=lambda item: item[0])
+        key = (tuple(flattening._exact), tuple((name, dtype) for name, dtype, _ in flattening._floats))
+        return key, tuple(value for _, _, value in flattening._floats)
+
+    def _relativeName(self, name):
+        return "" if name is None else name[self._prefixLength:]
+
+    def compareScalars(self, name, v1, v2, dtype=None):
+        name = self._relativeName(name)
+        if v1 is not None and dtype in (float, complex):
+            self._floats.append((name, dtype, v1))
+            return None
+        try:
+            hash(v1)
+        except TypeError:
+            # Sets of keys or of selected names.
+            v1 = frozenset(v1)
+        self._exact.append((name, v1))
+        return True
+
+    def compareConfigs(self, name, c1, c2):
+        self._exact.append((self._relativeName(name), None if c1 is None else type(c1)))
+        if c1 is not None:
+            for field in c1._fields.values():
+                if _overridesCompare(field):
+                    raise _Unflattenable()
+                field._addComparisons(c1, c1, self)
@@ -21,17 +21,25 @@
 #
 __all__ = ("Config", "Field", "FieldValidationError")
 
-import io
 import os
-import re
 import sys
 import math
 import copy
 import tempfile
 import shutil
+import builtins
+import collections.abc
+import hashlib
+import io
+import importlib
+import json
+import threading
 
-from .comparison import getComparisonName, compareScalars, compareConfigs
-from .callStack import getStackFrame, getCallStack
+from .comparison import getComparisonName, compareConfigs, _Comparison
+from .callStack import getStackFrame, LazyCallStack
+from .history import getPolicy as getHistoryPolicy, HistoryPolicy
+from .codeCache import compileFile
+from . import stateCache
 
 
 def _joinNamePath(prefix=None, name=None, index=None):
@@ -72,6 +80,291 @@ def _autocast(x, dtype):
     return x
 
 
+def _getHistoryPolicy(config):
+    """Get the history policy in effect for a config.
+
+    Parameters
+    ----------
+    config : `lsst.pex.config.Config`
+        A config instance.
+
+    Returns
+    -------
+    policy : `lsst.pex.config.history.HistoryPolicy`
+        The config's `~lsst.pex.config.Config.historyPolicy`, if set;
+        otherwise the process-wide policy.
+    """
+    policy = config.historyPolicy
+    return policy if policy is not None else getHistoryPolicy()
+
+
+def _getFieldHistory(config, name):
+    """Get the history of a field in a config, creating it if needed.
+
+    Parameters
+    ----------
+    config : `lsst.pex.config.Config`
+        A config instance.
+    name : `str`
+        Name of the field.
+
+    Returns
+    -------
+    history : `list` or `lsst.pex.config.history.BoundedHistory`
+        The field's history, to which events may be appended; new histories
+        are made by the config's history policy.
+
+    Notes
+    -----
+    Until a field is first changed, its history may be a `tuple` of default
+    events shared by all instances of the config class; this function
+    replaces it with a history of the config's own.
+    """
+    history = config._history.get(name)
+    if history is None or isinstance(history, tuple):
+        events = history or ()
+        history = config._history[name] = _getHistoryPolicy(config).makeHistory()
+        for event in events:
+            history.append(event)
+    return history
+
+
+_noHistoryPolicy = HistoryPolicy("off")
+"""History policy used while applying defaults whose history is shared.
+"""
+
+_prototypeDependencies = threading.local()
+"""Per-thread stack of the `dict` objects that record the config classes and
+registries that the prototypes and default fingerprints being made depend on.
+"""
+
+
+_changeStamp = 0
+"""Counter that is incremented whenever a field of any config changes (see
+`Config.checkpoint`).
+"""
+
+
+def _copyDict(value):
+    """Copy the nested `dict` and `list` objects returned by
+    `Config.toDict`.
+    """
+    if isinstance(value, dict):
+        return {k: _copyDict(v) for k, v in value.items()}
+    elif isinstance(value, list):
+        return [_copyDict(v) for v in value]
+    return value
+
+
+def _sortedItems(mapping):
+    """Get the items of a mapping sorted by key, or by the `repr` of the keys
+    if they cannot be compared.
+    """
+    try:
+        return sorted(mapping.items(), key=lambda item: item[0])
+    except TypeError:
+        return sorted(mapping.items(), key=lambda item: repr(item[0]))
+
+
+def _markContainerChanged(container):
+    """Record a change to a `~lsst.pex.config.listField.List` or
+    `~lsst.pex.config.dictField.Dict` as a change to the field that holds it,
+    unless the container is still being built (the field records that).
+    """
+    config = container._config
+    if config._storage.get(container._field.name) is container:
+        config._markChanged(container._field.name)
+
+
+def _equalWithNan(value1, value2):
+    """Compare two field values with ``==``, except that NaNs compare equal,
+    also as items of lists and dicts, like they do in fingerprints (for
+    internal use only).
+    """
+    if isinstance(value1, float) and isinstance(value2, float):
+        return value1 == value2 or (math.isnan(value1) and math.isnan(value2))
+    if isinstance(value1, collections.abc.MutableSequence) and \
+            isinstance(value2, collections.abc.MutableSequence):
+        return len(value1) == len(value2) and all(_equalWithNan(v1, v2) for v1, v2 in zip(value1, value2))
+    if isinstance(value1, collections.abc.MutableMapping) and \
+            isinstance(value2, collections.abc.MutableMapping):
+        return value1.keys() == value2.keys() and all(_equalWithNan(v, value2[k]) for k, v in value1.items())
+    return value1 == value2
+
+
+def _canonicalRepr(value):
+    """Format field state (see `Field._getState`) as Python code that is the
+    same for all equal values.
+
+    Dictionaries are written with sorted keys, non-finite floats as calls to
+    `float`, and negative zero as ``0.0``.
+    """
+    if isinstance(value, float):
+        if math.isinf(value) or math.isnan(value):
+            return "float('{!r}')".format(value)
+        return repr(0.0) if value == 0.0 else repr(value)
+    elif isinstance(value, list):
+        return "[" + ", ".join(_canonicalRepr(v) for v in value) + "]"
+    elif isinstance(value, dict):
+        return "{" + ", ".join(_canonicalRepr(k) + ": " + _canonicalRepr(v)
+                               for k, v in _sortedItems(value)) + "}"
+    return repr(value)
+
+
+def _recordPrototypeDependency(source):
+    """Record that the configs being made for prototypes and default
+    fingerprints in this thread depend on a config class or registry.
+
+    Parameters
+    ----------
+    source : `lsst.pex.config.Config`-type or `lsst.pex.config.Registry`
+        The config class or registry.
+    """
+    stack = getattr(_prototypeDependencies, "stack", None)
+    if stack:
+        dependency = {id(source): (source, source._prototypeGeneration)}
+        for record in stack:
+            record.update(dependency)
+
+
+def _recordPrototypeDependencies(dependencies):
+    """Record dependencies returned by `_makeWithDependencies` in every
+    recording in progress in this thread.
+    """
+    for record in getattr(_prototypeDependencies, "stack", ()):
+        record.update(dependencies)
+
+
+def _makeWithDependencies(make):
+    """Make a config while recording what it depends on.
+
+    Parameters
+    ----------
+    make : callable
+        Function without arguments that makes the config.
+
+    Returns
+    -------
+    config : `lsst.pex.config.Config`
+        The config returned by ``make``.
+    dependencies : `dict`
+        Mapping of `id` to ``(source, generation)`` for the config classes
+        and registries the config was made from; pass it to
+        `_checkPrototypeDependencies` to check whether any of them changed
+        since.
+    """
+    dependencies = {}
+    stack = _prototypeDependencies.__dict__.setdefault("stack", [])
+    stack.append(dependencies)
+    try:
+        config = make()
+    finally:
+        stack.pop()
+    _recordPrototypeDependencies(dependencies)
+    return config, dependencies
+
+
+def _checkPrototypeDependencies(dependencies):
+    """Check that none of the config classes and registries recorded by
+    `_makeWithDependencies` changed since.
+    """
+    return all(source._prototypeGeneration == generation
+               for source, generation in dependencies.values())
+
+
+def _invalidatePrototypes(source):
+    """Discard the cached prototypes and default fingerprints that depend on a
+    config class or registry.
+
+    Parameters
+    ----------
+    source : `lsst.pex.config.Config`-type or `lsst.pex.config.Registry`
+        The config class or registry that changed. The subclasses of a
+        config class are invalidated with it.
+
+    Notes
+    -----
+    This is called whenever an attribute of a config class or of one of its
+    fields is set, or an item is added to a `~lsst.pex.config.Registry`.
+    """
+    if not isinstance(source, ConfigMeta):
+        source._prototypeGeneration += 1
+        return
+    classes = [source]
+    while classes:
+        cls = classes.pop()
+        type.__setattr__(cls, "_prototypeGeneration", cls._prototypeGeneration + 1)
+        # The history of the defaults may have changed.
+        type.__setattr__(cls, "_defaultHistory", None)
+        classes.extend(cls.__subclasses__())
+
+
+def _encodeFingerprintState(value, chunks):
+    """Append a canonical encoding of field state to a list of `bytes`.
+
+    Parameters
+    ----------
+    value : object
+        Data returned by `lsst.pex.config.Field._getFingerprintState`.
+    chunks : `list` of `bytes`
+        List to append the encoding to.
+
+    Notes
+    -----
+    Numbers that compare equal are encoded the same way (so ``1``, ``1.0``
+    and `True` are indistinguishable, all NaNs are the same and ``-0.0`` is
+    ``0.0``), as are lists and tuples, and mappings and sets are encoded in
+    sorted order. Classes and functions are encoded by their qualified name,
+    and configs by their own fingerprint.
+    """
+    if value is None:
+        chunks.append(b"N")
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        chunks.append(b"s%d:%s" % (len(data), data))
+    elif isinstance(value, (bool, int, float, complex)):
+        if isinstance(value, complex) and value.imag == 0:
+            value = value.real
+        if isinstance(value, float):
+            if math.isnan(value):
+                chunks.append(b"fnan")
+                return
+            if value.is_integer():
+                value = int(value)
+        if isinstance(value, int):
+            chunks.append(b"i%d;" % value)
+        else:
+            chunks.append(b"f%s;" % repr(value).encode())
+    elif isinstance(value, Config):
+        chunks.append(b"C%s" % value.fingerprint().encode())
+    elif isinstance(value, (list, tuple)):
+        chunks.append(b"[")
+        for item in value:
+            _encodeFingerprintState(item, chunks)
+        chunks.append(b"]")
+    elif isinstance(value, (set, frozenset)):
+        chunks.append(b"{")
+        chunks.extend(sorted(_fingerprintBytes(item) for item in value))
+        chunks.append(b"}")
+    elif isinstance(value, dict):
+        chunks.append(b"(")
+        chunks.extend(sorted(_fingerprintBytes(k) + _fingerprintBytes(v) for k, v in value.items()))
+        chunks.append(b")")
+    elif hasattr(value, "__module__") and hasattr(value, "__qualname__"):
+        _encodeFingerprintState("%s.%s" % (value.__module__, value.__qualname__), chunks)
+    else:
+        _encodeFingerprintState("%s(%r)" % (_typeStr(value), value), chunks)
+
+
+def _fingerprintBytes(value):
+    """Return the canonical encoding of field state as `bytes` (see
+    `_encodeFingerprintState`).
+    """
+    chunks = []
+    _encodeFingerprintState(value, chunks)
+    return b"".join(chunks)
+
+
 def _typeStr(x):
     """Generate a fully-qualified type name.
 
@@ -95,6 +388,77 @@ def _typeStr(x):
         return "%s.%s" % (xtype.__module__, xtype.__name__)
 
 
+def _hashDefinitions(configClass, hasher, visited):
+    """Add the definitions of the fields of a config class, and of the config
+    classes they refer to, to a hash.
+
+    Parameters
+    ----------
+    configClass : `lsst.pex.config.Config`-type
+        The config class.
+    hasher : `hashlib.sha256`
+        The hash to update.
+    visited : `set`
+        The config classes already added, which are skipped.
+    """
+    if configClass in visited:
+        return
+    visited.add(configClass)
+    hasher.update(("%s\0" % _typeStr(configClass)).encode())
+    nested = []
+    for name, field in configClass._fields.items():
+        description, configClasses = field._getDefinition()
+        hasher.update(("%s\0%s\0" % (name, description)).encode())
+        nested.extend(configClasses)
+    for nestedClass in nested:
+        _hashDefinitions(nestedClass, hasher, visited)
+
+
+_loadedFiles = threading.local()
+"""Per-thread stack of the `dict` objects that record the files loaded by
+`Config.loadOverrides` while its changes are being recorded for the state
+cache.
+"""
+
+
+def _recordLoadedFiles(files):
+    """Record files loaded by `Config.loadOverrides` in every recording in
+    progress in this thread.
+
+    Parameters
+    ----------
+    files : `dict`
+        Mapping of absolute file names to the SHA-256 hex digests of their
+        contents.
+    """
+    for record in getattr(_loadedFiles, "stack", ()):
+        record.update(files)
+
+
+def _checkLoadedFiles(files):
+    """Check that files recorded by `_recordLoadedFiles` are unchanged.
+
+    Parameters
+    ----------
+    files : `dict`
+        Mapping of absolute file names to the SHA-256 hex digests of their
+        contents.
+
+    Returns
+    -------
+    unchanged : `bool`
+        `True` if every file can be read and has the recorded contents.
+    """
+    for path, digest in files.items():
+        try:
+            with open(path, "rb") as f:
+                if hashlib.sha256(f.read()).hexdigest() != digest:
+                    return False
+        except OSError:
+            return False
+    return True
+
+
 class ConfigMeta(type):
     """A metaclass for `lsst.pex.config.Config`.
 
@@ -108,30 +472,53 @@ class ConfigMeta(type):
 
     def __init__(cls, name, bases, dict_):
         type.__init__(cls, name, bases, dict_)
+        type.__setattr__(cls, "_prototypeGeneration", 0)
         cls._fields = {}
         cls._source = getStackFrame()
-
-        def getFields(classtype):
-            fields = {}
-            bases = list(classtype.__bases__)
-            bases.reverse()
-            for b in bases:
-                fields.update(getFields(b))
-
-            for k, v in classtype.__dict__.items():
-                if isinstance(v, Field):
-                    fields[k] = v
-            return fields
-
-        fields = getFields(cls)
+        cls._defaultHistory = None
+        cls._prototype = None
+        cls._defaultFingerprint = None
+
+        fields = ConfigMeta._resolveFields(cls)
+        # Fields defined by this class are used as they are, but inherited
+        # fields get a shallow copy so that changing e.g. the default of a
+        # subclass's field does not change the base class.
+        owned = set()
         for k, v in fields.items():
-            setattr(cls, k, copy.deepcopy(v))
+            if cls.__dict__.get(k) is not v or id(v) in owned:
+                inherited = v
+                v = object.__new__(type(inherited))
+                v.__dict__.update(inherited.__dict__)
+            owned.add(id(v))
+            setattr(cls, k, v)
+
+    @staticmethod
+    def _resolveFields(classtype):
+        """Return the fields of a class and of all its bases.
+
+        The tables of `Config` bases are read from their ``_fields``, so only
+        the class itself and any bases that are not configs are walked.
+        """
+        fields = {}
+        for b in reversed(classtype.__bases__):
+            baseFields = b.__dict__.get("_fields") if isinstance(b, ConfigMeta) else None
+            if baseFields is None:
+                baseFields = ConfigMeta._resolveFields(b)
+            fields.update(baseFields)
+
+        for k, v in classtype.__dict__.items():
+            if isinstance(v, Field):
+                fields[k] = v
+        return fields
 
     def __setattr__(cls, name, value):
         if isinstance(value, Field):
-            value.name = name
+            # not through Field.__setattr__, which would invalidate the
+            # prototypes of the class an inherited field was copied from
+            value.__dict__.update(name=name, _owner=cls)
             cls._fields[name] = value
         type.__setattr__(cls, name, value)
+        _invalidatePrototypes(cls)
 
 
 class FieldValidationError(ValueError):
@@ -158,7 +545,7 @@ class FieldValidationError(ValueError):
         (`str`).
         """
 
-        self.history = config.history.setdefault(field.name, [])
+        self.history = _getFieldHistory(config, field.name)
         """Full history of all changes to the `~lsst.pex.config.Field`
         instance.
         """
@@ -261,6 +648,13 @@ class Field:
         source = getStackFrame()
         self._setup(doc=doc, dtype=dtype, default=default, check=check, optional=optional, source=source)
 
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        # e.g. a new default changes the instances of the class of the field
+        owner = self.__dict__.get("_owner")
+        if owner is not None:
+            _invalidatePrototypes(owner)
+
     def _setup(self, doc, dtype, default, check, optional, source):
         """Set attributes, usually during initialization.
         """
@@ -364,6 +758,210 @@ class Field:
         """
         pass
 
+    def _copy(self, source, target, history):
+        """Copy the value of this field from one config to another, without
+        validating it (for internal use only).
+
+        Parameters
+        ----------
+        source : `lsst.pex.config.Config`
+            The config instance to copy from.
+        target : `lsst.pex.config.Config`
+            The new config instance to copy to; its name has already been set.
+        history : `bool` or `list` of `~lsst.pex.config.callStack.StackFrame`
+            Whether subconfigs of ``target`` start with the history of those
+            of ``source``; passed on to `lsst.pex.config.Config._copy`.
+
+        Notes
+        -----
+        This method is invoked by the `lsst.pex.config.Config` object that
+        contains this field and should not be called directly.
+
+        Values of the `supportedTypes` are immutable and are shared by both
+        configs; other values are deep-copied. Fields that hold containers or
+        subconfigs should copy them, renaming copied subconfigs as
+        `rename` would.
+        """
+        try:
+            value = source._storage[self.name]
+        except KeyError:
+            return
+        if value is not None and type(value) not in self.supportedTypes:
+            value = copy.deepcopy(value)
+        target._storage[self.name] = value
+
+    def _getState(self, instance):
+        """Get the value of this field as picklable data (for internal use
+        only).
+
+        Parameters
+        ----------
+        instance : `lsst.pex.config.Config`
+            The config instance that contains this field.
+
+        Returns
+        -------
+        state : object
+            Data that `_setState` can apply to another config instance. It may
+            contain classes and functions (which are pickled by reference), but
+            no `~lsst.pex.config.Config` or `~lsst.pex.config.Field` objects.
+
+        Notes
+        -----
+        This method is invoked by the `lsst.pex.config.Config` object that
+        contains this field and should not be called directly.
+
+        Fields that hold containers or subconfigs must implement this method
+        along with `_setState`.
+        """
+        return instance._storage.get(self.name)
+
+    def _getFingerprintState(self, instance):
+        """Get the value of this field as data for the fingerprint of its
+        config (for internal use only).
+
+        Parameters
+        ----------
+        instance : `lsst.pex.config.Config`
+            The config instance that contains this field.
+
+        Returns
+        -------
+        state : object
+            Data like that returned by `_getState`, except that subconfigs
+            are included as `~lsst.pex.config.Config` objects, so that their
+            own (possibly cached) fingerprints are used.
+
+        Notes
+        -----
+        This method is invoked by the `lsst.pex.config.Config` object that
+        contains this field and should not be called directly.
+
+        Two values that compare equal must give the same state. The default
+        implementation returns `_getState`; fields that hold subconfigs must
+        override it.
+        """
+        return self._getState(instance)
+
+    def _setState(self, instance, state, at, label):
+        """Set the value of this field from data returned by `_getState` (for
+        internal use only).
+
+        Parameters
+        ----------
+        instance : `lsst.pex.config.Config`
+            The config instance that contains this field.
+        state : object
+            Data returned by `_getState`.
+        at : `list` of `lsst.pex.config.callStack.StackFrame`
+            The call stack to record in the history.
+        label : `str`
+            Event label for the history.
+
+        Notes
+        -----
+        This method is invoked by the `lsst.pex.config.Config` object that
+        contains this field and should not be called directly.
+
+        The value is only set (and recorded in the history) if it differs from
+        the current one.
+        """
+        if self._getState(instance) != state:
+            self.__set__(instance, state, at=at, label=label)
+
+    def _getChanges(self, instance, since):
+        """Get the changes to the value of this field as picklable data (for
+        internal use only).
+
+        Parameters
+        ----------
+        instance : `lsst.pex.config.Config`
+            The config instance that contains this field.
+        since : `int`
+            The point in time (see `lsst.pex.config.Config.checkpoint`) to get
+            the changes since; this field is known to have changed since.
+
+        Returns
+        -------
+        changes : object
+            Data that `_applyChanges` can apply to another config instance.
+
+        Notes
+        -----
+        This method is invoked by the `lsst.pex.config.Config` object that
+        contains this field and should not be called directly.
+
+        The default implementation returns the whole value, from `_getState`.
+        Fields that hold subconfigs should override this method and
+        `_applyChanges` to include only the subconfigs that changed.
+        """
+        return self._getState(instance)
+
+    def _applyChanges(self, instance, changes, at, label):
+        """Apply changes returned by `_getChanges` to this field (for internal
+        use only).
+
+        Parameters
+        ----------
+        instance : `lsst.pex.config.Config`
+            The config instance that contains this field.
+        changes : object
+            Data returned by `_getChanges`.
+        at : `list` of `lsst.pex.config.callStack.StackFrame`
+            The call stack to record in the history.
+        label : `str`
+            Event label for the history.
+
+        Notes
+        -----
+        This method is invoked by the `lsst.pex.config.Config` object that
+        contains this field and should not be called directly.
+        """
+        self._setState(instance, changes, at, label)
+
+    def _getDefinition(self):
+        """Describe the definition of this field, for the key of a cache of
+        loaded configs (for internal use only).
+
+        Returns
+        -------
+        description : `str`
+            A description of the type and default of the field.
+        configClasses : `list` of `lsst.pex.config.Config`-type
+            The config classes of the subconfigs that the field may hold.
+
+        Notes
+        -----
+        Fields that hold subconfigs must override this method.
+        """
+        return "%s %r" % (_typeStr(self), self.default), []
+
+    def _setFromDict(self, instance, value, at, label):
+        """Set the value of this field from the value returned by `toDict`
+        (for internal use only).
+
+        Parameters
+        ----------
+        instance : `lsst.pex.config.Config`
+            The config instance that contains this field.
+        value : object
+            A value like that returned by `toDict`.
+        at : `list` of `lsst.pex.config.callStack.StackFrame`
+            The call stack to record in the history.
+        label : `str`
+            Event label for the history.
+
+        Notes
+        -----
+        This method is invoked by the `lsst.pex.config.Config` object that
+        contains this field and should not be called directly.
+
+        The default implementation assigns the value, so it is validated, and
+        recorded in the history, once. Fields that hold subconfigs must
+        override this method.
+        """
+        self.__set__(instance, value, at=at, label=label)
+
     def _validateValue(self, value):
         """Validate a value.
 
@@ -402,40 +1000,121 @@ class Field:
             A config object that has this field defined on it
         imports : `set`
             Set of python modules that need imported after persistence
+
+        Notes
+        -----
+        Fields now add the modules they need to the set given to
+        ``_iterSave``; this method is only called when a subclass overrides
+        it.
         """
         pass
 
-    def save(self, outfile, instance):
-        """Save this field to a file (for internal use only).
+    def _iterNames(self, instance):
+        """Iterate over the names of this field and of the fields it contains,
+        relative to a config (for internal use only).
 
         Parameters
         ----------
-        outfile : file-like object
-            A writeable field handle.
-        instance : `Config`
-            The `Config` instance that contains this field.
+        instance : `lsst.pex.config.Config`
+            The config instance that contains this field.
+
+        Yields
+        ------
+        name : `str`
+            A field name, in the order in which `save` writes the field.
 
         Notes
         -----
-        This method is invoked by the `~lsst.pex.config.Config` object that
-        contains this field and should not be called directly.
+        This method must be overridden by fields that hold subconfigs.
+        """
+        yield self.name
+
+    def _iterSave(self, instance, fullname, imports, default=None, activeOnly=False, canonical=False):
+        """Iterate over the chunks of the Python code that reproduces this
+        field (for internal use only).
+
+        Parameters
+        ----------
+        instance : `lsst.pex.config.Config`
+            The config instance that contains this field.
+        fullname : `str`
+            The full name of this field in the saved config, as it should be
+            written to the output.
+        imports : `set`
+            Set of the names of the modules that the saved config needs to
+            import; fields that hold subconfigs or targets add to it.
+        default : `lsst.pex.config.Config`, optional
+            A config of the same class as ``instance`` that the output will
+            be applied to. If given, only what differs from it is written,
+            without comments.
+        activeOnly : `bool`, optional
+            If `True`, fields that hold a choice of subconfigs only write the
+            selected ones.
+        canonical : `bool`, optional
+            If `True`, the output must be the same for all equal values:
+            mappings are written in sorted order, and floats normalized.
+
+        Yields
+        ------
+        chunk : `str`
+            A piece of the output.
 
+        Notes
+        -----
         The output consists of the documentation string
         (`lsst.pex.config.Field.doc`) formatted as a Python comment. The second
         line is formatted as an assignment: ``{fullname}={value}``.
 
-        This output can be executed with Python.
+        This method must be overridden by fields that hold subconfigs.
         """
         value = self.__get__(instance)
-        fullname = _joinNamePath(instance._name, self.name)
-
-        # write full documentation string as comment lines (i.e. first character is #)
-        doc = "# " + str(self.doc).replace("\n", "\n# ")
-        if isinstance(value, float) and (math.isinf(value) or math.isnan(value)):
+        if default is None:
+            # write full documentation string as comment lines (i.e. first character is #)
+            doc = "# " + str(self.doc).replace("\n", "\n# ") + "\n"
+            end = "\n\n"
+        else:
+            state, defaultState = self._getState(instance), self._getState(default)
+            if state == defaultState:
+                return
+            if isinstance(state, float) and isinstance(defaultState, float) and \
+                    math.isnan(state) and math.isnan(defaultState):
+                return
+            doc = ""
+            end = "\n"
+        if canonical:
+            text = _canonicalRepr(self._getState(instance))
+        elif isinstance(value, float) and (math.isinf(value) or math.isnan(value)):
             # non-finite numbers need special care
-            outfile.write(u"{}\n{}=float('{!r}')\n\n".format(doc, fullname, value))
+            text = "float('{!r}')".format(value)
         else:
-            outfile.write(u"{}\n{}={!r}\n\n".format(doc, fullname, value))
+            text = repr(value)
+        yield "{}{}={}{}".format(doc, fullname, text, end)
+
+    def save(self, outfile, instance):
+        """Save this field to a file (for internal use only).
+
+        Parameters
+        ----------
+        outfile : file-like object
+            A writeable field handle.
+        instance : `Config`
+            The `Config` instance that contains this field.
+
+        Notes
+        -----
+        This method is invoked by the `~lsst.pex.config.Config` object that
+        contains this field and should not be called directly.
+
+        The output is produced by ``_iterSave``, which subclasses override.
+        Subclasses that override this method instead are still supported:
+        they are saved by calling it, with the names of the config and its
+        subconfigs set to those in the output, and always write their full
+        value.
+
+        This output can be executed with Python.
+        """
+        fullname = _joinNamePath(instance._name, self.name)
+        outfile.write("".join(self._iterSave(instance, fullname, set())))
 
     def toDict(self, instance):
         """Convert the field value so that it can be set as the value of an
@@ -526,7 +1205,7 @@ class Field:
         if instance._frozen:
             raise FieldValidationError(self, instance, "Cannot modify a frozen Config")
 
-        history = instance._history.setdefault(self.name, [])
+        history = _getFieldHistory(instance, self.name)
         if value is not None:
             value = _autocast(value, self.dtype)
             try:
@@ -535,9 +1214,12 @@ class Field:
                 raise FieldValidationError(self, instance, str(e))
 
         instance._storage[self.name] = value
-        if at is None:
-            at = getCallStack()
-        history.append((value, at, label))
+        instance._markChanged(self.name)
+        policy = _getHistoryPolicy(instance)
+        if policy.enabled:
+            if at is None:
+                at = policy.getCallStack()
+            history.append((value, at, label))
 
     def __delete__(self, instance, at=None, label='deletion'):
         """Delete an attribute from a `lsst.pex.config.Config` instance.
@@ -558,7 +1240,7 @@ class Field:
         should not be called directly.
         """
         if at is None:
-            at = getCallStack()
+            at = _getHistoryPolicy(instance).getCallStack()
         self.__set__(instance, None, at=at, label=label)
 
     def _compare(self, instance1, instance2, shortcut, rtol, atol, output):
@@ -572,7 +1254,7 @@ class Field:
         instance2 : `lsst.pex.config.Config`
             Right-hand side `Config` instance to compare.
         shortcut : `bool`, optional
-            **Unused.**
+            If `True`, return as soon as an inequality is found.
         rtol : `float`, optional
             Relative tolerance for floating point comparisons.
         atol : `float`, optional
@@ -583,61 +1265,121 @@ class Field:
 
         Notes
         -----
-        This method must be overridden by more complex `Field` subclasses.
+        The comparison itself is made by `_addComparisons`, which is the
+        method that more complex `Field` subclasses must override. Subclasses
+        that override this method instead are still supported: configs are
+        then compared by calling it for the field, and such a field's
+        floating point values are not compared with the others at once.
 
         See also
         --------
         lsst.pex.config.compareScalars
         """
+        comparison = _Comparison(shortcut=shortcut, rtol=rtol, atol=atol, output=output)
+        self._addComparisons(instance1, instance2, comparison)
+        return comparison.finish()
+
+    def _addComparisons(self, instance1, instance2, comparison):
+        """Compare two config instances with respect to this field, as part
+        of the comparison of configs (for internal use only).
+
+        Parameters
+        ----------
+        instance1 : `lsst.pex.config.Config`
+            Left-hand side `Config` instance to compare.
+        instance2 : `lsst.pex.config.Config`
+            Right-hand side `Config` instance to compare.
+        comparison : `lsst.pex.config.comparison._Comparison`
+            The comparison to add to.
+
+        Notes
+        -----
+        This method must be overridden by more complex `Field` subclasses.
+        Values are compared by ``comparison.compareScalars``, which compares
+        floating point values later, all at once, and subconfigs by
+        ``comparison.compareConfigs``. Implementations should return early if
+        ``comparison.done`` becomes `True`.
+        """
         v1 = getattr(instance1, self.name)
         v2 = getattr(instance2, self.name)
         name = getComparisonName(
             _joinNamePath(instance1._name, self.name),
             _joinNamePath(instance2._name, self.name)
         )
-        return compareScalars(name, v1, v2, dtype=self.dtype, rtol=rtol, atol=atol, output=output)
+        comparison.compareScalars(name, v1, v2, dtype=self.dtype)
+
+
+class _RecordingImportlib:
+    """Stand-in for the `importlib` module, given to the code executed by an
+    `ImportTracker`, whose `~importlib.import_module` records the names of
+    the modules it imports.
+    """
+
+    def __init__(self, modules):
+        self._modules = modules
+
+    def __getattr__(self, name):
+        return getattr(importlib, name)
 
+    def import_module(self, name, package=None):
+        module = importlib.import_module(name, package)
+        self._modules.add(module.__name__)
+        return module
 
-class RecordingImporter:
-    """Importer (for `sys.meta_path`) that records which modules are being
-    imported.
 
-    *This class does not do any importing itself.*
+class ImportTracker:
+    """Recorder of the modules imported by code run with `exec`.
 
     Examples
     --------
-    Use this class as a context manager to ensure it is properly uninstalled
-    when done:
+    Pass the globals made by the tracker to `exec`; only the imports made
+    by the executed code itself are recorded:
 
-    >>> with RecordingImporter() as importer:
-    ...     # import stuff
-    ...     import numpy as np
-    ... print("Imported: " + importer.getModules())
+    >>> tracker = ImportTracker()
+    >>> exec("import numpy as np", tracker.makeGlobals(), {})
+    >>> print(tracker.getModules())
+    {'numpy'}
+
+    Notes
+    -----
+    The executed code is given its own copy of the `builtins` namespace, in
+    which ``__import__`` records the module names before importing as usual.
+    Unlike an importer installed in `sys.meta_path`, this neither sees the
+    imports of other threads nor the imports made by the imported modules,
+    so any number of trackers can be used at once, and it also records
+    modules that were already imported. Imports of `importlib` get a
+    stand-in for it whose `~importlib.import_module` records the modules it
+    imports too.
     """
 
     def __init__(self):
         self._modules = set()
+        self._import = builtins.__import__
+        self._builtins = dict(builtins.__dict__, __import__=self._recordingImport)
+        self._importlib = _RecordingImportlib(self._modules)
+
+    def _recordingImport(self, name, globals=None, locals=None, fromlist=(), level=0):
+        module = self._import(name, globals, locals, fromlist, level)
+        if module is importlib:
+            module = self._importlib
+        if level == 0:
+            self._modules.add(name)
+            # "from package import module" imports a submodule
+            for item in fromlist or ():
+                subName = "%s.%s" % (name, item)
+                if subName in sys.modules:
+                    self._modules.add(subName)
+        return module
+
+    def makeGlobals(self):
+        """Make the globals in which to execute code.
 
-    def __enter__(self):
-        self.origMetaPath = sys.meta_path
-        sys.meta_path = [self] + sys.meta_path
-        return self
-
-    def __exit__(self, *args):
-        self.uninstall()
-        return False  # Don't suppress exceptions
-
-    def uninstall(self):
-        """Uninstall the importer.
-        """
-        sys.meta_path = self.origMetaPath
-
-    def find_module(self, fullname, path=None):
-        """Called as part of the ``import`` chain of events.
+        Returns
+        -------
+        globals : `dict`
+            A new globals dictionary that uses the recording builtins.
         """
-        self._modules.add(fullname)
-        # Return None because we don't do any importing.
-        return None
+        return {"__builtins__": self._builtins}
 
     def getModules(self):
         """Get the set of modules that were imported.
@@ -666,6 +1408,12 @@ class Config(metaclass=ConfigMeta):
     not subscriptable. Instead, access individual fields as attributes of the
     configuration instance.
 
+    Config classes that are instantiated often can set ``usePrototype =
+    True`` to copy later instances from the first one instead of setting the
+    defaults of their fields and calling `setDefaults` again (see
+    `usePrototype`). This is only correct if `setDefaults` does not read
+    external state, such as module globals, the environment or files.
+
     Examples
     --------
     Config classes are subclasses of ``Config`` that have
@@ -811,24 +1559,72 @@ class Config(metaclass=ConfigMeta):
         when or even the base ``Config.__init__`` should be called.
         """
         name = kw.pop("__name", None)
-        at = kw.pop("__at", getCallStack())
+        at = kw.pop("__at", None)
         # remove __label and ignore it
         kw.pop("__label", "default")
 
+        policy = _getHistoryPolicy(cls)
+        if at is None:
+            at = policy.getCallStack()
+        if not cls.usePrototype:
+            instance = cls._newDefault(name, at, policy)
+        elif cls._prototype is not None and (cls._prototype[1] or not policy.enabled) and \
+                _checkPrototypeDependencies(cls._prototype[0]):
+            dependencies, _, prototype = cls._prototype
+            _recordPrototypeDependencies(dependencies)
+            # the changes made by setDefaults are recorded as made here
+            instance = prototype._copy(name, history=at if policy.enabled else False)
+        else:
+            instance, dependencies = _makeWithDependencies(lambda: cls._newDefault(name, at, policy))
+            # subconfigs of classes that do not use prototypes must be made
+            # anew for every instance
+            if all(getattr(source, "usePrototype", True) for source, _ in dependencies.values()):
+                prototype = instance._copy(None, history=policy.enabled)
+                type.__setattr__(cls, "_prototype", (dependencies, policy.enabled, prototype))
+        # set constructor overides
+        instance.update(__at=at, **kw)
+        return instance
+
+    @classmethod
+    def _newDefault(cls, name, at, policy):
+        """Make an instance with the defaults of its fields, and call its
+        `setDefaults` (for internal use only).
+        """
+        _recordPrototypeDependency(cls)
         instance = object.__new__(cls)
         instance._frozen = False
         instance._name = name
         instance._storage = {}
         instance._history = {}
         instance._imports = set()
-        # load up defaults
-        for field in instance._fields.values():
-            instance._history[field.name] = []
-            field.__set__(instance, field.default, at=at + [field.source], label="default")
+        instance._parent = None
+        instance._changed = {}
+        instance._baseline = 0
+        instance._fingerprint = None
+        instance._dictCache = None
+        # load up defaults; their history is the same for every instance, so
+        # it is recorded for the first instance and shared by the others
+        if policy.enabled and cls._defaultHistory is None:
+            for field in instance._fields.values():
+                instance._history[field.name] = policy.makeHistory()
+                field.__set__(instance, field.default, at=LazyCallStack([field.source]), label="default")
+            type.__setattr__(cls, "_defaultHistory", {k: tuple(v) for k, v in instance._history.items()})
+        else:
+            instance.__dict__["historyPolicy"] = _noHistoryPolicy
+            try:
+                for field in instance._fields.values():
+                    field.__set__(instance, field.default, at=at, label="default")
+            finally:
+                del instance.__dict__["historyPolicy"]
+            if policy.enabled:
+                instance._history = dict(cls._defaultHistory)
+            else:
+                instance._history = {k: policy.makeHistory() for k in instance._fields}
         # set custom default-overides
         instance.setDefaults()
-        # set constructor overides
-        instance.update(__at=at, **kw)
+        # changes made while building the config are not changes since any
+        # checkpoint
+        instance._baseline = _changeStamp
         return instance
 
     def __reduce__(self):
@@ -836,12 +1632,12 @@ class Config(metaclass=ConfigMeta):
 
         We need to condense and reconstitute the `~lsst.pex.config.Config`,
         since it may contain lambdas (as the ``check`` elements) that cannot
-        be pickled.
+        be pickled. The config is reduced to its class and the values of its
+        fields as plain data (see `lsst.pex.config.Field._getState`), which is
+        much faster to pickle and unpickle than the Python code written by
+        `saveToStream`.
         """
-        # The stream must be in characters to match the API but pickle requires bytes
-        stream = io.StringIO()
-        self.saveToStream(stream)
-        return (unreduceConfig, (self.__class__, stream.getvalue().encode()))
+        return (unreduceConfig, (self.__class__, self._getState()))
 
     def setDefaults(self):
         """Subclass hook for computing defaults.
@@ -906,8 +1702,10 @@ class Config(metaclass=ConfigMeta):
         fieldB: True
         fieldC: 'Updated!'
         """
-        at = kw.pop("__at", getCallStack())
+        at = kw.pop("__at", None)
         label = kw.pop("__label", "update")
+        if at is None:
+            at = _getHistoryPolicy(self).getCallStack()
 
         for name, value in kw.items():
             try:
@@ -946,10 +1744,119 @@ class Config(metaclass=ConfigMeta):
         lsst.pex.config.Config.loadFromStream
         lsst.pex.config.Config.save
         lsst.pex.config.Config.saveFromStream
+
+        Notes
+        -----
+        The compiled file is stored in the code cache of
+        `lsst.pex.config.codeCache`, if one has been set up, and reused by
+        later calls in this and other processes while the file is unchanged.
+        """
+        self.loadOverrides([filename], root=root)
+
+    def loadOverrides(self, filenames=(), overrides=(), root="config"):
+        """Modify this config in place by executing configuration files, then
+        setting fields.
+
+        Parameters
+        ----------
+        filenames : iterable of `str`, optional
+            Names of the configuration files to load (see `load`), in order.
+        overrides : iterable of `tuple`, optional
+            ``(name, value)`` pairs, applied in order after the files, where
+            ``name`` is the dotted name of a field relative to this config,
+            such as ``"a.b"``.
+        root : `str`, optional
+            Name of the variable in the files that refers to the config being
+            overridden.
+
+        See also
+        --------
+        lsst.pex.config.Config.load
+
+        Notes
+        -----
+        If a cache has been set up in `lsst.pex.config.stateCache`, the
+        changes that the overrides make (see `diffSince`) are stored in it,
+        under a hash of:
+
+        - the class and `fingerprint` of this config before the overrides;
+        - the fields of its class and of all the config classes that it may
+          hold, including the contents of registries;
+        - the paths and contents of the files, and the overrides.
+
+        The paths and hashes of the contents of the files that the files load
+        in turn, with `load` or `loadOverrides`, are stored with the changes.
+        When the same overrides are loaded again onto an equal config, in this
+        or another process, and those files are unchanged, the modules they
+        imported are imported and the changes are applied directly (recorded
+        in the history with the label ``"loadOverrides"``), without executing
+        the files.
+
+        Anything else that the files depend on is not checked: overrides that
+        compute values from imported modules, from the environment, or from
+        files they read by other means must not be loaded with a cache.
         """
-        with open(filename, "r") as f:
-            code = compile(f.read(), filename=filename, mode="exec")
-            self.loadFromStream(stream=code, root=root)
+        filenames = list(filenames)
+        overrides = list(overrides)
+        cache = stateCache.getCache()
+        recording = bool(getattr(_loadedFiles, "stack", None))
+        if cache is None and not recording:
+            self._loadOverrides(filenames, overrides, root)
+            return
+
+        hasher = hashlib.sha256(("%s\0%s\0%s\0" % (_typeStr(self), root, self.fingerprint())).encode())
+        _hashDefinitions(type(self), hasher, set())
+        files = {}
+        for filename in filenames:
+            with open(filename, "rb") as f:
+                contents = f.read()
+            path = os.path.abspath(filename)
+            files[path] = hashlib.sha256(contents).hexdigest()
+            hasher.update(("%s\0%d\0" % (path, len(contents))).encode())
+            hasher.update(contents)
+        hasher.update(repr(overrides).encode())
+        key = hasher.hexdigest()
+        # a load in progress depends on these files too
+        _recordLoadedFiles(files)
+        if cache is None:
+            self._loadOverrides(filenames, overrides, root)
+            return
+
+        cached = cache.get(key)
+        if cached is not None:
+            nestedFiles, imports, changes = cached
+            if _checkLoadedFiles(nestedFiles):
+                _recordLoadedFiles(nestedFiles)
+                for module in imports:
+                    importlib.import_module(module)
+                self._imports.update(imports)
+                at = _getHistoryPolicy(self).getCallStack()
+                self._applyChanges(changes, at, "loadOverrides")
+                return
+
+        checkpoint = self.checkpoint()
+        oldImports = set(self._imports)
+        nestedFiles = {}
+        stack = _loadedFiles.__dict__.setdefault("stack", [])
+        stack.append(nestedFiles)
+        try:
+            self._loadOverrides(filenames, overrides, root)
+        finally:
+            stack.pop()
+        cache.put(key, (nestedFiles, sorted(self._imports - oldImports), self._diffSince(checkpoint)))
+
+    def _loadOverrides(self, filenames, overrides, root):
+        """Execute configuration files, then set fields (for internal use
+        only).
+        """
+        for filename in filenames:
+            self.loadFromStream(stream=compileFile(filename), root=root)
+        for name, value in overrides:
+            *path, fieldName = name.split(".")
+            config = self
+            for pathName in path:
+                config = getattr(config, pathName)
+            setattr(config, fieldName, value)
 
     def loadFromStream(self, stream, root="config", filename=None):
         """Modify this Config in place by executing the Python code in the
@@ -984,28 +1891,107 @@ class Config(metaclass=ConfigMeta):
         lsst.pex.config.Config.save
         lsst.pex.config.Config.saveFromStream
         """
-        with RecordingImporter() as importer:
-            try:
-                local = {root: self}
-                exec(stream, {}, local)
-            except NameError as e:
-                if root == "config" and "root" in e.args[0]:
+        importer = ImportTracker()
+        try:
+            local = {root: self}
+            exec(stream, importer.makeGlobals(), local)
+        except NameError as e:
+            if root == "config" and "root" in e.args[0]:
+                if filename is None:
+                    # try to determine the file name; a compiled string has attribute "co_filename",
+                    # an open file has attribute "name", else give up
+                    filename = getattr(stream, "co_filename", None)
                     if filename is None:
-                        # try to determine the file name; a compiled string has attribute "co_filename",
-                        # an open file has attribute "name", else give up
-                        filename = getattr(stream, "co_filename", None)
-                        if filename is None:
-                            filename = getattr(stream, "name", "?")
-                    print(f"Config override file {filename!r}"
-                          " appears to use 'root' instead of 'config'; trying with 'root'", file=sys.stderr)
-                    local = {"root": self}
-                    exec(stream, {}, local)
-                else:
-                    raise
+                        filename = getattr(stream, "name", "?")
+                print(f"Config override file {filename!r}"
+                      " appears to use 'root' instead of 'config'; trying with 'root'", file=sys.stderr)
+                local = {"root": self}
+                exec(stream, importer.makeGlobals(), local)
+            else:
+                raise
 
         self._imports.update(importer.getModules())
 
-    def save(self, filename, root="config"):
+    def loadFromDict(self, dict_):
+        """Modify this config in place by setting the values of its fields
+        from a dictionary.
+
+        Parameters
+        ----------
+        dict_ : `dict`
+            Dictionary with keys that are `~lsst.pex.config.Field` names, and
+            values like those returned by `toDict`. Fields that are not in the
+            dictionary keep their values.
+
+        Raises
+        ------
+        KeyError
+            Raised if there is no field of a given name.
+
+        See also
+        --------
+        lsst.pex.config.Config.loadFromJson
+        lsst.pex.config.Config.toDict
+
+        Notes
+        -----
+        This is the inverse of `toDict`, and an alternative to `load` for
+        overrides that only assign values: no code is executed and no imports
+        are made. Each field that is set is validated and recorded in the
+        history once, with the label ``"loadFromDict"``.
+
+        For `~lsst.pex.config.ConfigChoiceField` and
+        `~lsst.pex.config.RegistryField` fields, the ``"name"`` (or
+        ``"names"``) and ``"values"`` items are both optional.
+        `~lsst.pex.config.ConfigurableField` fields cannot be retargeted this
+        way.
+        """
+        at = _getHistoryPolicy(self).getCallStack()
+        self._loadFromDict(dict_, at, "loadFromDict")
+
+    def _loadFromDict(self, dict_, at, label):
+        """Set the values of fields from a dictionary like that returned by
+        `toDict` (for internal use only).
+
+        See also
+        --------
+        lsst.pex.config.Field._setFromDict
+        """
+        for name, value in dict_.items():
+            try:
+                field = self._fields[name]
+            except KeyError:
+                raise KeyError("No field of name %s exists in config type %s" % (name, _typeStr(self)))
+            field._setFromDict(self, value, at, label)
+
+    def loadFromJson(self, stream):
+        """Modify this config in place by setting the values of its fields
+        from JSON.
+
+        Parameters
+        ----------
+        stream : file-like object or `str`
+            Stream or string containing a JSON object, with the same structure
+            as the dictionary taken by `loadFromDict`.
+
+        See also
+        --------
+        lsst.pex.config.Config.loadFromDict
+
+        Notes
+        -----
+        Keys of JSON objects are always strings, so only
+        `~lsst.pex.config.DictField` and `~lsst.pex.config.ConfigDictField`
+        fields with `str` keys can be set this way.
+        """
+        if isinstance(stream, str):
+            dict_ = json.loads(stream)
+        else:
+            dict_ = json.load(stream)
+        at = _getHistoryPolicy(self).getCallStack()
+        self._loadFromDict(dict_, at, "loadFromJson")
+
+    def save(self, filename, root="config", minimal=False, activeOnly=False, canonical=False):
         """Save a Python script to the named file, which, when loaded,
         reproduces this config.
 
@@ -1016,6 +2002,25 @@ class Config(metaclass=ConfigMeta):
         root : `str`, optional
             Name to use for the root config variable. The same value must be
             used when loading (see `lsst.pex.config.Config.load`).
+        minimal : `bool`, optional
+            If `True`, only write the fields whose values differ from those
+            of a newly constructed config of the same class (including the
+            retargets and registry selections needed to reproduce them),
+            without the documentation of the fields. Such a file reproduces
+            this config only when it is loaded into a new config.
+        activeOnly : `bool`, optional
+            If `True`, only write the selected subconfigs of
+            `~lsst.pex.config.ConfigChoiceField` and
+            `~lsst.pex.config.RegistryField` fields; the others are left
+            with their defaults when the file is loaded.
+        canonical : `bool`, optional
+            If `True`, equal configs are always saved to identical files:
+            the entries of dictionaries and the subconfigs of choice and
+            registry fields are written in sorted order, and floats are
+            normalized (``-0.0`` is written as ``0.0``, and non-finite
+            values as calls to `float`, also in lists and dictionaries).
+            Subconfigs of choice and registry fields that have their default
+            values are left out, whether or not they have been made.
 
         See also
         --------
@@ -1025,7 +2030,7 @@ class Config(metaclass=ConfigMeta):
         """
         d = os.path.dirname(filename)
         with tempfile.NamedTemporaryFile(mode="w", delete=False, dir=d) as outfile:
-            self.saveToStream(outfile, root)
+            self.saveToStream(outfile, root, minimal, activeOnly, canonical)
             # tempfile is hardcoded to create files with mode '0600'
             # for an explantion of these antics see:
             # https://stackoverflow.com/questions/10291131/how-to-use-os-umask-in-python
@@ -1037,7 +2042,7 @@ class Config(metaclass=ConfigMeta):
             # os.rename may not work across filesystems
             shutil.move(outfile.name, filename)
 
-    def saveToStream(self, outfile, root="config"):
+    def saveToStream(self, outfile, root="config", minimal=False, activeOnly=False, canonical=False):
         """Save a configuration file to a stream, which, when loaded,
         reproduces this config.
 
@@ -1049,6 +2054,15 @@ class Config(metaclass=ConfigMeta):
         root
             Name to use for the root config variable. The same value must be
             used when loading (see `lsst.pex.config.Config.load`).
+        minimal : `bool`, optional
+            If `True`, only write what differs from a newly constructed
+            config (see `lsst.pex.config.Config.save`).
+        activeOnly : `bool`, optional
+            If `True`, only write the selected subconfigs of fields that hold
+            a choice of subconfigs (see `lsst.pex.config.Config.save`).
+        canonical : `bool`, optional
+            If `True`, write equal configs identically (see
+            `lsst.pex.config.Config.save`).
 
         See also
         --------
@@ -1056,25 +2070,56 @@ class Config(metaclass=ConfigMeta):
         lsst.pex.config.Config.load
         lsst.pex.config.Config.loadFromStream
         """
-        tmp = self._name
-        self._rename(root)
-        try:
-            self._collectImports()
-            # Remove self from the set, as it is handled explicitly below
-            self._imports.remove(self.__module__)
-            configType = type(self)
-            typeString = _typeStr(configType)
-            outfile.write(u"import {}\n".format(configType.__module__))
-            outfile.write(u"assert type({})=={}, 'config is of type %s.%s ".format(root, typeString))
-            outfile.write(u"instead of {}' % (type({}).__module__, type({}).__name__)\n".format(typeString,
-                                                                                                root,
-                                                                                                root))
-            for imp in self._imports:
-                if imp in sys.modules and sys.modules[imp] is not None:
-                    outfile.write(u"import {}\n".format(imp))
-            self._save(outfile)
-        finally:
-            self._rename(tmp)
+        outfile.write("".join(self.iterSave(root, minimal, activeOnly, canonical)))
+
+    def iterSave(self, root="config", minimal=False, activeOnly=False, canonical=False):
+        """Iterate over the chunks of a configuration file which, when loaded,
+        reproduces this config.
+
+        Parameters
+        ----------
+        root : `str`, optional
+            Name to use for the root config variable. The same value must be
+            used when loading (see `lsst.pex.config.Config.load`).
+        minimal : `bool`, optional
+            If `True`, only write what differs from a newly constructed
+            config (see `lsst.pex.config.Config.save`).
+        activeOnly : `bool`, optional
+            If `True`, only write the selected subconfigs of fields that hold
+            a choice of subconfigs (see `lsst.pex.config.Config.save`).
+        canonical : `bool`, optional
+            If `True`, write equal configs identically (see
+            `lsst.pex.config.Config.save`).
+
+        Yields
+        ------
+        chunk : `str`
+            A piece of the configuration file; joined together, the chunks are
+            what `lsst.pex.config.Config.saveToStream` writes.
+
+        Notes
+        -----
+        The config is traversed once: the body of the file is gathered along
+        with the modules it needs, which are imported at the top of the file.
+
+        See also
+        --------
+        lsst.pex.config.Config.saveToStream
+        """
+        imports = set()
+        default = type(self)() if minimal else None
+        body = list(self._iterSave(root, imports, default, activeOnly, canonical))
+        # Remove self from the set, as it is handled explicitly below
+        imports.discard(self.__module__)
+        configType = type(self)
+        typeString = _typeStr(configType)
+        yield "import {}\n".format(configType.__module__)
+        yield "assert type({})=={}, 'config is of type %s.%s ".format(root, typeString)
+        yield "instead of {}' % (type({}).__module__, type({}).__name__)\n".format(typeString, root, root)
+        for imp in sorted(imports):
+            if imp in sys.modules and sys.modules[imp] is not None:
+                yield "import {}\n".format(imp)
+        yield from body
 
     def freeze(self):
         """Make this config, and all subconfigs, read-only.
@@ -1082,29 +2127,365 @@ class Config(metaclass=ConfigMeta):
         self._frozen = True
         for field in self._fields.values():
             field.freeze(self)
+        self.fingerprint()
+
+    def fingerprint(self):
+        """Compute a hash of the content of this config.
+
+        Returns
+        -------
+        fingerprint : `str`
+            Hexadecimal SHA-256 digest of a canonical encoding of the class
+            of this config and the values of all its fields, including those
+            of subconfigs, the targets of `~lsst.pex.config.ConfigurableField`
+            fields and the selections of `~lsst.pex.config.RegistryField` and
+            `~lsst.pex.config.ConfigChoiceField` fields.
+
+        Notes
+        -----
+        Configs that are equal have the same fingerprint, whichever way they
+        were built, and it does not change between processes. Unselected
+        choices that have their default values do not contribute to it.
+
+        The fingerprint is cached until the config changes, and only the
+        subconfigs that have changed since are hashed again. `freeze`
+        computes it for the frozen config, which uses it as its `hash` and to
+        compare equal to other frozen configs. Configs that are not frozen
+        compare their fields instead, with NaNs equal to each other as in
+        fingerprints. The two are meant to agree, but fields whose values
+        compare with ``==`` differently from how they are fingerprinted can
+        still make them differ.
+        """
+        fingerprint = self._fingerprint
+        if fingerprint is None:
+            fingerprint = self.__dict__["_fingerprint"] = self._computeFingerprint()
+        return fingerprint
+
+    def _computeFingerprint(self):
+        """Compute the fingerprint of this config without using the cached
+        one (for internal use only).
+
+        See also
+        --------
+        lsst.pex.config.Field._getFingerprintState
+        """
+        chunks = [b"C", _typeStr(self).encode()]
+        for name in sorted(self._fields):
+            _encodeFingerprintState(name, chunks)
+            _encodeFingerprintState(self._fields[name]._getFingerprintState(self), chunks)
+        return hashlib.sha256(b"".join(chunks)).hexdigest()
+
+    @classmethod
+    def _getDefaultFingerprint(cls):
+        """Get the fingerprint of a default-constructed instance of this
+        class, cached until a config class or registry it is made from changes
+        (for internal use only).
+        """
+        cached = cls.__dict__.get("_defaultFingerprint")
+        if cached is None or not _checkPrototypeDependencies(cached[0]):
+            config, dependencies = _makeWithDependencies(cls)
+            cached = (dependencies, config._computeFingerprint())
+            type.__setattr__(cls, "_defaultFingerprint", cached)
+        return cached[1]
+
+    def checkpoint(self):
+        """Mark a point in time to look for changes since.
+
+        Returns
+        -------
+        checkpoint : `int`
+            An opaque value to pass to `changedFields`; checkpoints taken
+            later compare greater.
+
+        Examples
+        --------
+        >>> from lsst.pex.config import Config, Field
+        >>> class DemoConfig(Config):
+        ...     a = Field(doc="An integer field", dtype=int, default=1)
+        ...     b = Field(doc="Another integer field", dtype=int, default=2)
+        ...
+        >>> config = DemoConfig()
+        >>> checkpoint = config.checkpoint()
+        >>> config.b = 3
+        >>> config.changedFields(checkpoint)
+        {'b'}
+        """
+        return _changeStamp
 
-    def _save(self, outfile):
-        """Save this config to an open stream object.
+    def changedFields(self, checkpoint):
+        """Get the names of the fields that have been set or modified since a
+        checkpoint.
 
         Parameters
         ----------
-        outfile : file-like object
-            Destination file object write the config into. Accepts strings not
-            bytes.
+        checkpoint : `int`
+            A value returned by `checkpoint`.
+
+        Returns
+        -------
+        names : `set` of `str`
+            Names of the fields of this config that changed. A field that
+            holds subconfigs or a container changed if anything in it did.
+
+        Notes
+        -----
+        Setting a field counts as a change even if the value is the same.
+        Changes made while the config (or the config that holds it) was being
+        constructed, including by `setDefaults`, are not counted.
+        """
+        since = max(checkpoint, self._getBaseline())
+        return {name for name, stamp in self._changed.items() if stamp > since}
+
+    def diffSince(self, checkpoint):
+        """Get the changes made to this config since a checkpoint.
+
+        Parameters
+        ----------
+        checkpoint : `int`
+            A value returned by `checkpoint`.
+
+        Returns
+        -------
+        changes : `dict`
+            Picklable description of the new values of the fields that changed
+            (see `changedFields`), to pass to `applyChanges`. Subconfigs are
+            described by their own changes, unless they were made since the
+            checkpoint.
+
+        Notes
+        -----
+        Only the fields that changed are visited, so the cost depends on the
+        number of changes rather than on the size of the config. The changes
+        can be applied to any config of the same class.
+
+        Examples
+        --------
+        >>> from lsst.pex.config import Config, Field
+        >>> class DemoConfig(Config):
+        ...     a = Field(doc="An integer field", dtype=int, default=1)
+        ...     b = Field(doc="Another integer field", dtype=int, default=2)
+        ...
+        >>> config = DemoConfig()
+        >>> checkpoint = config.checkpoint()
+        >>> config.b = 3
+        >>> other = DemoConfig()
+        >>> other.a = 4
+        >>> other.applyChanges(config.diffSince(checkpoint))
+        >>> other.a, other.b
+        (4, 3)
+        """
+        return self._diffSince(max(checkpoint, self._getBaseline()))
+
+    def applyChanges(self, changes):
+        """Apply changes made to another config of the same class.
+
+        Parameters
+        ----------
+        changes : `dict`
+            Changes returned by `diffSince`.
+
+        Notes
+        -----
+        The fields that changed are set to their new values, and recorded in
+        the history with the label ``"applyChanges"``; other fields keep
+        their values.
+        """
+        at = _getHistoryPolicy(self).getCallStack()
+        self._applyChanges(changes, at, "applyChanges")
+
+    def _diffSince(self, since):
+        """Get the changes to the fields of this config since a point in time
+        (for internal use only).
+
+        See also
+        --------
+        lsst.pex.config.Field._getChanges
+        """
+        return {name: self._fields[name]._getChanges(self, since)
+                for name, stamp in self._changed.items() if stamp > since}
+
+    def _applyChanges(self, changes, at, label):
+        """Apply changes returned by `_diffSince` (for internal use only).
+
+        See also
+        --------
+        lsst.pex.config.Field._applyChanges
+        """
+        for name, fieldChanges in changes.items():
+            self._fields[name]._applyChanges(self, fieldChanges, at, label)
+
+    def _getChanges(self, since):
+        """Get the changes to this subconfig since a point in time (for
+        internal use only).
+
+        Returns
+        -------
+        changes : `tuple`
+            ``(True, state)`` with the whole state of this config (see
+            `_getState`) if it was made since then, or ``(False, changes)``
+            with the changes to its fields (see `_diffSince`) otherwise.
+        """
+        if self._baseline > since:
+            return (True, self._getState())
+        return (False, self._diffSince(since))
+
+    def _setChanges(self, changes, at, label):
+        """Apply changes returned by `_getChanges` (for internal use only).
+        """
+        replace, data = changes
+        if replace:
+            self._setState(data, at, label)
+        else:
+            self._applyChanges(data, at, label)
+
+    def _getBaseline(self):
+        """Get the latest point in time at which this config or one that holds
+        it was constructed (for internal use only).
+        """
+        baseline = self._baseline
+        parent = self._parent
+        while parent is not None:
+            baseline = max(baseline, parent[0]._baseline)
+            parent = parent[0]._parent
+        return baseline
+
+    def _attach(self, parent, name, changed=True):
+        """Make this config a subconfig held by a field of another config (for
+        internal use only).
+
+        Parameters
+        ----------
+        parent : `lsst.pex.config.Config`
+            The config that holds this one.
+        name : `str`
+            Name of the field of ``parent`` that holds this config.
+        changed : `bool`, optional
+            Whether attaching this config is a change to ``parent``; `False`
+            for subconfigs that are made with their defaults when they are
+            first read.
+
+        Notes
+        -----
+        Changes to this config are also recorded as changes to that field of
+        ``parent``, as is attaching it unless ``changed`` is `False`. Changes
+        made to this config before it was attached count as part of its
+        construction.
         """
+        self.__dict__["_parent"] = (parent, name)
+        if changed:
+            parent._markChanged(name)
+        else:
+            # Only the result of toDict, which includes every subconfig that
+            # exists, is out of date.
+            config = parent
+            while config is not None:
+                config.__dict__["_dictCache"] = None
+                config = config._parent and config._parent[0]
+        self.__dict__["_baseline"] = _changeStamp
+
+    def _markChanged(self, name):
+        """Record that a field of this config has changed (for internal use
+        only).
+
+        Parameters
+        ----------
+        name : `str`
+            Name of the field that changed.
+
+        Notes
+        -----
+        Fields call this whenever their value, or anything in it, changes. It
+        discards the cached fingerprint and `toDict` result of this config and
+        of every config that holds it, and marks the fields that hold it as
+        changed too.
+        """
+        global _changeStamp
+        _changeStamp += 1
+        config = self
+        while True:
+            d = config.__dict__
+            d["_changed"][name] = _changeStamp
+            d["_fingerprint"] = None
+            d["_dictCache"] = None
+            parent = d["_parent"]
+            if parent is None:
+                break
+            config, name = parent
+
+    def _iterSave(self, name, imports, default=None, activeOnly=False, canonical=False):
+        """Iterate over the chunks of the Python code that reproduces the
+        fields of this config.
+
+        Parameters
+        ----------
+        name : `str`
+            The full name of this config in the saved config.
+        imports : `set`
+            Set of the names of the modules that the saved config needs to
+            import; the modules this config needs are added to it.
+        default : `lsst.pex.config.Config`, optional
+            A config of the same class that the output will be applied to;
+            if given, only the fields that differ from it are written.
+        activeOnly : `bool`, optional
+            If `True`, only the selected subconfigs of fields that hold a
+            choice of subconfigs are written.
+        canonical : `bool`, optional
+            If `True`, the output is the same for all equal configs.
+
+        Yields
+        ------
+        chunk : `str`
+            A piece of the output.
+        """
+        imports.add(self.__module__)
+        imports |= self._imports
         for field in self._fields.values():
+            if type(field)._collectImports is not Field._collectImports:
+                field._collectImports(self, imports)
+            if type(field).save is not Field.save:
+                yield self._saveField(field, name)
+            else:
+                yield from field._iterSave(self, _joinNamePath(name, field.name), imports, default,
+                                           activeOnly, canonical)
+
+    def _saveField(self, field, name):
+        """Save a field whose class overrides `Field.save` (for internal use
+        only).
+
+        Parameters
+        ----------
+        field : `lsst.pex.config.Field`
+            The field to save.
+        name : `str`
+            The full name of this config in the saved config.
+
+        Returns
+        -------
+        text : `str`
+            The output of the ``save`` method of the field.
+        """
+        oldName = self._name
+        self._rename(name)
+        try:
+            outfile = io.StringIO()
             field.save(outfile, self)
+        finally:
+            self._rename(oldName)
+        return outfile.getvalue()
 
     def _collectImports(self):
         """Adds module containing self to the list of things to import and
-        then loops over all the fields in the config calling a corresponding
-        collect method. The field method will call _collectImports on any configs
-        it may own and return the set of things to import. This returned set
-        will be merged with the set of imports for this config class.
+        then adds the modules that its fields need.
+
+        Notes
+        -----
+        This is only used by `Field` subclasses that override
+        ``Field._collectImports``; saving collects the imports itself.
         """
-        self._imports.add(self.__module__)
-        for name, field in self._fields.items():
-            field._collectImports(self, self._imports)
+        imports = set()
+        for _ in self._iterSave(self._name, imports):
+            pass
+        self._imports |= imports
 
     def toDict(self):
         """Make a dictionary of field names and their values.
@@ -1124,11 +2505,17 @@ class Config(metaclass=ConfigMeta):
         This method uses the `~lsst.pex.config.Field.toDict` method of
         individual fields. Subclasses of `~lsst.pex.config.Field` may need to
         implement a ``toDict`` method for *this* method to work.
+
+        The result is cached until the config changes, so converting a
+        config again only converts the subconfigs that have changed since.
         """
-        dict_ = {}
-        for name, field in self._fields.items():
-            dict_[name] = field.toDict(self)
-        return dict_
+        dict_ = self._dictCache
+        if dict_ is None:
+            dict_ = {}
+            for name, field in self._fields.items():
+                dict_[name] = field.toDict(self)
+            self.__dict__["_dictCache"] = dict_
+        return _copyDict(dict_)
 
     def names(self):
         """Get all the field names in the config, recursively.
@@ -1137,28 +2524,166 @@ class Config(metaclass=ConfigMeta):
         -------
         names : `list` of `str`
             Field names.
+
+        See also
+        --------
+        lsst.pex.config.Config.iterNames
+        """
+        return list(self.iterNames())
+
+    def iterNames(self):
+        """Iterate over all the field names in the config, recursively.
+
+        Yields
+        ------
+        name : `str`
+            A field name, relative to this config, such as ``"a.b"`` or
+            ``"c['key'].d"``. The names are in the order in which the fields
+            are saved.
+
+        Notes
+        -----
+        The names are generated as the fields are walked, so that a caller
+        that only needs the first few names does not walk the whole config.
+        """
+        for field in self._fields.values():
+            yield from field._iterNames(self)
+
+    def copy(self, history=True):
+        """Make a copy of this config.
+
+        Parameters
+        ----------
+        history : `bool`, optional
+            If `True` (the default), the copy starts with the history of this
+            config; otherwise its history starts out empty.
+
+        Returns
+        -------
+        config : `lsst.pex.config.Config`
+            A new config of the same class, with a copy of every field value
+            (including subconfigs). The copy is not frozen, even if this
+            config is.
+
+        Notes
+        -----
+        Unlike pickling, this does not save and reload the config, and unlike
+        a generic `copy.deepcopy`, it neither validates the values again nor
+        copies the recorded call stacks: the history events recorded so far
+        are shared by both configs.
+
+        Examples
+        --------
+        >>> from lsst.pex.config import Config, Field
+        >>> class DemoConfig(Config):
+        ...     intField = Field(doc="An integer field", dtype=int, default=42)
+        ...
+        >>> config = DemoConfig()
+        >>> variant = config.copy()
+        >>> variant.intField = 7
+        >>> config.intField
+        42
         """
-        #
-        # Rather than sort out the recursion all over again use the
-        # pre-existing saveToStream()
-        #
-        with io.StringIO() as strFd:
-            self.saveToStream(strFd, "config")
-            contents = strFd.getvalue()
-            strFd.close()
-        #
-        # Pull the names out of the dumped config
-        #
-        keys = []
-        for line in contents.split("\n"):
-            if re.search(r"^((assert|import)\s+|\s*$|#)", line):
-                continue
-
-            mat = re.search(r"^(?:config\.)?([^=]+)\s*=\s*.*", line)
-            if mat:
-                keys.append(mat.group(1))
-
-        return keys
+        return self._copy(self._name, history=bool(history))
+
+    def __deepcopy__(self, memo):
+        """Deep-copy this config with `copy`, keeping it frozen if this
+        config is frozen.
+        """
+        other = self._copy(self._name)
+        if self._frozen:
+            other.freeze()
+        memo[id(self)] = other
+        return other
+
+    def _copy(self, name, history=True, parent=None):
+        """Copy this config without validating it (for internal use only).
+
+        Parameters
+        ----------
+        name : `str` or `None`
+            Name of the copy in its parent `~lsst.pex.config.Config`.
+        history : `bool` or `list` of `~lsst.pex.config.callStack.StackFrame`
+            If `True`, the copy starts with the history of this config;
+            otherwise its history starts out empty. A call stack is like
+            `True`, except that the events that follow the default events of
+            the class, which were recorded by `setDefaults` when a prototype
+            was built, are recorded again with that stack.
+        parent : `tuple`, optional
+            The `~lsst.pex.config.Config` that holds the copy and the name of
+            the field it is in (see `_attach`), or `None` if the copy is not a
+            subconfig.
+
+        Returns
+        -------
+        config : `lsst.pex.config.Config`
+            A new, unfrozen config of the same class with the same values.
+
+        Notes
+        -----
+        This method uses the ``_copy`` method of individual
+        `lsst.pex.config.Field` instances. The events recorded so far are
+        shared with the copy rather than copied. The copy has no changes
+        since any checkpoint, and starts with the cached fingerprint and
+        `toDict` result of this config.
+
+        See also
+        --------
+        lsst.pex.config.Field._copy
+        """
+        stack = None if isinstance(history, bool) else history
+        if history is not False:
+            otherHistory = {k: v if isinstance(v, tuple) else tuple(v) for k, v in self._history.items()}
+            if stack is not None:
+                defaultHistory = type(self)._defaultHistory or {}
+                for k, events in otherHistory.items():
+                    n = len(defaultHistory.get(k, ()))
+                    if len(events) > n:
+                        otherHistory[k] = events[:n] + tuple((e[0], stack, e[2]) for e in events[n:])
+        else:
+            otherHistory = dict.fromkeys(self._fields, ())
+        other = object.__new__(type(self))
+        other.__dict__.update(self.__dict__, _frozen=False, _name=name, _storage={},
+                              _history=otherHistory, _imports=set(self._imports),
+                              _parent=parent, _changed={}, _baseline=0)
+        for field in self._fields.values():
+            field._copy(self, other, history)
+        return other
+
+    def _getState(self):
+        """Get the values of all fields as picklable data (for internal use
+        only).
+
+        Returns
+        -------
+        state : `dict`
+            Mapping of field name to the state of each field.
+
+        See also
+        --------
+        lsst.pex.config.Field._getState
+        """
+        return {name: field._getState(self) for name, field in self._fields.items()}
+
+    def _setState(self, state, at, label):
+        """Set the values of fields from data returned by `_getState` (for
+        internal use only).
+
+        Parameters
+        ----------
+        state : `dict`
+            Mapping of field name to the state of each field.
+        at : `list` of `lsst.pex.config.callStack.StackFrame`
+            The call stack to record in the history.
+        label : `str`
+            Event label for the history.
+
+        See also
+        --------
+        lsst.pex.config.Field._setState
+        """
+        for name, fieldState in state.items():
+            self._fields[name]._setState(self, fieldState, at, label)
 
     def _rename(self, name):
         """Rename this config object in its parent `~lsst.pex.config.Config`.
@@ -1235,6 +2760,37 @@ class Config(metaclass=ConfigMeta):
     """Read-only history.
     """
 
+    usePrototype = False
+    """Whether new instances of this class are copied from a cached
+    prototype (`bool`).
+
+    When `True`, the first time the config class is instantiated, the
+    instance that results from its defaults and `setDefaults` is kept as a
+    prototype, and later instances are copied from it without validating or
+    recording the defaults again. They share the default events of the
+    history of the prototype, while the events recorded by `setDefaults` are
+    given the call stack of the construction of each instance.
+
+    The prototype is rebuilt when an attribute of the class, of one of its
+    bases, or of one of their fields is set, when the same happens to the
+    class of one of its subconfigs, or when an item is added to a registry it
+    uses. It is not rebuilt when anything else that `setDefaults` may read
+    changes, so only set this on classes whose `setDefaults` depends on
+    nothing else. Configs with subconfigs of classes that do not set this are
+    not copied from a prototype.
+    """
+
+    historyPolicy = None
+    """Policy controlling how much history instances of this class record
+    (`lsst.pex.config.history.HistoryPolicy` or `None`).
+
+    If `None` (the default), the process-wide policy returned by
+    `lsst.pex.config.history.getPolicy` is used. Set this on a config class
+    to record more (or less) provenance for it than for other configs; it
+    applies to the class's own fields, while subconfigs follow the policy of
+    their own classes.
+    """
+
     def __setattr__(self, attr, value, at=None, label="assignment"):
         """Set an attribute (such as a field's value).
 
@@ -1250,13 +2806,15 @@ class Config(metaclass=ConfigMeta):
         """
         if attr in self._fields:
             if at is None:
-                at = getCallStack()
+                at = _getHistoryPolicy(self).getCallStack()
             # This allows Field descriptors to work.
             self._fields[attr].__set__(self, value, at=at, label=label)
         elif hasattr(getattr(self.__class__, attr, None), '__set__'):
             # This allows properties and other non-Field descriptors to work.
             return object.__setattr__(self, attr, value)
-        elif attr in self.__dict__ or attr in ("_name", "_history", "_storage", "_frozen", "_imports"):
+        elif attr in self.__dict__ or attr in ("_name", "_history", "_storage", "_frozen", "_imports",
+                                               "_parent", "_changed", "_baseline", "_fingerprint",
+                                               "_dictCache"):
             # This allows specific private attributes to work.
             self.__dict__[attr] = value
         else:
@@ -1266,20 +2824,19 @@ class Config(metaclass=ConfigMeta):
     def __delattr__(self, attr, at=None, label="deletion"):
         if attr in self._fields:
             if at is None:
-                at = getCallStack()
+                at = _getHistoryPolicy(self).getCallStack()
             self._fields[attr].__delete__(self, at=at, label=label)
         else:
             object.__delattr__(self, attr)
 
     def __eq__(self, other):
         if type(other) == type(self):
+            if self._frozen and other._frozen:
+                return self.fingerprint() == other.fingerprint()
+            # NaNs compare equal, as they do when frozen configs compare
+            # fingerprints
             for name in self._fields:
-                thisValue = getattr(self, name)
-                otherValue = getattr(other, name)
-                if isinstance(thisValue, float) and math.isnan(thisValue):
-                    if not math.isnan(otherValue):
-                        return False
-                elif thisValue != otherValue:
+                if not _equalWithNan(getattr(self, name), getattr(other, name)):
                     return False
             return True
         return False
@@ -1287,6 +2844,11 @@ class Config(metaclass=ConfigMeta):
     def __ne__(self, other):
         return not self.__eq__(other)
 
+    def __hash__(self):
+        if not self._frozen:
+            raise TypeError("unhashable type: '%s' (only frozen configs can be hashed)" % _typeStr(self))
+        return hash(self.fingerprint())
+
     def __str__(self):
         return str(self.toDict())
 
@@ -1332,7 +2894,8 @@ class Config(metaclass=ConfigMeta):
         unselected choices of `~lsst.pex.config.ConfigChoiceField` fields
         are not considered by this method.
 
-        Floating point comparisons are performed by `numpy.allclose`.
+        Floating point comparisons are performed by `numpy.isclose`, on all of
+        the floating point values of the configs at once.
         """
         name1 = self._name if self._name is not None else "config"
         name2 = other._name if other._name is not None else "config"
@@ -1342,15 +2905,17 @@ class Config(metaclass=ConfigMeta):
 
 
 def unreduceConfig(cls, stream):
-    """Create a `~lsst.pex.config.Config` from a stream.
+    """Create a `~lsst.pex.config.Config` from a stream or from its state.
 
     Parameters
     ----------
     cls : `lsst.pex.config.Config`-type
         A `lsst.pex.config.Config` type (not an instance) that is instantiated
         with configurations in the ``stream``.
-    stream : file-like object, `str`, or compiled string
-        Stream containing configuration override code.
+    stream : file-like object, `str`, compiled string, or `dict`
+        Stream containing configuration override code, or the state of a
+        config as returned by `lsst.pex.config.Config._getState` (as is
+        done by `lsst.pex.config.Config.__reduce__`).
 
     Returns
     -------
@@ -1362,5 +2927,9 @@ def unreduceConfig(cls, stream):
     lsst.pex.config.Config.loadFromStream
     """
     config = cls()
-    config.loadFromStream(stream)
+    if isinstance(stream, dict):
+        at = _getHistoryPolicy(cls).getCallStack()
+        config._setState(stream, at=at, label="unpickle")
+    else:
+        config.loadFromStream(stream)
     return config
@@ -25,9 +25,10 @@ __all__ = ["ConfigChoiceField"]
 import copy
 import collections.abc
 
-from .config import Config, Field, FieldValidationError, _typeStr, _joinNamePath
-from .comparison import getComparisonName, compareScalars, compareConfigs
-from .callStack import getCallStack, getStackFrame
+from .config import (Config, Field, FieldValidationError, _typeStr, _joinNamePath,
+                     _getHistoryPolicy, _getFieldHistory, _sortedItems)
+from .comparison import getComparisonName
+from .callStack import getStackFrame
 
 
 class SelectionSet(collections.abc.MutableSet):
@@ -57,11 +58,10 @@ class SelectionSet(collections.abc.MutableSet):
 
     def __init__(self, dict_, value, at=None, label="assignment", setHistory=True):
         if at is None:
-            at = getCallStack()
+            at = _getHistoryPolicy(dict_._config).getCallStack()
         self._dict = dict_
         self._field = self._dict._field
         self._config = self._dict._config
-        self.__history = self._config._history.setdefault(self._field.name, [])
         if value is not None:
             try:
                 for v in value:
@@ -75,8 +75,10 @@ class SelectionSet(collections.abc.MutableSet):
         else:
             self._set = set()
 
-        if setHistory:
-            self.__history.append(("Set selection to %s" % self, at, label))
+        if setHistory and _getHistoryPolicy(self._config).enabled:
+            self._history.append(("Set selection to %s" % self, at, label))
+
+    _history = property(lambda x: _getFieldHistory(x._config, x._field.name))
 
     def add(self, value, at=None):
         """Add a value to the selected set.
@@ -85,15 +87,18 @@ class SelectionSet(collections.abc.MutableSet):
             raise FieldValidationError(self._field, self._config,
                                        "Cannot modify a frozen Config")
 
+        policy = _getHistoryPolicy(self._config)
         if at is None:
-            at = getCallStack()
+            at = policy.getCallStack()
 
         if value not in self._dict:
             # invoke __getitem__ to make sure it's present
             self._dict.__getitem__(value, at=at)
 
-        self.__history.append(("added %s to selection" % value, at, "selection"))
+        if policy.enabled:
+            self._history.append(("added %s to selection" % value, at, "selection"))
         self._set.add(value)
+        self._config._markChanged(self._field.name)
 
     def discard(self, value, at=None):
         """Discard a value from the selected set.
@@ -105,11 +110,21 @@ class SelectionSet(collections.abc.MutableSet):
         if value not in self._dict:
             return
 
-        if at is None:
-            at = getCallStack()
-
-        self.__history.append(("removed %s from selection" % value, at, "selection"))
+        policy = _getHistoryPolicy(self._config)
+        if policy.enabled:
+            if at is None:
+                at = policy.getCallStack()
+            self._history.append(("removed %s from selection" % value, at, "selection"))
         self._set.discard(value)
+        self._config._markChanged(self._field.name)
+
+    def _copy(self, dict_):
+        """Copy this selection for a copy of its `ConfigInstanceDict` (for
+        internal use only).
+        """
+        other = object.__new__(type(self))
+        other.__dict__.update(self.__dict__, _dict=dict_, _config=dict_._config, _set=set(self._set))
+        return other
 
     def __len__(self):
         return len(self._set)
@@ -146,11 +161,12 @@ class ConfigInstanceDict(collections.abc.Mapping):
         self._selection = None
         self._config = config
         self._field = field
-        self._history = config._history.setdefault(field.name, [])
         self.__doc__ = field.doc
 
     types = property(lambda x: x._field.typemap)
 
+    _history = property(lambda x: _getFieldHistory(x._config, x._field.name))
+
     def __contains__(self, k):
         return k in self._field.typemap
 
@@ -164,8 +180,9 @@ class ConfigInstanceDict(collections.abc.Mapping):
         if self._config._frozen:
             raise FieldValidationError(self._field, self._config, "Cannot modify a frozen Config")
 
+        policy = _getHistoryPolicy(self._config)
         if at is None:
-            at = getCallStack(1)
+            at = policy.getCallStack(1)
 
         if value is None:
             self._selection = None
@@ -175,7 +192,9 @@ class ConfigInstanceDict(collections.abc.Mapping):
             if value not in self._dict:
                 self.__getitem__(value, at=at)  # just invoke __getitem__ to make sure it's present
             self._selection = value
-        self._history.append((value, at, label))
+        self._config._markChanged(self._field.name)
+        if policy.enabled:
+            self._history.append((value, at, label))
 
     def _getNames(self):
         if not self._field.multi:
@@ -194,6 +213,7 @@ class ConfigInstanceDict(collections.abc.Mapping):
             raise FieldValidationError(self._field, self._config,
                                        "Single-selection field has no attribute 'names'")
         self._selection = None
+        self._config._markChanged(self._field.name)
 
     def _getName(self):
         if self._field.multi:
@@ -212,6 +232,7 @@ class ConfigInstanceDict(collections.abc.Mapping):
             raise FieldValidationError(self._field, self._config,
                                        "Multi-selection field has no attribute 'name'")
         self._selection = None
+        self._config._markChanged(self._field.name)
 
     names = property(_getNames, _setNames, _delNames)
     """List of names of active items in a multi-selection
@@ -252,9 +273,46 @@ class ConfigInstanceDict(collections.abc.Mapping):
                                            "Unknown key %r in Registry/ConfigChoiceField" % k)
             name = _joinNamePath(self._config._name, self._field.name, k)
             if at is None:
-                at = getCallStack()
+                at = _getHistoryPolicy(self._config).getCallStack()
                 at.insert(0, dtype._source)
             value = self._dict.setdefault(k, dtype(__name=name, __at=at, __label=label))
+            # Making a subconfig with its defaults on first use changes
+            # nothing but which subconfigs exist.
+            value._attach(self._config, self._field.name, changed=False)
+            if self._config._frozen:
+                # Subconfigs that did not exist when the config was frozen
+                # are frozen as they are created.
+                value.freeze()
+        return value
+
+    def __eq__(self, other):
+        if not isinstance(other, ConfigInstanceDict):
+            return collections.abc.Mapping.__eq__(self, other)
+        if set(self) != set(other) or self._getSelectionState() != other._getSelectionState():
+            return False
+        # Compare the configs that exist in either dict, without making the
+        # others; a config that does not exist yet has its default value.
+        for k in self._dict.keys() | other._dict.keys():
+            if self._getOrDefault(k) != other._getOrDefault(k):
+                return False
+        return True
+
+    def _getSelectionState(self):
+        """Get the selection as a `str`, a `set` of `str` for multi-selection
+        fields, or `None` (for internal use only).
+        """
+        selection = self._selection
+        if isinstance(selection, SelectionSet):
+            selection = set(selection)
+        return selection
+
+    def _getOrDefault(self, k):
+        """Get the config for a key if it exists, or a new default-constructed
+        config of the right type that is not added to this dictionary.
+        """
+        value = self._dict.get(k)
+        if value is None:
+            value = self._field.typemap[k]()
         return value
 
     def __setitem__(self, k, value, at=None, label="assignment"):
@@ -272,7 +330,7 @@ class ConfigInstanceDict(collections.abc.Mapping):
             raise FieldValidationError(self._field, self._config, msg)
 
         if at is None:
-            at = getCallStack()
+            at = _getHistoryPolicy(self._config).getCallStack()
         name = _joinNamePath(self._config._name, self._field.name, k)
         oldValue = self._dict.get(k, None)
         if oldValue is None:
@@ -280,6 +338,7 @@ class ConfigInstanceDict(collections.abc.Mapping):
                 self._dict[k] = value(__name=name, __at=at, __label=label)
             else:
                 self._dict[k] = dtype(__name=name, __at=at, __label=label, **value._storage)
+            self._dict[k]._attach(self._config, self._field.name)
         else:
             if value == dtype:
                 value = value()
@@ -289,6 +348,19 @@ class ConfigInstanceDict(collections.abc.Mapping):
         for k, v in self._dict.items():
             v._rename(_joinNamePath(name=fullname, index=k))
 
+    def _copy(self, config, history):
+        """Copy this dictionary and the configs it has instantiated for a copy
+        of its config (for internal use only).
+        """
+        other = object.__new__(type(self))
+        other.__dict__.update(self.__dict__, _config=config)
+        other._dict = {k: v._copy(_joinNamePath(config._name, self._field.name, k), history,
+                                  parent=(config, self._field.name))
+                       for k, v in self._dict.items()}
+        if isinstance(self._selection, SelectionSet):
+            other._selection = self._selection._copy(other)
+        return other
+
     def __setattr__(self, attr, value, at=None, label="assignment"):
         if hasattr(getattr(self.__class__, attr, None), '__set__'):
             # This allows properties to work.
@@ -352,8 +424,13 @@ class ConfigChoiceField(Field):
     ``active`` attribute is `None` and the field is not optional, validation
     will fail.
 
-    When saving a configuration with a ``ConfigChoiceField``, the entire set is
-    saved, as well as the active selection.
+    The config for each key of the ``typemap`` is only created when it is
+    first used (by selecting it or accessing it, for example). When saving,
+    freezing, or converting a configuration with a ``ConfigChoiceField`` to a
+    `dict`, only the configs created so far are included, along with the
+    active selection; the others still have their default values, so nothing
+    is lost. To include every config of the ``typemap``, create them all
+    first, for example by iterating over ``values()``.
 
     Examples
     --------
@@ -416,12 +493,14 @@ class ConfigChoiceField(Field):
     def _getOrMake(self, instance, label="default"):
         instanceDict = instance._storage.get(self.name)
         if instanceDict is None:
-            at = getCallStack(1)
             instanceDict = self.dtype(instance, self)
             instanceDict.__doc__ = self.doc
             instance._storage[self.name] = instanceDict
-            history = instance._history.setdefault(self.name, [])
-            history.append(("Initialized from defaults", at, label))
+            history = _getFieldHistory(instance, self.name)
+            policy = _getHistoryPolicy(instance)
+            if policy.enabled:
+                at = policy.getCallStack(1)
+                history.append(("Initialized from defaults", at, label))
 
         return instanceDict
 
@@ -435,11 +514,14 @@ class ConfigChoiceField(Field):
         if instance._frozen:
             raise FieldValidationError(self, instance, "Cannot modify a frozen Config")
         if at is None:
-            at = getCallStack()
+            at = _getHistoryPolicy(instance).getCallStack()
         instanceDict = self._getOrMake(instance)
         if isinstance(value, self.instanceDictClass):
-            for k, v in value.items():
+            for k, v in value._dict.items():
                 instanceDict.__setitem__(k, v, at=at, label=label)
+            # Configs that were never made in ``value`` have their defaults
+            for k in [k for k in instanceDict._dict if k not in value._dict]:
+                instanceDict.__setitem__(k, self.typemap[k], at=at, label=label)
             instanceDict._setSelection(value._selection, at=at, label=label)
 
         else:
@@ -450,6 +532,70 @@ class ConfigChoiceField(Field):
         fullname = _joinNamePath(instance._name, self.name)
         instanceDict._rename(fullname)
 
+    def _copy(self, source, target, history):
+        instanceDict = source._storage.get(self.name)
+        if instanceDict is not None:
+            target._storage[self.name] = instanceDict._copy(target, history)
+
+    def _getState(self, instance):
+        instanceDict = self.__get__(instance)
+        selection = instanceDict._selection
+        if isinstance(selection, SelectionSet):
+            selection = set(selection)
+        values = {k: v._getState() for k, v in instanceDict._dict.items()}
+        return (selection, values)
+
+    def _getFingerprintState(self, instance):
+        instanceDict = self.__get__(instance)
+        selection = instanceDict._getSelectionState()
+        # Configs that have not been made, or still have their defaults, are
+        # left out so that they do not change the fingerprint.
+        values = {k: v for k, v in instanceDict._dict.items()
+                  if v.fingerprint() != type(v)._getDefaultFingerprint()}
+        return (selection, values)
+
+    def _setState(self, instance, state, at, label):
+        selection, values = state
+        instanceDict = self.__get__(instance)
+        for k, v in values.items():
+            instanceDict.__getitem__(k, at=at)._setState(v, at, label)
+        if instanceDict._getSelectionState() != selection:
+            instanceDict._setSelection(selection, at=at, label=label)
+
+    def _getDefinition(self):
+        names = sorted(self.typemap)
+        configClasses = [self.typemap[k] for k in names]
+        description = "%s %r %r %r" % (_typeStr(self), self.default, names,
+                                       [_typeStr(c) for c in configClasses])
+        return description, configClasses
+
+    def _setFromDict(self, instance, value, at, label):
+        instanceDict = self.__get__(instance)
+        for k, v in value.get("values", {}).items():
+            instanceDict.__getitem__(k, at=at)._loadFromDict(v, at, label)
+        selectionKey = "names" if self.multi else "name"
+        if selectionKey in value:
+            instanceDict._setSelection(value[selectionKey], at=at, label=label)
+
+    def _getChanges(self, instance, since):
+        instanceDict = self.__get__(instance)
+        selection = instanceDict._selection
+        if isinstance(selection, SelectionSet):
+            selection = set(selection)
+        values = {}
+        for k, v in instanceDict._dict.items():
+            changes = v._getChanges(since)
+            if changes[0] or changes[1]:
+                values[k] = changes
+        return (selection, values)
+
+    def _applyChanges(self, instance, changes, at, label):
+        selection, values = changes
+        instanceDict = self.__get__(instance)
+        for k, v in values.items():
+            instanceDict.__getitem__(k, at=at)._setChanges(v, at, label)
+        self._setState(instance, (selection, {}), at, label)
+
     def validate(self, instance):
         instanceDict = self.__get__(instance)
         if instanceDict.active is None and not self.optional:
@@ -472,7 +618,7 @@ class ConfigChoiceField(Field):
             dict_["name"] = instanceDict.name
 
         values = {}
-        for k, v in instanceDict.items():
+        for k, v in instanceDict._dict.items():
             values[k] = v.toDict()
         dict_["values"] = values
 
@@ -484,24 +630,60 @@ class ConfigChoiceField(Field):
         # typemap
         self.typemap = copy.deepcopy(self.typemap)
         instanceDict = self.__get__(instance)
-        for v in instanceDict.values():
+        for v in instanceDict._dict.values():
             v.freeze()
 
-    def _collectImports(self, instance, imports):
+    def _iterNames(self, instance):
         instanceDict = self.__get__(instance)
-        for config in instanceDict.values():
-            config._collectImports()
-            imports |= config._imports
+        for k, v in list(instanceDict._dict.items()):
+            for name in v.iterNames():
+                yield "%s[%r].%s" % (self.name, k, name)
+        yield "%s.names" % self.name if self.multi else "%s.name" % self.name
 
-    def save(self, outfile, instance):
+    def _iterSave(self, instance, fullname, imports, default=None, activeOnly=False, canonical=False):
         instanceDict = self.__get__(instance)
-        fullname = _joinNamePath(instance._name, self.name)
-        for v in instanceDict.values():
-            v._save(outfile)
-        if self.multi:
-            outfile.write(u"{}.names={!r}\n".format(fullname, instanceDict.names))
+        selection = instanceDict._selection
+        if isinstance(selection, SelectionSet):
+            selection = set(selection)
+        if canonical:
+            # As in the fingerprint, subconfigs that still have their
+            # defaults are left out: they may or may not have been made in
+            # equal configs.
+            items = [(k, v) for k, v in _sortedItems(instanceDict._dict)
+                     if v.fingerprint() != type(v)._getDefaultFingerprint()]
+        else:
+            items = instanceDict._dict.items()
+        if activeOnly:
+            # unselected subconfigs are made with their own defaults if they
+            # are used after the output is loaded
+            active = set() if selection is None else selection if self.multi else {selection}
+            items = [(k, v) for k, v in items if k in active]
+        if default is None:
+            for k, v in items:
+                yield from v._iterSave(_joinNamePath(name=fullname, index=k), imports,
+                                       activeOnly=activeOnly, canonical=canonical)
         else:
-            outfile.write(u"{}.name={!r}\n".format(fullname, instanceDict.name))
+            defaultDict = self.__get__(default)
+            for k, v in items:
+                # subconfigs that the default does not have yet are made
+                # with their own defaults when the output is loaded
+                vDefault = defaultDict._dict.get(k)
+                if vDefault is None or type(vDefault) is not type(v):
+                    vDefault = type(v)()
+                yield from v._iterSave(_joinNamePath(name=fullname, index=k), imports, vDefault,
+                                       activeOnly, canonical)
+            defaultSelection = defaultDict._selection
+            if isinstance(defaultSelection, SelectionSet):
+                defaultSelection = set(defaultSelection)
+            if selection == defaultSelection:
+                return
+        if self.multi and canonical:
+            names = None if selection is None else sorted(selection)
+            yield "{}.names={!r}\n".format(fullname, names)
+        elif self.multi:
+            yield "{}.names={!r}\n".format(fullname, instanceDict.names)
+        else:
+            yield "{}.name={!r}\n".format(fullname, instanceDict.name)
 
     def __deepcopy__(self, memo):
         """Customize deep-copying, because we always want a reference to the
@@ -515,10 +697,9 @@ class ConfigChoiceField(Field):
         other.source = self.source
         return other
 
-    def _compare(self, instance1, instance2, shortcut, rtol, atol, output):
-        """Compare two fields for equality.
-
-        Used by `lsst.pex.ConfigChoiceField.compare`.
+    def _addComparisons(self, instance1, instance2, comparison):
+        """Compare two config instances with respect to this field, as part
+        of the comparison of configs.
 
         Parameters
         ----------
@@ -526,27 +707,13 @@ class ConfigChoiceField(Field):
             Left-hand side config instance to compare.
         instance2 : `lsst.pex.config.Config`
             Right-hand side config instance to compare.
-        shortcut : `bool`
-            If `True`, this function returns as soon as an inequality if found.
-        rtol : `float`
-            Relative tolerance for floating point comparisons.
-        atol : `float`
-            Absolute tolerance for floating point comparisons.
-        output : callable
-            A callable that takes a string, used (possibly repeatedly) to
-            report inequalities.
-
-        Returns
-        -------
-        isEqual : bool
-            `True` if the fields are equal, `False` otherwise.
+        comparison : `lsst.pex.config.comparison._Comparison`
+            The comparison to add to.
 
         Notes
         -----
         Only the selected configurations are compared, as the parameters of any
         others do not matter.
-
-        Floating point comparisons are performed by `numpy.allclose`.
         """
         d1 = getattr(instance1, self.name)
         d2 = getattr(instance2, self.name)
@@ -554,19 +721,15 @@ class ConfigChoiceField(Field):
             _joinNamePath(instance1._name, self.name),
             _joinNamePath(instance2._name, self.name)
         )
-        if not compareScalars("selection for %s" % name, d1._selection, d2._selection, output=output):
-            return False
+        if not comparison.compareScalars("selection for %s" % name, d1._selection, d2._selection):
+            return
         if d1._selection is None:
-            return True
+            return
         if self.multi:
             nested = [(k, d1[k], d2[k]) for k in d1._selection]
         else:
             nested = [(d1._selection, d1[d1._selection], d2[d1._selection])]
-        equal = True
         for k, c1, c2 in nested:
-            result = compareConfigs("%s[%r]" % (name, k), c1, c2, shortcut=shortcut,
-                                    rtol=rtol, atol=atol, output=output)
-            if not result and shortcut:
-                return False
-            equal = equal and result
-        return equal
+            if comparison.done:
+                return
+            comparison.compareConfigs("%s[%r]" % (name, k), c1, c2)
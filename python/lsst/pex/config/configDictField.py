@@ -20,10 +20,11 @@
 # see <http://www.lsstcorp.org/LegalNotices/>.
 #
 
-from .config import Config, FieldValidationError, _autocast, _typeStr, _joinNamePath
+from .config import (Config, FieldValidationError, _autocast, _typeStr, _joinNamePath, _getHistoryPolicy,
+                     _sortedItems)
 from .dictField import Dict, DictField
-from .comparison import compareConfigs, compareScalars, getComparisonName
-from .callStack import getCallStack, getStackFrame
+from .comparison import getComparisonName
+from .callStack import getStackFrame
 
 __all__ = ["ConfigDictField"]
 
@@ -37,7 +38,8 @@ class ConfigDict(Dict):
 
     def __init__(self, config, field, value, at, label):
         Dict.__init__(self, config, field, value, at, label, setHistory=False)
-        self.history.append(("Dict initialized", at, label))
+        if _getHistoryPolicy(config).enabled:
+            self.history.append(("Dict initialized", at, label))
 
     def __setitem__(self, k, x, at=None, label="setitem", setHistory=True):
         if self._config._frozen:
@@ -59,8 +61,10 @@ class ConfigDict(Dict):
                 (x, k, _typeStr(x), _typeStr(self._field.itemtype))
             raise FieldValidationError(self._field, self._config, msg)
 
+        policy = _getHistoryPolicy(self._config)
         if at is None:
-            at = getCallStack()
+            at = policy.getCallStack()
+        setHistory = setHistory and policy.enabled
         name = _joinNamePath(self._config._name, self._field.name, k)
         oldValue = self._dict.get(k, None)
         if oldValue is None:
@@ -68,6 +72,7 @@ class ConfigDict(Dict):
                 self._dict[k] = dtype(__name=name, __at=at, __label=label)
             else:
                 self._dict[k] = dtype(__name=name, __at=at, __label=label, **x._storage)
+            self._dict[k]._attach(self._config, self._field.name)
             if setHistory:
                 self.history.append(("Added item at key %s" % k, at, label))
         else:
@@ -77,11 +82,20 @@ class ConfigDict(Dict):
             if setHistory:
                 self.history.append(("Modified item at key %s" % k, at, label))
 
+    def _copy(self, config, history):
+        other = Dict._copy(self, config, history)
+        for k, v in self._dict.items():
+            other._dict[k] = v._copy(_joinNamePath(config._name, self._field.name, k), history,
+                                     parent=(config, self._field.name))
+        return other
+
     def __delitem__(self, k, at=None, label="delitem"):
+        policy = _getHistoryPolicy(self._config)
         if at is None:
-            at = getCallStack()
+            at = policy.getCallStack()
         Dict.__delitem__(self, k, at, label, False)
-        self.history.append(("Removed item at key %s" % k, at, label))
+        if policy.enabled:
+            self.history.append(("Removed item at key %s" % k, at, label))
 
 
 class ConfigDictField(DictField):
@@ -188,17 +202,93 @@ class ConfigDictField(DictField):
 
         return dict_
 
-    def save(self, outfile, instance):
+    def _getState(self, instance):
+        configDict = self.__get__(instance)
+        if configDict is None:
+            return None
+        return {k: v._getState() for k, v in configDict.items()}
+
+    def _getFingerprintState(self, instance):
+        configDict = self.__get__(instance)
+        return None if configDict is None else dict(configDict)
+
+    def _setState(self, instance, state, at, label):
+        configDict = self.__get__(instance)
+        if state is None:
+            if configDict is not None:
+                self.__set__(instance, None, at=at, label=label)
+            return
+        if configDict is None:
+            self.__set__(instance, {}, at=at, label=label)
+            configDict = self.__get__(instance)
+        for k in [k for k in configDict if k not in state]:
+            configDict.__delitem__(k, at=at, label=label)
+        for k, v in state.items():
+            if k not in configDict:
+                configDict.__setitem__(k, self.itemtype, at=at, label=label)
+            configDict[k]._setState(v, at, label)
+
+    def _getDefinition(self):
+        return "%s %r" % (_typeStr(self), self.default), [self.itemtype]
+
+    def _setFromDict(self, instance, value, at, label):
+        if value is None:
+            self.__set__(instance, None, at=at, label=label)
+            return
+        self.__set__(instance, {}, at=at, label=label)
+        configDict = self.__get__(instance)
+        for k, v in value.items():
+            configDict.__setitem__(k, self.itemtype, at=at, label=label)
+            configDict[k]._loadFromDict(v, at, label)
+
+    def _getChanges(self, instance, since):
         configDict = self.__get__(instance)
-        fullname = _joinNamePath(instance._name, self.name)
         if configDict is None:
-            outfile.write(u"{}={!r}\n".format(fullname, configDict))
+            return None
+        items = {}
+        for k, v in configDict.items():
+            changes = v._getChanges(since)
+            if changes[0] or changes[1]:
+                items[k] = changes
+        return (list(configDict), items)
+
+    def _applyChanges(self, instance, changes, at, label):
+        if changes is None:
+            self._setState(instance, None, at, label)
             return
+        keys, items = changes
+        self._setState(instance, dict.fromkeys(keys, {}), at, label)
+        configDict = self.__get__(instance)
+        for k, v in items.items():
+            configDict[k]._setChanges(v, at, label)
 
-        outfile.write(u"{}={!r}\n".format(fullname, {}))
-        for v in configDict.values():
-            outfile.write(u"{}={}()\n".format(v._name, _typeStr(v)))
-            v._save(outfile)
+    def _iterNames(self, instance):
+        yield self.name
+        configDict = self.__get__(instance)
+        if configDict is None:
+            return
+        for k, v in list(configDict.items()):
+            itemName = "%s[%r]" % (self.name, k)
+            yield itemName
+            for name in v.iterNames():
+                yield "%s.%s" % (itemName, name)
+
+    def _iterSave(self, instance, fullname, imports, default=None, activeOnly=False, canonical=False):
+        configDict = self.__get__(instance)
+        if default is not None and self._getState(instance) == self._getState(default):
+            return
+        if configDict is None:
+            yield "{}={!r}\n".format(fullname, configDict)
+            return
+
+        yield "{}={!r}\n".format(fullname, {})
+        for k, v in _sortedItems(configDict) if canonical else configDict.items():
+            itemName = _joinNamePath(name=fullname, index=k)
+            yield "{}={}()\n".format(itemName, _typeStr(v))
+            # each item is made with its own defaults when the output is
+            # loaded
+            yield from v._iterSave(itemName, imports, None if default is None else type(v)(), activeOnly,
+                                   canonical)
 
     def freeze(self, instance):
         configDict = self.__get__(instance)
@@ -206,10 +296,9 @@ class ConfigDictField(DictField):
             for k in configDict:
                 configDict[k].freeze()
 
-    def _compare(self, instance1, instance2, shortcut, rtol, atol, output):
-        """Compare two fields for equality.
-
-        Used by `lsst.pex.ConfigDictField.compare`.
+    def _addComparisons(self, instance1, instance2, comparison):
+        """Compare two config instances with respect to this field, as part
+        of the comparison of configs.
 
         Parameters
         ----------
@@ -217,23 +306,8 @@ class ConfigDictField(DictField):
             Left-hand side config instance to compare.
         instance2 : `lsst.pex.config.Config`
             Right-hand side config instance to compare.
-        shortcut : `bool`
-            If `True`, this function returns as soon as an inequality if found.
-        rtol : `float`
-            Relative tolerance for floating point comparisons.
-        atol : `float`
-            Absolute tolerance for floating point comparisons.
-        output : callable
-            A callable that takes a string, used (possibly repeatedly) to report inequalities.
-
-        Returns
-        -------
-        isEqual : bool
-            `True` if the fields are equal, `False` otherwise.
-
-        Notes
-        -----
-        Floating point comparisons are performed by `numpy.allclose`.
+        comparison : `lsst.pex.config.comparison._Comparison`
+            The comparison to add to.
         """
         d1 = getattr(instance1, self.name)
         d2 = getattr(instance2, self.name)
@@ -241,14 +315,9 @@ class ConfigDictField(DictField):
             _joinNamePath(instance1._name, self.name),
             _joinNamePath(instance2._name, self.name)
         )
-        if not compareScalars("keys for %s" % name, set(d1.keys()), set(d2.keys()), output=output):
-            return False
-        equal = True
+        if not comparison.compareScalars("keys for %s" % name, set(d1.keys()), set(d2.keys())):
+            return
         for k, v1 in d1.items():
-            v2 = d2[k]
-            result = compareConfigs("%s[%r]" % (name, k), v1, v2, shortcut=shortcut,
-                                    rtol=rtol, atol=atol, output=output)
-            if not result and shortcut:
-                return False
-            equal = equal and result
-        return equal
+            if comparison.done:
+                return
+            comparison.compareConfigs("%s[%r]" % (name, k), v1, d2[k])
@@ -22,9 +22,10 @@
 
 __all__ = ["ConfigField"]
 
-from .config import Config, Field, FieldValidationError, _joinNamePath, _typeStr
-from .comparison import compareConfigs, getComparisonName
-from .callStack import getCallStack, getStackFrame
+from .config import (Config, Field, FieldValidationError, _joinNamePath, _typeStr,
+                     _getHistoryPolicy, _getFieldHistory)
+from .comparison import getComparisonName
+from .callStack import getStackFrame
 
 
 class ConfigField(Field):
@@ -86,7 +87,7 @@ class ConfigField(Field):
         else:
             value = instance._storage.get(self.name, None)
             if value is None:
-                at = getCallStack()
+                at = _getHistoryPolicy(instance).getCallStack()
                 at.insert(0, self.source)
                 self.__set__(instance, self.default, at=at, label="default")
             return value
@@ -102,8 +103,9 @@ class ConfigField(Field):
                 (value, _typeStr(value), _typeStr(self.dtype))
             raise FieldValidationError(self, instance, msg)
 
+        policy = _getHistoryPolicy(instance)
         if at is None:
-            at = getCallStack()
+            at = policy.getCallStack()
 
         oldValue = instance._storage.get(self.name, None)
         if oldValue is None:
@@ -112,12 +114,14 @@ class ConfigField(Field):
             else:
                 instance._storage[self.name] = self.dtype(__name=name, __at=at,
                                                           __label=label, **value._storage)
+            instance._storage[self.name]._attach(instance, self.name)
         else:
             if value == self.dtype:
                 value = value()
             oldValue.update(__at=at, __label=label, **value._storage)
-        history = instance._history.setdefault(self.name, [])
-        history.append(("config value set", at, label))
+        history = _getFieldHistory(instance, self.name)
+        if policy.enabled:
+            history.append(("config value set", at, label))
 
     def rename(self, instance):
         """Rename the field in a `~lsst.pex.config.Config` (for internal use
@@ -141,34 +145,42 @@ class ConfigField(Field):
         value = self.__get__(instance)
         value._rename(_joinNamePath(instance._name, self.name))
 
-    def _collectImports(self, instance, imports):
-        value = self.__get__(instance)
-        value._collectImports()
-        imports |= value._imports
+    def _copy(self, source, target, history):
+        value = source._storage.get(self.name, None)
+        if value is not None:
+            value = value._copy(_joinNamePath(target._name, self.name), history, parent=(target, self.name))
+        target._storage[self.name] = value
 
-    def save(self, outfile, instance):
-        """Save this field to a file (for internal use only).
+    def _getState(self, instance):
+        return self.__get__(instance)._getState()
 
-        Parameters
-        ----------
-        outfile : file-like object
-            A writeable field handle.
-        instance : `Config`
-            The `Config` instance that contains this field.
+    def _getFingerprintState(self, instance):
+        return self.__get__(instance)
 
-        Notes
-        -----
-        This method is invoked by the `~lsst.pex.config.Config` object that
-        contains this field and should not be called directly.
+    def _setState(self, instance, state, at, label):
+        self.__get__(instance)._setState(state, at, label)
 
-        The output consists of the documentation string
-        (`lsst.pex.config.Field.doc`) formatted as a Python comment. The second
-        line is formatted as an assignment: ``{fullname}={value}``.
+    def _getDefinition(self):
+        return "%s %r" % (_typeStr(self), self.default), [self.dtype]
 
-        This output can be executed with Python.
-        """
+    def _setFromDict(self, instance, value, at, label):
+        self.__get__(instance)._loadFromDict(value, at, label)
+
+    def _getChanges(self, instance, since):
+        return self.__get__(instance)._getChanges(since)
+
+    def _applyChanges(self, instance, changes, at, label):
+        self.__get__(instance)._setChanges(changes, at, label)
+
+    def _iterNames(self, instance):
+        for name in self.__get__(instance).iterNames():
+            yield "%s.%s" % (self.name, name)
+
+    def _iterSave(self, instance, fullname, imports, default=None, activeOnly=False, canonical=False):
         value = self.__get__(instance)
-        value._save(outfile)
+        if default is not None:
+            default = self.__get__(default)
+        yield from value._iterSave(fullname, imports, default, activeOnly, canonical)
 
     def freeze(self, instance):
         """Make this field read-only.
@@ -248,10 +260,9 @@ class ConfigField(Field):
             msg = "%s is not a valid value" % str(value)
             raise FieldValidationError(self, instance, msg)
 
-    def _compare(self, instance1, instance2, shortcut, rtol, atol, output):
-        """Compare two fields for equality.
-
-        Used by `ConfigField.compare`.
+    def _addComparisons(self, instance1, instance2, comparison):
+        """Compare two config instances with respect to this field, as part
+        of the comparison of configs.
 
         Parameters
         ----------
@@ -259,23 +270,8 @@ class ConfigField(Field):
             Left-hand side config instance to compare.
         instance2 : `lsst.pex.config.Config`
             Right-hand side config instance to compare.
-        shortcut : `bool`
-            If `True`, this function returns as soon as an inequality if found.
-        rtol : `float`
-            Relative tolerance for floating point comparisons.
-        atol : `float`
-            Absolute tolerance for floating point comparisons.
-        output : callable
-            A callable that takes a string, used (possibly repeatedly) to report inequalities.
-
-        Returns
-        -------
-        isEqual : bool
-            `True` if the fields are equal, `False` otherwise.
-
-        Notes
-        -----
-        Floating point comparisons are performed by `numpy.allclose`.
+        comparison : `lsst.pex.config.comparison._Comparison`
+            The comparison to add to.
         """
         c1 = getattr(instance1, self.name)
         c2 = getattr(instance2, self.name)
@@ -283,4 +279,4 @@ class ConfigField(Field):
             _joinNamePath(instance1._name, self.name),
             _joinNamePath(instance2._name, self.name)
         )
-        return compareConfigs(name, c1, c2, shortcut=shortcut, rtol=rtol, atol=atol, output=output)
+        comparison.compareConfigs(name, c1, c2)
@@ -23,9 +23,10 @@ __all__ = ('ConfigurableInstance', 'ConfigurableField')
 
 import copy
 
-from .config import Config, Field, _joinNamePath, _typeStr, FieldValidationError
-from .comparison import compareConfigs, getComparisonName
-from .callStack import getCallStack, getStackFrame
+from .config import (Config, Field, _joinNamePath, _typeStr, FieldValidationError,
+                     _getHistoryPolicy, _getFieldHistory)
+from .comparison import getComparisonName
+from .callStack import getStackFrame
 
 
 class ConfigurableInstance:
@@ -60,6 +61,7 @@ class ConfigurableInstance:
             storage = {}
         value = self._ConfigClass(__name=name, __at=at, __label=label, **storage)
         object.__setattr__(self, "_value", value)
+        value._attach(self._config, self._field.name)
 
     def __init__(self, config, field, at=None, label="default"):
         object.__setattr__(self, "_config", config)
@@ -69,13 +71,25 @@ class ConfigurableInstance:
         object.__setattr__(self, "_ConfigClass", field.ConfigClass)
         object.__setattr__(self, "_value", None)
 
+        policy = _getHistoryPolicy(config)
         if at is None:
-            at = getCallStack()
+            at = policy.getCallStack()
         at += [self._field.source]
         self.__initValue(at, label)
 
-        history = config._history.setdefault(field.name, [])
-        history.append(("Targeted and initialized from defaults", at, label))
+        history = _getFieldHistory(config, field.name)
+        if policy.enabled:
+            history.append(("Targeted and initialized from defaults", at, label))
+
+    def _copy(self, config, history):
+        """Copy this instance and its config for a copy of the config that
+        contains it (for internal use only).
+        """
+        other = object.__new__(type(self))
+        value = self._value._copy(_joinNamePath(config._name, self._field.name), history,
+                                  parent=(config, self._field.name))
+        other.__dict__.update(self.__dict__, _config=config, __doc__=config, _value=value)
+        return other
 
     target = property(lambda x: x._target)
     """The targeted configurable (read-only).
@@ -112,16 +126,25 @@ class ConfigurableInstance:
         except BaseException as e:
             raise FieldValidationError(self._field, self._config, e.message)
 
+        policy = _getHistoryPolicy(self._config)
         if at is None:
-            at = getCallStack()
+            at = policy.getCallStack()
         object.__setattr__(self, "_target", target)
         if ConfigClass != self.ConfigClass:
             object.__setattr__(self, "_ConfigClass", ConfigClass)
             self.__initValue(at, label)
+        self._config._markChanged(self._field.name)
+
+        history = _getFieldHistory(self._config, self._field.name)
+        if policy.enabled:
+            msg = "retarget(target=%s, ConfigClass=%s)" % (_typeStr(target), _typeStr(ConfigClass))
+            history.append((msg, at, label))
 
-        history = self._config._history.setdefault(self._field.name, [])
-        msg = "retarget(target=%s, ConfigClass=%s)" % (_typeStr(target), _typeStr(ConfigClass))
-        history.append((msg, at, label))
+    def __eq__(self, other):
+        if not isinstance(other, ConfigurableInstance):
+            return NotImplemented
+        return self.target == other.target and self.ConfigClass == other.ConfigClass and \
+            self.value == other.value
 
     def __getattr__(self, name):
         return getattr(self._value, name)
@@ -139,7 +162,7 @@ class ConfigurableInstance:
             object.__setattr__(self, name, value)
         else:
             if at is None:
-                at = getCallStack()
+                at = _getHistoryPolicy(self._value).getCallStack()
             self._value.__setattr__(name, value, at=at, label=label)
 
     def __delattr__(self, name, at=None, label="delete"):
@@ -155,7 +178,7 @@ class ConfigurableInstance:
             object.__delattr__(self, name)
         except AttributeError:
             if at is None:
-                at = getCallStack()
+                at = _getHistoryPolicy(self._value).getCallStack()
             self._value.__delattr__(name, at=at, label=label)
 
 
@@ -266,7 +289,7 @@ class ConfigurableField(Field):
         value = instance._storage.get(self.name, None)
         if value is None:
             if at is None:
-                at = getCallStack(1)
+                at = _getHistoryPolicy(instance).getCallStack(1)
             value = ConfigurableInstance(instance, self, at=at, label=label)
             instance._storage[self.name] = value
         return value
@@ -281,7 +304,7 @@ class ConfigurableField(Field):
         if instance._frozen:
             raise FieldValidationError(self, instance, "Cannot modify a frozen Config")
         if at is None:
-            at = getCallStack()
+            at = _getHistoryPolicy(instance).getCallStack()
         oldValue = self.__getOrMake(instance, at=at)
 
         if isinstance(value, ConfigurableInstance):
@@ -302,27 +325,80 @@ class ConfigurableField(Field):
         value = self.__getOrMake(instance)
         value._rename(fullname)
 
-    def _collectImports(self, instance, imports):
+    def _copy(self, source, target, history):
+        value = source._storage.get(self.name, None)
+        if value is not None:
+            target._storage[self.name] = value._copy(target, history)
+
+    def _getState(self, instance):
         value = self.__get__(instance)
-        target = value.target
-        imports.add(target.__module__)
-        value.value._collectImports()
-        imports |= value.value._imports
+        if value.target == self.target and value.ConfigClass == self.ConfigClass:
+            # Like save(), only refer to the target if it was changed.
+            return (None, None, value.value._getState())
+        return (value.target, value.ConfigClass, value.value._getState())
 
-    def save(self, outfile, instance):
-        fullname = _joinNamePath(instance._name, self.name)
+    def _getFingerprintState(self, instance):
+        value = self.__get__(instance)
+        return (value.target, value.ConfigClass, value.value)
+
+    def _setState(self, instance, state, at, label):
+        target, ConfigClass, valueState = state
+        value = self.__get__(instance, at=at)
+        if target is None:
+            target, ConfigClass = self.target, self.ConfigClass
+        if target != value.target or ConfigClass != value.ConfigClass:
+            value.retarget(target, ConfigClass, at=at, label=label)
+        value.value._setState(valueState, at, label)
+
+    def _getDefinition(self):
+        return "%s %s %r" % (_typeStr(self), _typeStr(self.target), self.default), [self.ConfigClass]
+
+    def _setFromDict(self, instance, value, at, label):
+        self.__get__(instance, at=at).value._loadFromDict(value, at, label)
+
+    def _getChanges(self, instance, since):
+        value = self.__get__(instance)
+        return (value.target, value.ConfigClass, value.value._getChanges(since))
+
+    def _applyChanges(self, instance, changes, at, label):
+        target, ConfigClass, valueChanges = changes
+        value = self.__get__(instance, at=at)
+        if target != value.target or ConfigClass != value.ConfigClass:
+            value.retarget(target, ConfigClass, at=at, label=label)
+        value.value._setChanges(valueChanges, at, label)
+
+    def _iterNames(self, instance):
+        for name in self.__getOrMake(instance).value.iterNames():
+            yield "%s.%s" % (self.name, name)
+
+    def _iterSave(self, instance, fullname, imports, default=None, activeOnly=False, canonical=False):
         value = self.__getOrMake(instance)
         target = value.target
+        imports.add(target.__module__)
+
+        if default is not None:
+            defaultValue = self.__getOrMake(default)
+            if target != defaultValue.target or value.ConfigClass != defaultValue.ConfigClass:
+                yield "{}.retarget(target={}, ConfigClass={})\n".format(fullname, _typeStr(target),
+                                                                        _typeStr(value.ConfigClass))
+            if value.ConfigClass != defaultValue.ConfigClass:
+                # retargeting made a new config with its own defaults
+                yield from value.value._iterSave(fullname, imports, value.ConfigClass(), activeOnly,
+                                                 canonical)
+            else:
+                yield from value.value._iterSave(fullname, imports, defaultValue.value, activeOnly,
+                                                 canonical)
+            return
 
         if target != self.target:
             # not targeting the field-default target.
             # save target information
             ConfigClass = value.ConfigClass
-            outfile.write(u"{}.retarget(target={}, ConfigClass={})\n\n".format(fullname,
-                                                                               _typeStr(target),
-                                                                               _typeStr(ConfigClass)))
+            yield "{}.retarget(target={}, ConfigClass={})\n\n".format(fullname,
+                                                                      _typeStr(target),
+                                                                      _typeStr(ConfigClass))
         # save field values
-        value._save(outfile)
+        yield from value.value._iterSave(fullname, imports, activeOnly=activeOnly, canonical=canonical)
 
     def freeze(self, instance):
         value = self.__getOrMake(instance)
@@ -350,10 +426,9 @@ class ConfigurableField(Field):
         return type(self)(doc=self.doc, target=self.target, ConfigClass=self.ConfigClass,
                           default=copy.deepcopy(self.default))
 
-    def _compare(self, instance1, instance2, shortcut, rtol, atol, output):
-        """Compare two fields for equality.
-
-        Used by `lsst.pex.ConfigDictField.compare`.
+    def _addComparisons(self, instance1, instance2, comparison):
+        """Compare two config instances with respect to this field, as part
+        of the comparison of configs.
 
         Parameters
         ----------
@@ -361,24 +436,8 @@ class ConfigurableField(Field):
             Left-hand side config instance to compare.
         instance2 : `lsst.pex.config.Config`
             Right-hand side config instance to compare.
-        shortcut : `bool`
-            If `True`, this function returns as soon as an inequality if found.
-        rtol : `float`
-            Relative tolerance for floating point comparisons.
-        atol : `float`
-            Absolute tolerance for floating point comparisons.
-        output : callable
-            A callable that takes a string, used (possibly repeatedly) to
-            report inequalities. For example: `print`.
-
-        Returns
-        -------
-        isEqual : bool
-            `True` if the fields are equal, `False` otherwise.
-
-        Notes
-        -----
-        Floating point comparisons are performed by `numpy.allclose`.
+        comparison : `lsst.pex.config.comparison._Comparison`
+            The comparison to add to.
         """
         c1 = getattr(instance1, self.name)._value
         c2 = getattr(instance2, self.name)._value
@@ -386,4 +445,4 @@ class ConfigurableField(Field):
             _joinNamePath(instance1._name, self.name),
             _joinNamePath(instance2._name, self.name)
         )
-        return compareConfigs(name, c1, c2, shortcut=shortcut, rtol=rtol, atol=atol, output=output)
+        comparison.compareConfigs(name, c1, c2)
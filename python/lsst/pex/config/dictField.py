@@ -24,9 +24,11 @@ __all__ = ["DictField"]
 
 import collections.abc
 
-from .config import Field, FieldValidationError, _typeStr, _autocast, _joinNamePath
-from .comparison import getComparisonName, compareScalars
-from .callStack import getCallStack, getStackFrame
+from .config import (Field, FieldValidationError, _typeStr, _autocast, _joinNamePath,
+                     _getHistoryPolicy, _getFieldHistory, _markContainerChanged)
+from .comparison import getComparisonName
+from .callStack import getStackFrame
+from .history import DeltaEvent
 
 
 class Dict(collections.abc.MutableMapping):
@@ -39,7 +41,7 @@ class Dict(collections.abc.MutableMapping):
         self._field = field
         self._config = config
         self._dict = {}
-        self._history = self._config._history.setdefault(self._field.name, [])
+        self._lastEvent = None
         self.__doc__ = field.doc
         if value is not None:
             try:
@@ -50,10 +52,11 @@ class Dict(collections.abc.MutableMapping):
                 msg = "Value %s is of incorrect type %s. Mapping type expected." % \
                     (value, _typeStr(value))
                 raise FieldValidationError(self._field, self._config, msg)
-        if setHistory:
-            self._history.append((dict(self._dict), at, label))
+        if setHistory and _getHistoryPolicy(config).enabled:
+            self._lastEvent = (dict(self._dict), at, label)
+            self.history.append(self._lastEvent)
 
-    history = property(lambda x: x._history)
+    history = property(lambda x: _getFieldHistory(x._config, x._field.name))
     """History (read-only).
     """
 
@@ -69,6 +72,17 @@ class Dict(collections.abc.MutableMapping):
     def __contains__(self, k):
         return k in self._dict
 
+    def _copy(self, config, history):
+        """Copy this mapping for a copy of its config, without validating the
+        items (for internal use only).
+
+        ``history`` is passed on to the copies of items that are configs, in
+        subclasses that hold them.
+        """
+        other = object.__new__(type(self))
+        other.__dict__.update(self.__dict__, _config=config, _dict=dict(self._dict), _lastEvent=None)
+        return other
+
     def __setitem__(self, k, x, at=None, label="setitem", setHistory=True):
         if self._config._frozen:
             msg = "Cannot modify a frozen Config. "\
@@ -99,12 +113,8 @@ class Dict(collections.abc.MutableMapping):
             msg = "Item at key %r is not a valid value: %s" % (k, x)
             raise FieldValidationError(self._field, self._config, msg)
 
-        if at is None:
-            at = getCallStack()
-
         self._dict[k] = x
-        if setHistory:
-            self._history.append((dict(self._dict), at, label))
+        self._recordChange("set", k, x, at, label, setHistory)
 
     def __delitem__(self, k, at=None, label="delitem", setHistory=True):
         if self._config._frozen:
@@ -112,10 +122,29 @@ class Dict(collections.abc.MutableMapping):
                                        "Cannot modify a frozen Config")
 
         del self._dict[k]
-        if setHistory:
-            if at is None:
-                at = getCallStack()
-            self._history.append((dict(self._dict), at, label))
+        self._recordChange("del", k, None, at, label, setHistory)
+
+    def _recordChange(self, op, k, x, at, label, setHistory):
+        """Record a change to the mapping in the field's history.
+
+        The change is stored as a `~lsst.pex.config.history.DeltaEvent`
+        relative to the previous event of this mapping, so that building a
+        mapping item by item does not copy it for every item.
+        """
+        _markContainerChanged(self)
+        policy = _getHistoryPolicy(self._config)
+        if not (setHistory and policy.enabled):
+            # The previous event no longer describes the mapping.
+            self._lastEvent = None
+            return
+        if at is None:
+            at = policy.getCallStack(1)
+        if self._lastEvent is None:
+            event = (dict(self._dict), at, label)
+        else:
+            event = DeltaEvent(self._lastEvent, op, k, x, at, label, self._dict)
+        self.history.append(event)
+        self._lastEvent = event
 
     def __repr__(self):
         return repr(self._dict)
@@ -127,7 +156,8 @@ class Dict(collections.abc.MutableMapping):
         if hasattr(getattr(self.__class__, attr, None), '__set__'):
             # This allows properties to work.
             object.__setattr__(self, attr, value)
-        elif attr in self.__dict__ or attr in ["_field", "_config", "_history", "_dict", "__doc__"]:
+        elif attr in self.__dict__ or attr in ["_field", "_config", "_history", "_dict", "_lastEvent",
+                                               "__doc__"]:
             # This allows specific private attributes to work.
             object.__setattr__(self, attr, value)
         else:
@@ -252,15 +282,28 @@ class DictField(Field):
                   "Attempting to set field to value %s" % value
             raise FieldValidationError(self, instance, msg)
 
+        policy = _getHistoryPolicy(instance)
         if at is None:
-            at = getCallStack()
+            at = policy.getCallStack()
         if value is not None:
             value = self.DictClass(instance, self, value, at=at, label=label)
         else:
-            history = instance._history.setdefault(self.name, [])
-            history.append((value, at, label))
+            history = _getFieldHistory(instance, self.name)
+            if policy.enabled:
+                history.append((value, at, label))
 
         instance._storage[self.name] = value
+        instance._markChanged(self.name)
+
+    def _copy(self, source, target, history):
+        value = source._storage[self.name]
+        if value is not None:
+            value = value._copy(target, history)
+        target._storage[self.name] = value
+
+    def _getState(self, instance):
+        value = instance._storage[self.name]
+        return None if value is None else dict(value)
 
     def toDict(self, instance):
         """Convert this field's key-value pairs into a regular `dict`.
@@ -280,10 +323,9 @@ class DictField(Field):
         value = self.__get__(instance)
         return dict(value) if value is not None else None
 
-    def _compare(self, instance1, instance2, shortcut, rtol, atol, output):
-        """Compare two fields for equality.
-
-        Used by `lsst.pex.ConfigDictField.compare`.
+    def _addComparisons(self, instance1, instance2, comparison):
+        """Compare two config instances with respect to this field, as part
+        of the comparison of configs.
 
         Parameters
         ----------
@@ -291,24 +333,13 @@ class DictField(Field):
             Left-hand side config instance to compare.
         instance2 : `lsst.pex.config.Config`
             Right-hand side config instance to compare.
-        shortcut : `bool`
-            If `True`, this function returns as soon as an inequality if found.
-        rtol : `float`
-            Relative tolerance for floating point comparisons.
-        atol : `float`
-            Absolute tolerance for floating point comparisons.
-        output : callable
-            A callable that takes a string, used (possibly repeatedly) to
-            report inequalities.
-
-        Returns
-        -------
-        isEqual : bool
-            `True` if the fields are equal, `False` otherwise.
+        comparison : `lsst.pex.config.comparison._Comparison`
+            The comparison to add to.
 
         Notes
         -----
-        Floating point comparisons are performed by `numpy.allclose`.
+        Items of floating point mappings are compared together with the other
+        floating point values of the configs.
         """
         d1 = getattr(instance1, self.name)
         d2 = getattr(instance2, self.name)
@@ -316,18 +347,13 @@ class DictField(Field):
             _joinNamePath(instance1._name, self.name),
             _joinNamePath(instance2._name, self.name)
         )
-        if not compareScalars("isnone for %s" % name, d1 is None, d2 is None, output=output):
-            return False
+        if not comparison.compareScalars("isnone for %s" % name, d1 is None, d2 is None):
+            return
         if d1 is None and d2 is None:
-            return True
-        if not compareScalars("keys for %s" % name, set(d1.keys()), set(d2.keys()), output=output):
-            return False
-        equal = True
+            return
+        if not comparison.compareScalars("keys for %s" % name, set(d1.keys()), set(d2.keys())):
+            return
         for k, v1 in d1.items():
-            v2 = d2[k]
-            result = compareScalars("%s[%r]" % (name, k), v1, v2, dtype=self.itemtype,
-                                    rtol=rtol, atol=atol, output=output)
-            if not result and shortcut:
-                return False
-            equal = equal and result
-        return equal
+            if comparison.compareScalars("%s[%r]" % (name, k), v1, d2[k], dtype=self.itemtype) is False \
+                    and comparison.done:
+                return
@@ -20,12 +20,379 @@
 # see <http://www.lsstcorp.org/LegalNotices/>.
 #
 
-__all__ = ('Color', 'format')
+__all__ = ('Color', 'format', 'HistoryPolicy', 'BoundedHistory', 'DeltaEvent', 'getPolicy', 'setPolicy')
 
+import collections
+import collections.abc
 import os
 import re
 import sys
 
+from .callStack import getCallStack, LazyCallStack
+
+
+class HistoryPolicy:
+    """A policy that controls how much provenance is recorded in the history
+    of a `~lsst.pex.config.Config`.
+
+    Parameters
+    ----------
+    mode : `str`, optional
+        One of the following (default is ``"full"``):
+
+        ``"full"``
+            Record every change along with the full call stack.
+        ``"shallow"``
+            Record every change along with the ``depth`` most recent frames
+            of the call stack.
+        ``"value"``
+            Record every change, but not the call stack.
+        ``"off"``
+            Do not record any history.
+    depth : `int`, optional
+        Number of stack frames to record in ``"shallow"`` mode.
+    maxEvents : `int`, optional
+        If set, keep only this many of the most recent events for each
+        field, discarding older ones. By default all events are kept.
+    keepFirst : `bool`, optional
+        If `True` and ``maxEvents`` is set, keep the first event of each
+        field (usually its default) in addition to the ``maxEvents`` most
+        recent ones.
+
+    Raises
+    ------
+    ValueError
+        Raised if ``mode`` is unknown, if ``depth`` is not a positive
+        integer in ``"shallow"`` mode, or if ``maxEvents`` is not positive.
+
+    See also
+    --------
+    getPolicy
+    setPolicy
+    lsst.pex.config.Config.historyPolicy
+
+    Notes
+    -----
+    Capturing the call stack dominates the cost of building a config. Code
+    that never looks at the history (with
+    `lsst.pex.config.Config.formatHistory`, for example) can use a cheaper
+    policy, either process-wide with `setPolicy` or for a single config class
+    by setting its `~lsst.pex.config.Config.historyPolicy` attribute.
+
+    Each event holds a reference to the value that was set, so configs that
+    are modified repeatedly over a long time keep growing unless
+    ``maxEvents`` limits their history. For example, to keep only the first
+    and the last event of each field::
+
+        HistoryPolicy(maxEvents=1, keepFirst=True)
+
+    The retention of a field's history is fixed when its first event is
+    recorded.
+    """
+
+    modes = ("off", "value", "shallow", "full")
+    """Supported modes, from least to most provenance (`tuple` of `str`).
+    """
+
+    def __init__(self, mode="full", depth=None, maxEvents=None, keepFirst=False):
+        if mode not in self.modes:
+            raise ValueError("Unknown history mode %r; expected one of %s" % (mode, self.modes))
+        if mode == "shallow":
+            if depth is None or depth <= 0:
+                raise ValueError("Shallow history requires a positive depth, not %r" % (depth,))
+        else:
+            depth = None
+        if maxEvents is not None and maxEvents <= 0:
+            raise ValueError("maxEvents must be positive, not %r" % (maxEvents,))
+        self.mode = mode
+        self.depth = depth
+        self.maxEvents = maxEvents
+        self.keepFirst = keepFirst
+
+    @property
+    def enabled(self):
+        """Whether history is recorded at all (`bool`).
+        """
+        return self.mode != "off"
+
+    def getCallStack(self, skip=0):
+        """Retrieve the call stack for the caller, as far as this policy
+        requires.
+
+        Parameters
+        ----------
+        skip : `int`, non-negative
+            Number of stack frames above caller to skip.
+
+        Returns
+        -------
+        stack : `lsst.pex.config.callStack.LazyCallStack`
+            The call stack, which is empty if this policy does not record
+            stacks.
+
+        Notes
+        -----
+        This method is excluded from the call stack.
+        """
+        if self.mode == "full":
+            return getCallStack(skip + 1)
+        elif self.mode == "shallow":
+            return getCallStack(skip + 1, depth=self.depth)
+        return LazyCallStack()
+
+    def makeHistory(self):
+        """Make the container for the history of one field.
+
+        Returns
+        -------
+        history : `list` or `BoundedHistory`
+            An empty `list` if all events are kept, or an empty
+            `BoundedHistory` that follows ``maxEvents`` and ``keepFirst``.
+        """
+        if self.maxEvents is None:
+            return []
+        return BoundedHistory(self.maxEvents, keepFirst=self.keepFirst)
+
+    def __repr__(self):
+        args = [repr(self.mode)]
+        if self.mode == "shallow":
+            args.append("depth=%d" % self.depth)
+        if self.maxEvents is not None:
+            args.append("maxEvents=%d" % self.maxEvents)
+            if self.keepFirst:
+                args.append("keepFirst=True")
+        return "%s(%s)" % (self.__class__.__name__, ", ".join(args))
+
+
+class BoundedHistory(collections.abc.Sequence):
+    """The history of a field, limited to its most recent events.
+
+    Parameters
+    ----------
+    maxEvents : `int`
+        Number of most recent events to keep.
+    keepFirst : `bool`, optional
+        If `True`, also keep the first event ever appended.
+
+    Notes
+    -----
+    The most recent events are kept in a ring buffer, so appending is O(1)
+    and the oldest events are discarded once ``maxEvents`` is reached.
+    Otherwise this behaves like the `list` of ``(value, stack, label)``
+    tuples used for an unbounded history.
+
+    See also
+    --------
+    HistoryPolicy
+    """
+
+    __slots__ = ("_first", "_events", "_keepFirst", "discarded")
+
+    def __init__(self, maxEvents, keepFirst=False):
+        self._first = None
+        self._events = collections.deque(maxlen=maxEvents)
+        self._keepFirst = keepFirst
+        self.discarded = 0
+        """Number of events that have been discarded (`int`).
+        """
+
+    @property
+    def maxEvents(self):
+        """Number of most recent events kept (`int`).
+        """
+        return self._events.maxlen
+
+    def append(self, event):
+        """Record an event, discarding the oldest one if full.
+
+        Parameters
+        ----------
+        event : `tuple`
+            A ``(value, stack, label)`` history event.
+        """
+        if self._keepFirst and self._first is None:
+            self._first = event
+            return
+        if len(self._events) == self._events.maxlen:
+            self.discarded += 1
+        self._events.append(event)
+
+    def _list(self):
+        if self._first is None:
+            return list(self._events)
+        return [self._first] + list(self._events)
+
+    def __getitem__(self, index):
+        if isinstance(index, int) and -len(self._events) <= index < 0:
+            return self._events[index]
+        return self._list()[index]
+
+    def __len__(self):
+        return len(self._events) + (self._first is not None)
+
+    def __iter__(self):
+        if self._first is not None:
+            yield self._first
+        yield from self._events
+
+    def __eq__(self, other):
+        if isinstance(other, collections.abc.Sequence) and not isinstance(other, str):
+            return self._list() == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(self._list())
+
+
+class DeltaEvent(collections.abc.Sequence):
+    """A history event for a change to a `list` or `dict` value, stored as
+    the difference from the previous event.
+
+    Parameters
+    ----------
+    previous : `tuple` or `DeltaEvent`
+        The event recording the value before this change.
+    op : `str`
+        Either ``"set"`` (``value[key] = item``) or ``"del"``
+        (``del value[key]``).
+    key : `int`, `slice`, or hashable
+        Index, slice or key that was changed.
+    item : object
+        New item (`None` for ``"del"``). For slice assignment this must be
+        a `list` that is not modified afterwards.
+    stack : sequence of `lsst.pex.config.callStack.StackFrame`
+        The call stack of the change.
+    label : `str`
+        Event label for the history.
+    current : `list` or `dict`
+        The value after the change; copied only when this event becomes a
+        snapshot.
+
+    Notes
+    -----
+    Recording a copy of a whole container for every change makes building
+    an N-element container item by item O(N^2) in time and memory. Instead,
+    this event keeps only the change itself and a reference to the previous
+    event, and rebuilds the full value when it is accessed. Every so often
+    (once the chain of deltas is as long as the container), an event stores a
+    copy of the value instead, so that rebuilding one value is O(N), and
+    appending an event is O(1) amortized.
+
+    Like the ``(value, stack, label)`` tuples of other events, a
+    ``DeltaEvent`` is a sequence of three elements.
+    """
+
+    __slots__ = ("_previous", "_op", "_key", "_item", "_value", "_depth", "stack", "label")
+
+    minSnapshotInterval = 16
+    """Minimum number of deltas between two snapshots (`int`).
+    """
+
+    def __init__(self, previous, op, key, item, stack, label, current):
+        self.stack = stack
+        self.label = label
+        depth = previous._depth + 1 if isinstance(previous, DeltaEvent) else 1
+        if depth >= max(self.minSnapshotInterval, len(current)):
+            self._previous = self._op = self._key = self._item = None
+            self._value = type(current)(current)
+            self._depth = 0
+        else:
+            self._previous = previous
+            self._op = op
+            self._key = key
+            self._item = item
+            self._value = None
+            self._depth = depth
+
+    @property
+    def value(self):
+        """The full value after this change (`list` or `dict`).
+        """
+        if self._previous is None:
+            return self._value
+        chain = []
+        event = self
+        while isinstance(event, DeltaEvent) and event._previous is not None:
+            chain.append(event)
+            event = event._previous
+        base = event[0]
+        value = type(base)(base)
+        for event in reversed(chain):
+            if event._op == "set":
+                value[event._key] = event._item
+            else:
+                del value[event._key]
+        return value
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self)[index]
+        index = range(3)[index]
+        if index == 0:
+            return self.value
+        return self.stack if index == 1 else self.label
+
+    def __len__(self):
+        return 3
+
+    def __iter__(self):
+        yield self.value
+        yield self.stack
+        yield self.label
+
+    def __eq__(self, other):
+        if isinstance(other, collections.abc.Sequence) and not isinstance(other, str):
+            return tuple(self) == tuple(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(tuple(self))
+
+
+_policy = HistoryPolicy()
+
+
+def getPolicy():
+    """Get the process-wide history policy.
+
+    Returns
+    -------
+    policy : `HistoryPolicy`
+        The policy used by `~lsst.pex.config.Config` classes that do not set
+        their own `~lsst.pex.config.Config.historyPolicy`.
+    """
+    return _policy
+
+
+def setPolicy(policy):
+    """Set the process-wide history policy.
+
+    Parameters
+    ----------
+    policy : `HistoryPolicy` or `str`
+        The new policy, or the name of a mode that does not need further
+        parameters (such as ``"off"`` or ``"full"``).
+
+    Returns
+    -------
+    oldPolicy : `HistoryPolicy`
+        The previous policy, so that it can be restored.
+
+    Examples
+    --------
+    Turn off history recording while building configs, then restore it:
+
+    >>> import lsst.pex.config.history as pexHistory
+    >>> oldPolicy = pexHistory.setPolicy("off")
+    >>> pexHistory.setPolicy(oldPolicy)
+    HistoryPolicy('off')
+    """
+    global _policy
+    if not isinstance(policy, HistoryPolicy):
+        policy = HistoryPolicy(policy)
+    oldPolicy, _policy = _policy, policy
+    return oldPolicy
+
 
 class Color:
     """A controller that determines whether strings should be colored.
@@ -214,13 +581,14 @@ def format(config, name=None, writeSourceLine=True, prefix="", verbose=False):
         outputs.append([value, output])
 
     # Find the maximum widths of the value and file:lineNo fields.
+    # Either may be empty if the history policy omits stacks or events.
     if writeSourceLine:
         sourceLengths = []
         for value, output in outputs:
-            sourceLengths.append(max([len(x[0][0]) for x in output]))
-        sourceLength = max(sourceLengths)
+            sourceLengths.append(max([len(x[0][0]) for x in output], default=0))
+        sourceLength = max(sourceLengths, default=0)
 
-    valueLength = len(prefix) + max([len(str(value)) for value, output in outputs])
+    valueLength = len(prefix) + max([len(str(value)) for value, output in outputs], default=0)
 
     # Generate the config history content.
     msg = []
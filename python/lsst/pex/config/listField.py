@@ -24,9 +24,11 @@ __all__ = ["ListField"]
 
 import collections.abc
 
-from .config import Field, FieldValidationError, _typeStr, _autocast, _joinNamePath
-from .comparison import compareScalars, getComparisonName
-from .callStack import getCallStack, getStackFrame
+from .config import (Field, FieldValidationError, _typeStr, _autocast, _joinNamePath,
+                     _getHistoryPolicy, _getFieldHistory, _markContainerChanged)
+from .comparison import getComparisonName
+from .callStack import getStackFrame
+from .history import DeltaEvent
 
 
 class List(collections.abc.MutableSequence):
@@ -59,8 +61,8 @@ class List(collections.abc.MutableSequence):
     def __init__(self, config, field, value, at, label, setHistory=True):
         self._field = field
         self._config = config
-        self._history = self._config._history.setdefault(self._field.name, [])
         self._list = []
+        self._lastEvent = None
         self.__doc__ = field.doc
         if value is not None:
             try:
@@ -69,8 +71,9 @@ class List(collections.abc.MutableSequence):
             except TypeError:
                 msg = "Value %s is of incorrect type %s. Sequence type expected" % (value, _typeStr(value))
                 raise FieldValidationError(self._field, self._config, msg)
-        if setHistory:
-            self.history.append((list(self._list), at, label))
+        if setHistory and _getHistoryPolicy(config).enabled:
+            self._lastEvent = (list(self._list), at, label)
+            self.history.append(self._lastEvent)
 
     def validateItem(self, i, x):
         """Validate an item to determine if it can be included in the list.
@@ -104,13 +107,25 @@ class List(collections.abc.MutableSequence):
         """
         return self._list
 
-    history = property(lambda x: x._history)
+    history = property(lambda x: _getFieldHistory(x._config, x._field.name))
     """Read-only history.
     """
 
     def __contains__(self, x):
         return x in self._list
 
+    def _copy(self, config, history):
+        """Copy this list for a copy of its config, without validating the
+        items (for internal use only).
+
+        The history of the list belongs to its config, so ``history`` is not
+        used here; it is accepted for the signature shared with
+        `~lsst.pex.config.dictField.Dict`.
+        """
+        other = object.__new__(type(self))
+        other.__dict__.update(self.__dict__, _config=config, _list=list(self._list), _lastEvent=None)
+        return other
+
     def __len__(self):
         return len(self._list)
 
@@ -130,10 +145,7 @@ class List(collections.abc.MutableSequence):
             self.validateItem(i, x)
 
         self._list[i] = x
-        if setHistory:
-            if at is None:
-                at = getCallStack()
-            self.history.append((list(self._list), at, label))
+        self._recordChange("set", i, list(x) if isinstance(i, slice) else x, at, label, setHistory)
 
     def __getitem__(self, i):
         return self._list[i]
@@ -143,10 +155,29 @@ class List(collections.abc.MutableSequence):
             raise FieldValidationError(self._field, self._config,
                                        "Cannot modify a frozen Config")
         del self._list[i]
-        if setHistory:
-            if at is None:
-                at = getCallStack()
-            self.history.append((list(self._list), at, label))
+        self._recordChange("del", i, None, at, label, setHistory)
+
+    def _recordChange(self, op, i, x, at, label, setHistory):
+        """Record a change to the list in the field's history.
+
+        The change is stored as a `~lsst.pex.config.history.DeltaEvent`
+        relative to the previous event of this list, so that building a list
+        item by item does not copy it for every item.
+        """
+        _markContainerChanged(self)
+        policy = _getHistoryPolicy(self._config)
+        if not (setHistory and policy.enabled):
+            # The previous event no longer describes the list.
+            self._lastEvent = None
+            return
+        if at is None:
+            at = policy.getCallStack(1)
+        if self._lastEvent is None:
+            event = (list(self._list), at, label)
+        else:
+            event = DeltaEvent(self._lastEvent, op, i, x, at, label, self._list)
+        self.history.append(event)
+        self._lastEvent = event
 
     def __iter__(self):
         return iter(self._list)
@@ -169,8 +200,8 @@ class List(collections.abc.MutableSequence):
             Enable setting the field's history, using the value of the ``at``
             parameter. Default is `True`.
         """
-        if at is None:
-            at = getCallStack()
+        if at is None and setHistory:
+            at = _getHistoryPolicy(self._config).getCallStack()
         self.__setitem__(slice(i, i), [x], at=at, label=label, setHistory=setHistory)
 
     def __repr__(self):
@@ -199,7 +230,8 @@ class List(collections.abc.MutableSequence):
         if hasattr(getattr(self.__class__, attr, None), '__set__'):
             # This allows properties to work.
             object.__setattr__(self, attr, value)
-        elif attr in self.__dict__ or attr in ["_field", "_config", "_history", "_list", "__doc__"]:
+        elif attr in self.__dict__ or attr in ["_field", "_config", "_history", "_list", "_lastEvent",
+                                               "__doc__"]:
             # This allows specific private attributes to work.
             object.__setattr__(self, attr, value)
         else:
@@ -347,16 +379,29 @@ class ListField(Field):
         if instance._frozen:
             raise FieldValidationError(self, instance, "Cannot modify a frozen Config")
 
+        policy = _getHistoryPolicy(instance)
         if at is None:
-            at = getCallStack()
+            at = policy.getCallStack()
 
         if value is not None:
             value = List(instance, self, value, at, label)
         else:
-            history = instance._history.setdefault(self.name, [])
-            history.append((value, at, label))
+            history = _getFieldHistory(instance, self.name)
+            if policy.enabled:
+                history.append((value, at, label))
 
         instance._storage[self.name] = value
+        instance._markChanged(self.name)
+
+    def _copy(self, source, target, history):
+        value = source._storage[self.name]
+        if value is not None:
+            value = value._copy(target, history)
+        target._storage[self.name] = value
+
+    def _getState(self, instance):
+        value = instance._storage[self.name]
+        return None if value is None else list(value)
 
     def toDict(self, instance):
         """Convert the value of this field to a plain `list`.
@@ -376,38 +421,23 @@ class ListField(Field):
         value = self.__get__(instance)
         return list(value) if value is not None else None
 
-    def _compare(self, instance1, instance2, shortcut, rtol, atol, output):
-        """Compare two config instances for equality with respect to this
-        field.
-
-        `lsst.pex.config.config.compare` is the primary user of this method.
+    def _addComparisons(self, instance1, instance2, comparison):
+        """Compare two config instances with respect to this field, as part
+        of the comparison of configs.
 
         Parameters
         ----------
         instance1 : `lsst.pex.config.Config`
-            Left-hand-side `~lsst.pex.config.Config` instance in the
-            comparison.
+            Left-hand side config instance to compare.
         instance2 : `lsst.pex.config.Config`
-            Right-hand-side `~lsst.pex.config.Config` instance in the
-            comparison.
-        shortcut : `bool`
-            If `True`, return as soon as an **inequality** is found.
-        rtol : `float`
-            Relative tolerance for floating point comparisons.
-        atol : `float`
-            Absolute tolerance for floating point comparisons.
-        output : callable
-            If not None, a callable that takes a `str`, used (possibly
-            repeatedly) to report inequalities.
-
-        Returns
-        -------
-        equal : `bool`
-            `True` if the fields are equal; `False` otherwise.
+            Right-hand side config instance to compare.
+        comparison : `lsst.pex.config.comparison._Comparison`
+            The comparison to add to.
 
         Notes
         -----
-        Floating point comparisons are performed by `numpy.allclose`.
+        Items of floating point lists are compared together with the other
+        floating point values of the configs.
         """
         l1 = getattr(instance1, self.name)
         l2 = getattr(instance2, self.name)
@@ -415,17 +445,13 @@ class ListField(Field):
             _joinNamePath(instance1._name, self.name),
             _joinNamePath(instance2._name, self.name)
         )
-        if not compareScalars("isnone for %s" % name, l1 is None, l2 is None, output=output):
-            return False
+        if not comparison.compareScalars("isnone for %s" % name, l1 is None, l2 is None):
+            return
         if l1 is None and l2 is None:
-            return True
-        if not compareScalars("size for %s" % name, len(l1), len(l2), output=output):
-            return False
-        equal = True
+            return
+        if not comparison.compareScalars("size for %s" % name, len(l1), len(l2)):
+            return
         for n, v1, v2 in zip(range(len(l1)), l1, l2):
-            result = compareScalars("%s[%d]" % (name, n), v1, v2, dtype=self.dtype,
-                                    rtol=rtol, atol=atol, output=output)
-            if not result and shortcut:
-                return False
-            equal = equal and result
-        return equal
+            if comparison.compareScalars("%s[%d]" % (name, n), v1, v2, dtype=self.dtype) is False \
+                    and comparison.done:
+                return
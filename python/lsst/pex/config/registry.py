@@ -25,7 +25,8 @@ __all__ = ("Registry", "makeRegistry", "RegistryField", "registerConfig", "regis
 import collections.abc
 import copy
 
-from .config import Config, FieldValidationError, _typeStr
+from .config import (Config, FieldValidationError, _typeStr, _invalidatePrototypes,
+                     _recordPrototypeDependency)
 from .configChoiceField import ConfigInstanceDict, ConfigChoiceField
 
 
@@ -108,6 +109,11 @@ class Registry(collections.abc.Mapping):
     8
     """
 
+    _prototypeGeneration = 0
+    """Counter incremented whenever an item is added, to invalidate the
+    prototypes of configs made while the item was missing (`int`).
+    """
+
     def __init__(self, configBaseType=Config):
         if not issubclass(configBaseType, Config):
             raise TypeError("configBaseType=%s must be a subclass of Config" % _typeStr(configBaseType,))
@@ -154,6 +160,8 @@ class Registry(collections.abc.Mapping):
             raise TypeError("ConfigClass=%s is not a subclass of %r" %
                             (_typeStr(wrapper.ConfigClass), _typeStr(self._configBaseType)))
         self._dict[name] = wrapper
+        # Configs whose prototypes were made without this item may differ
+        _invalidatePrototypes(self)
 
     def __getitem__(self, key):
         return self._dict[key]
@@ -231,6 +239,7 @@ class RegistryInstanceDict(ConfigInstanceDict):
     def __init__(self, config, field):
         ConfigInstanceDict.__init__(self, config, field)
         self.registry = field.registry
+        _recordPrototypeDependency(self.registry)
 
     def _getTarget(self):
         if self._field.multi:
@@ -0,0 +1,121 @@
+#
+# LSST Data Management System
+# Copyright 2008, 2009, 2010 LSST Corporation.
+#
+# This product includes software developed by the
+# LSST Project (http://www.lsstcorp.org/).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the LSST License Statement and
+# the GNU General Public License along with this program.  If not,
+# see <http://www.lsstcorp.org/LegalNotices/>.
+#
+"""An on-disk cache of the changes that override files make to configs.
+
+`lsst.pex.config.Config.loadOverrides` (and `lsst.pex.config.Config.load`)
+store the changes made by the overrides they apply in a `StateCache`, so that
+later loads of the same overrides onto an equal config, in this or another
+process, apply the changes directly instead of executing the overrides.
+
+The cache is off unless a directory is given, either with `setCache` or with
+the ``PEX_CONFIG_STATE_CACHE`` environment variable. The cache holds pickles,
+so the directory must be private to the user: it is not used if another user
+owns it or can write to it.
+"""
+
+__all__ = ('StateCache', 'getCache', 'setCache')
+
+import os
+import pickle
+import warnings
+
+from .codeCache import _DirectoryCache
+
+
+class StateCache(_DirectoryCache):
+    """A directory of the changes made to configs by overrides.
+
+    Parameters
+    ----------
+    directory : `str`
+        The cache directory; it is created, private to the user, if it does
+        not exist.
+    maxSize : `int` or `None`, optional
+        The maximum total size of the cached files in bytes (256 MiB by
+        default), or `None` for no limit. When it is exceeded, the least
+        recently used files are removed.
+
+    Notes
+    -----
+    Each entry is a pickle of the hashes of the files loaded by the overrides,
+    of the modules they imported and of the changes returned by
+    `lsst.pex.config.Config.diffSince`, stored under a hash of the rest of
+    what the result depends on: see `lsst.pex.config.Config.loadOverrides`.
+    Entries are signed, and the directory is checked, as described for
+    `lsst.pex.config.codeCache.CodeCache`.
+    """
+
+    suffix = ".pickle"
+
+    def _load(self, f):
+        return pickle.load(f)
+
+    def _dump(self, obj, f):
+        pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _makeDefaultCache():
+    directory = os.environ.get("PEX_CONFIG_STATE_CACHE")
+    if not directory:
+        return None
+    try:
+        return StateCache(directory)
+    except OSError as e:
+        # The cache is an optimization: do not fail to import because of it.
+        warnings.warn("Not using the cache in PEX_CONFIG_STATE_CACHE=%r: %s" % (directory, e))
+        return None
+
+
+_cache = _makeDefaultCache()
+
+
+def getCache():
+    """Get the process-wide state cache.
+
+    Returns
+    -------
+    cache : `StateCache` or `None`
+        The cache used by `lsst.pex.config.Config.loadOverrides`, or `None` if
+        there is none.
+    """
+    return _cache
+
+
+def setCache(cache):
+    """Set the process-wide state cache.
+
+    Parameters
+    ----------
+    cache : `StateCache`, `str` or `None`
+        The new cache, the directory of a new cache, or `None` to turn
+        caching off.
+
+    Returns
+    -------
+    oldCache : `StateCache` or `None`
+        The previous cache, so that it can be restored.
+    """
+    global _cache
+    if isinstance(cache, str):
+        cache = StateCache(cache)
+    oldCache, _cache = _cache, cache
+    return oldCache
@@ -25,10 +25,10 @@ import inspect
 import re
 import importlib
 
-from .config import Config, Field
+from .config import Config, Field, _getHistoryPolicy
 from .listField import ListField, List
 from .configField import ConfigField
-from .callStack import getCallerFrame, getCallStack
+from .callStack import getCallerFrame
 
 _dtypeMap = {
     "bool": bool,
@@ -242,7 +242,7 @@ def makeConfigClass(ctrl, name=None, base=Config, doc=None, module=None, cls=Non
         use only; they are used to remove internal calls from the history.
         """
         if __at is None:
-            __at = getCallStack()
+            __at = _getHistoryPolicy(self).getCallStack()
         values = {}
         for k, f in fields.items():
             if isinstance(f, ConfigField):
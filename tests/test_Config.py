@@ -22,10 +22,13 @@
 # see <http://www.lsstcorp.org/LegalNotices/>.
 #
 
+import concurrent.futures
+import copy
 import io
 import itertools
 import re
 import os
+import sys
 import unittest
 import lsst.utils.tests
 import lsst.pex.config as pexConfig
@@ -228,6 +231,105 @@ class ConfigTest(unittest.TestCase):
         self.assertEqual(self.comp.c.f, roundTrip.c.f)
         self.assertEqual(self.comp.r.name, roundTrip.r.name)
 
+    def testIterSave(self):
+        self.comp.c.f = 5.
+        self.comp.r.name = "BBB"
+        names = [self.comp._name, self.comp.c._name, self.comp.r["AAA"]._name]
+        chunks = list(self.comp.iterSave(root="root"))
+        self.assertTrue(all(isinstance(chunk, str) for chunk in chunks))
+        # saving does not rename the configs
+        self.assertEqual([self.comp._name, self.comp.c._name, self.comp.r["AAA"]._name], names)
+
+        outfile = io.StringIO()
+        self.comp.saveToStream(outfile, root="root")
+        self.assertEqual(outfile.getvalue(), "".join(chunks))
+        self.assertIn("root.r['AAA'].f=", outfile.getvalue())
+
+        roundTrip = Complex()
+        roundTrip.loadFromStream(outfile.getvalue())
+        self.assertTrue(roundTrip.compare(self.comp))
+
+    def testCustomSave(self):
+        """Test that fields that override Field.save and
+        Field._collectImports are saved with them.
+        """
+        class TenField(pexConfig.Field):
+            def save(self, outfile, instance):
+                outfile.write("%s.%s=10\n" % (instance._name, self.name))
+
+            def _collectImports(self, instance, imports):
+                imports.add("json")
+
+        class TenConfig(pexConfig.Config):
+            f = TenField("an integer", int, default=1)
+            g = pexConfig.Field("another integer", int, default=2)
+
+        class TenOuterConfig(pexConfig.Config):
+            sub = pexConfig.ConfigField("a subconfig", TenConfig)
+
+        config = TenOuterConfig()
+        text = "".join(config.iterSave())
+        self.assertIn("config.sub.f=10\n", text)
+        self.assertIn("config.sub.g=2\n", text)
+        self.assertIn("import json\n", text)
+        self.assertIsNone(config._name)
+        self.assertEqual(config.sub._name, "sub")
+
+    def testSaveMinimal(self):
+        # a default config needs nothing beyond the imports and type check
+        header = "".join(self.comp.iterSave(minimal=True))
+        self.assertTrue(all(line.startswith(("import ", "assert ")) for line in header.splitlines()))
+
+        self.comp.c.f = 5.
+        self.comp.r.name = "BBB"
+        self.comp.r["AAA"].ll.append(4)
+        self.comp.r["BBB"].f = 0.0
+        self.comp.p["AAA"].f = 4.
+        self.comp.p["AAA"].d["key"] = "value"
+        stream = io.StringIO()
+        self.comp.saveToStream(stream, minimal=True)
+        body = stream.getvalue()[len(header):]
+        self.assertEqual(body.splitlines(), ["config.c.f=5.0",
+                                             "config.r['AAA'].ll=[1, 2, 3, 4]",
+                                             "config.r.name='BBB'",
+                                             "config.p['AAA'].f=4.0"])
+
+        roundTrip = Complex()
+        roundTrip.loadFromStream(stream.getvalue())
+        self.assertTrue(roundTrip.compare(self.comp))
+
+    def testSaveCanonical(self):
+        # equal configs, built in different orders
+        other = Complex()
+        self.comp.r["BBB"].f = 1.0
+        self.comp.r["AAA"].d = {"b": "v1", "a": "v2"}
+        self.comp.r["AAA"].f = -0.0
+        other.r["AAA"].d = {"a": "v2", "b": "v1"}
+        other.r["AAA"].f = 0.0
+        other.r["BBB"].f = 1.0
+        self.assertTrue(self.comp.compare(other))
+        self.assertNotEqual("".join(self.comp.iterSave()), "".join(other.iterSave()))
+
+        text = "".join(self.comp.iterSave(canonical=True))
+        self.assertEqual(text, "".join(other.iterSave(canonical=True)))
+        self.assertIn("config.r['AAA'].d={'a': 'v2', 'b': 'v1'}\n", text)
+        self.assertIn("config.r['AAA'].n=float('nan')\n", text)
+        self.assertLess(text.index("config.r['AAA']"), text.index("config.r['BBB']"))
+
+        roundTrip = Complex()
+        roundTrip.loadFromStream(text)
+        self.assertTrue(roundTrip.compare(self.comp))
+
+        # a subconfig that is made but not changed is not written
+        other.p["AAA"]
+        other.r["BBB"].f = 0.0
+        self.comp.r["BBB"].f = 0.0
+        self.assertTrue(self.comp.compare(other))
+        text = "".join(self.comp.iterSave(canonical=True))
+        self.assertEqual(text, "".join(other.iterSave(canonical=True)))
+        self.assertNotIn("config.p['AAA']", text)
+        self.assertNotIn("config.r['BBB']", text)
+
     def testDuplicateRegistryNames(self):
         self.comp.r["AAA"].f = 5.0
         self.assertEqual(self.comp.p["AAA"].f, 3.0)
@@ -287,6 +389,23 @@ class ConfigTest(unittest.TestCase):
         self.assertEqual(III.a.default, 5)
         self.assertEqual(AAA.a.default, 4)
 
+        # inherited fields are separate objects that share their values
+        class JJJ(pexConfig.Config):
+            a = pexConfig.ListField("JJJ.a", int, default=[1, 2, 3])
+            b = a
+
+        class KKK(JJJ):
+            pass
+        self.assertIsNot(KKK.a, JJJ.a)
+        self.assertIs(KKK.a.default, JJJ.a.default)
+        self.assertIs(KKK._fields["a"], KKK.a)
+        self.assertEqual((JJJ.a.name, JJJ.b.name), ("a", "b"))
+        self.assertEqual((KKK.a.name, KKK.b.name), ("a", "b"))
+        k = KKK()
+        k.b.append(4)
+        self.assertEqual(list(k.a), [1, 2, 3])
+        self.assertEqual(list(k.b), [1, 2, 3, 4])
+
     def testConvert(self):
         pol = pexConfig.makePolicy(self.simple)
         self.assertEqual(pol.exists("i"), False)
@@ -342,6 +461,41 @@ class ConfigTest(unittest.TestCase):
         importing = "import lsst.pex.config._doNotImportMe\n"
         self.checkImportRoundTrip(importing, importing, True)
 
+    def testImportModule(self):
+        """Test that modules imported with importlib.import_module are
+        recorded.
+        """
+        importing = "import importlib\nimportlib.import_module('lsst.pex.config._doNotImportMe')\n"
+        self.checkImportRoundTrip(importing, "import lsst.pex.config._doNotImportMe\n", True)
+        config = Simple()
+        config.loadFromStream("from importlib import import_module\n"
+                              "import importlib.util\n"
+                              "config.i = len(import_module('.decoder', 'json').__name__)\n"
+                              "assert importlib.util.find_spec('colorsys') is not None\n")
+        self.assertEqual(config._imports, {"importlib", "importlib.util", "json.decoder"})
+
+    def testConcurrentImports(self):
+        """Test that loading configs in several threads at once records the
+        imports of each, and leaves `sys.meta_path` alone.
+        """
+        metaPath = list(sys.meta_path)
+        modules = ["colorsys", "json", "lsst.pex.config._doNotImportMe", "os.path"]
+
+        def load(i):
+            module = modules[i % len(modules)]
+            config = Simple()
+            config.loadFromStream("import %s\n"
+                                  "from os import path\n"
+                                  "config.i = %d\n" % (module, i))
+            return config
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=8) as pool:
+            configs = list(pool.map(load, range(40)))
+        for i, config in enumerate(configs):
+            self.assertEqual(config.i, i)
+            self.assertEqual(config._imports, {modules[i % len(modules)], "os", "os.path"})
+        self.assertEqual(sys.meta_path, metaPath)
+
     def testBadImports(self):
         dummy = "somethingThatDoesntExist"
         importing = """
@@ -363,6 +517,23 @@ except ImportError:
         self.assertIsInstance(comp, Complex)
         self.assertEqual(self.comp.c.f, comp.c.f)
 
+        self.comp.r.name = "BBB"
+        self.comp.r["AAA"].ll.append(4)
+        self.comp.r["AAA"].d = None
+        self.comp.p = None
+        comp = pickle.loads(pickle.dumps(self.comp))
+        self.assertEqual(comp, self.comp)
+        self.assertEqual(comp.r.name, "BBB")
+        self.assertEqual(comp.r["AAA"].ll, [1, 2, 3, 4])
+        self.assertIsNone(comp.r["AAA"].d)
+        self.assertEqual(comp.r["AAA"].history["ll"][-1][2], "unpickle")
+
+        # Configs pickled as source code can still be unpickled
+        stream = io.StringIO()
+        self.comp.saveToStream(stream)
+        comp = pexConfig.config.unreduceConfig(Complex, stream.getvalue().encode())
+        self.assertEqual(comp, self.comp)
+
     def testCompare(self):
         comp2 = Complex()
         inner2 = InnerConfig()
@@ -410,17 +581,375 @@ except ImportError:
         self.assertIn("Inequality in r['AAA']", output)
         self.assertNotIn("Inequality in r['BBB']", output)
 
+        # Floating point values are compared last, but inequalities are still
+        # reported in the order of the fields.
+        simple3 = Simple()
+        simple3.f += 1E8
+        simple3.b = True
+        del outList[:]
+        self.assertFalse(Simple().compare(simple3, shortcut=True, output=outFunc))
+        self.assertEqual(len(outList), 1)
+        self.assertIn("Inequality in f", outList[0])
+        del outList[:]
+        self.assertFalse(Simple().compare(simple3, shortcut=False, output=outFunc))
+        self.assertEqual(len(outList), 2)
+        self.assertIn("Inequality in f", outList[0])
+        self.assertIn("Inequality in b", outList[1])
+
         # Before DM-16561, this incorrectly returned `True`.
         self.assertFalse(self.inner.compare(self.outer))
         # Before DM-16561, this raised.
         self.assertFalse(self.outer.compare(self.inner))
 
+    def testGroupConfigs(self):
+        configs = [Complex() for i in range(6)]
+        configs[1].c.f = 1E-10                  # within the tolerance
+        configs[2].r["AAA"].f = 4.0
+        configs[3].r["BBB"].f = 1.0             # not selected
+        configs[4].r["AAA"].f = 4.0 + 1E-10
+        configs[4].r["AAA"].d = {"key": "value"}
+        configs[5].r["AAA"].d = {"a": "v1", "b": "v2"}
+        configs.append(Complex())
+        configs[6].r["AAA"].d = {"b": "v2", "a": "v1"}
+        groups = pexConfig.groupConfigs(configs)
+        self.assertEqual([indices for _, indices in groups], [[0, 1, 3], [2, 4], [5, 6]])
+        self.assertIs(groups[0][0], configs[0])
+        self.assertIs(groups[1][0], configs[2])
+        for representative, indices in groups:
+            for i, config in enumerate(configs):
+                self.assertEqual(representative.compare(config), i in indices)
+        self.assertEqual(len(pexConfig.groupConfigs(configs, rtol=0.0, atol=0.0)), 5)
+        self.assertEqual(pexConfig.groupConfigs([]), [])
+
+    def testCustomCompare(self):
+        """Test that fields that override Field._compare are compared with
+        it.
+        """
+        class CaseInsensitiveField(pexConfig.Field):
+            def _compare(self, instance1, instance2, shortcut, rtol, atol, output):
+                v1 = getattr(instance1, self.name)
+                v2 = getattr(instance2, self.name)
+                if v1.lower() != v2.lower():
+                    if output is not None:
+                        output("Inequality in %s" % self.name)
+                    return False
+                return True
+
+        class CaseConfig(pexConfig.Config):
+            s = CaseInsensitiveField("a string", str, default="abc")
+            f = pexConfig.Field("a float", float, default=1.0)
+
+        class CaseOuterConfig(pexConfig.Config):
+            sub = pexConfig.ConfigField("a subconfig", CaseConfig)
+
+        configs = [CaseOuterConfig() for i in range(4)]
+        configs[1].sub.s = "ABC"
+        configs[2].sub.s = "abd"
+        configs[3].sub.f = 2.0
+        self.assertTrue(configs[0].compare(configs[1]))
+        self.assertTrue(pexConfig.compareConfigs("sub", configs[0].sub, configs[1].sub))
+        outList = []
+        self.assertFalse(configs[0].compare(configs[3], output=outList.append))
+        self.assertFalse(configs[2].compare(configs[3], shortcut=False, output=outList.append))
+        self.assertEqual(len(outList), 3)
+        groups = pexConfig.groupConfigs(configs)
+        self.assertEqual([indices for _, indices in groups], [[0, 1], [2], [3]])
+
+    def testLoadFromDict(self):
+        self.comp.c.f = 2.0
+        self.comp.r = "BBB"
+        self.comp.r["AAA"].ll.append(4)
+        self.comp.r["BBB"].f = 5.0
+        comp = Complex()
+        comp.loadFromDict(self.comp.toDict())
+        self.assertEqual(comp.toDict(), self.comp.toDict())
+        self.assertTrue(comp.compare(self.comp))
+        self.assertEqual(comp.r["AAA"].ll, [1, 2, 3, 4])
+        self.assertEqual(len(comp.c.history["f"]), 2)
+        self.assertEqual(comp.c.history["f"][-1][2], "loadFromDict")
+
+        simple = Simple()
+        simple.loadFromJson(io.StringIO('{"f": 4, "ll": [5], "d": {"key2": "value2"}}'))
+        self.assertEqual(simple.f, 4.0)
+        self.assertEqual(simple.ll, [5])
+        self.assertEqual(simple.d, {"key2": "value2"})
+        self.assertEqual(simple.b, False)
+        simple.loadFromJson('{"i": 6}')
+        self.assertEqual(simple.i, 6)
+
+        comp = Complex()
+        comp.loadFromJson('{"r": {"values": {"BBB": {"f": 2.5}}}, "p": {"name": null}}')
+        self.assertEqual(comp.r.name, "AAA")
+        self.assertEqual(comp.r["BBB"].f, 2.5)
+        self.assertIsNone(comp.p.name)
+
+        self.assertRaises(KeyError, simple.loadFromDict, {"missing": 1})
+        self.assertRaises(pexConfig.FieldValidationError, simple.loadFromDict, {"ll": [0]})
+        simple.freeze()
+        self.assertRaises(pexConfig.FieldValidationError, simple.loadFromDict, {"f": 1.0})
+
     def testLoadError(self):
         """Check that loading allows errors in the file being loaded to propagate
         """
         self.assertRaises(SyntaxError, self.simple.loadFromStream, "bork bork bork")
         self.assertRaises(NameError, self.simple.loadFromStream, "config.f = bork")
 
+    def testPrototype(self):
+        """Test that instances copied from a class's prototype are independent
+        and that the prototype is rebuilt when the class changes.
+        """
+        calls = []
+        registry = pexConfig.makeRegistry("A registry for testPrototype")
+
+        class PrototypeInnerConfig(InnerConfig):
+            usePrototype = True
+
+        class PrototypeConfig(pexConfig.Config):
+            usePrototype = True
+            ll = pexConfig.ListField("list", int, default=[1])
+            d = pexConfig.DictField("dict", str, int, default={"a": 1})
+            c = pexConfig.ConfigField("subconfig", PrototypeInnerConfig)
+            m = pexConfig.ConfigChoiceField("multi-selection", typemap=GLOBAL_REGISTRY, multi=True)
+            cd = pexConfig.ConfigDictField("config dict", str, PrototypeInnerConfig, default={})
+            r = registry.makeField("registry field", optional=True)
+
+            def setDefaults(self):
+                calls.append(self)
+                self.ll.append(2)
+                self.c.f = 1.0
+                self.m.names = ["BBB"]
+                self.cd["x"] = PrototypeInnerConfig()
+
+        a = PrototypeConfig()
+        b = PrototypeConfig()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(b.ll, [1, 2])
+        self.assertEqual(b.c.f, 1.0)
+        self.assertEqual(b.c._name, "c")
+        self.assertEqual(b.cd["x"]._name, "cd['x']")
+        self.assertEqual(list(b.m.names), ["BBB"])
+        b.ll.append(3)
+        b.d["b"] = 2
+        b.c.f = 2.0
+        b.m.names.add("AAA")
+        b.m["BBB"].f = 3.0
+        b.cd["x"].f = 4.0
+        self.assertEqual(a.ll, [1, 2])
+        self.assertEqual(a.d, {"a": 1})
+        self.assertEqual(a.c.f, 1.0)
+        self.assertEqual(list(a.m.names), ["BBB"])
+        self.assertEqual(a.m["BBB"].f, 0.0)
+        self.assertEqual(a.cd["x"].f, 0.0)
+        self.assertIs(b.m._selection._dict, b.m)
+        self.assertEqual(PrototypeConfig(c=PrototypeInnerConfig(f=7.0), __name="n").c._name, "n.c")
+        self.assertEqual([h[0] for h in b.history["ll"]], [[1], [1, 2], [1, 2, 3]])
+
+        # the changes made by setDefaults are recorded where each instance is
+        # made, while the default events are shared
+        def makeConfig():
+            return PrototypeConfig()
+
+        c = makeConfig()
+        self.assertEqual(len(calls), 1)
+        self.assertIs(c.history["ll"][0], a.history["ll"][0])
+        for history in (c.history["ll"], c.c.history["f"]):
+            self.assertIn("makeConfig", [frame.function for frame in history[-1][1]])
+        for history in (a.history["ll"], b.history["ll"][:2], a.c.history["f"]):
+            self.assertNotIn("makeConfig", [frame.function for frame in history[-1][1]])
+
+        registry.register("simple", object, Simple)
+        self.assertEqual(PrototypeConfig().r["simple"].f, 3.0)
+        self.assertEqual(len(calls), 2)
+
+        # changing a field invalidates the prototypes of its class, of the
+        # subclasses and of the classes with subconfigs of it, but no others
+        class PrototypeSubConfig(PrototypeConfig):
+            pass
+
+        PrototypeSubConfig()
+        self.assertEqual(len(calls), 3)
+        PrototypeConfig.ll.default = [5]
+        self.assertEqual(PrototypeConfig().ll, [5, 2])
+        self.assertEqual(PrototypeConfig().history["ll"][0][0], [5])
+        self.assertEqual(PrototypeSubConfig().ll, [1, 2])
+        self.assertEqual(len(calls), 5)
+        PrototypeInnerConfig.f.default = 2.0
+        self.assertEqual(PrototypeConfig().cd["x"].f, 2.0)
+        self.assertEqual(len(calls), 6)
+        prototype = PrototypeConfig._prototype
+        Simple.f.default = 3.0
+        PrototypeConfig()
+        self.assertIs(PrototypeConfig._prototype, prototype)
+        self.assertEqual(len(calls), 6)
+
+        # subconfigs of classes that do not use prototypes are made anew
+        class OuterPrototypeConfig(pexConfig.Config):
+            usePrototype = True
+            c = pexConfig.ConfigField("subconfig", InnerConfig)
+
+        OuterPrototypeConfig()
+        self.assertIsNone(OuterPrototypeConfig._prototype)
+
+        PrototypeConfig.usePrototype = False
+        PrototypeConfig()
+        PrototypeConfig()
+        self.assertEqual(len(calls), 8)
+
+    def testCopy(self):
+        self.comp.c.f = 2.0
+        self.comp.r["AAA"].ll.append(4)
+        self.comp.p = None
+        for other in (self.comp.copy(), copy.deepcopy(self.comp)):
+            self.assertEqual(other, self.comp)
+            self.assertIsNot(other.c, self.comp.c)
+            self.assertEqual(other.r["AAA"]._name, "r['AAA']")
+            other.r["AAA"].ll.append(5)
+            other.c.f = 3.0
+            self.assertEqual(self.comp.r["AAA"].ll, [1, 2, 3, 4])
+            self.assertEqual(self.comp.c.f, 2.0)
+        self.assertEqual([h[0] for h in self.comp.copy().c.history["f"]],
+                         [h[0] for h in self.comp.c.history["f"]])
+        self.assertEqual(len(self.comp.copy(history=False).c.history["f"]), 0)
+
+        self.comp.freeze()
+        self.assertTrue(copy.deepcopy(self.comp)._frozen)
+        self.assertTrue(copy.deepcopy(self.comp).c._frozen)
+        other = self.comp.copy()
+        self.assertFalse(other._frozen)
+        other.c.f = 4.0
+
+    def testFingerprint(self):
+        fingerprint = self.comp.fingerprint()
+        self.assertEqual(fingerprint, Complex().fingerprint())
+        self.assertRaises(TypeError, hash, self.comp)
+
+        # making choices with their default values makes no difference
+        self.comp.r["BBB"]
+        self.comp.p["AAA"].n = float("nan")
+        self.assertEqual(self.comp.fingerprint(), fingerprint)
+        self.comp.r["BBB"].f = 1
+        self.assertNotEqual(self.comp.fingerprint(), fingerprint)
+        self.comp.r["BBB"].f = 0.0
+        self.comp.p = "AAA"
+        self.assertNotEqual(self.comp.fingerprint(), fingerprint)
+        self.comp.p = "BBB"
+        self.comp.r["AAA"].d = {"key": "value"}
+        self.assertEqual(self.comp.fingerprint(), fingerprint)
+        self.assertNotEqual(self.inner.fingerprint(), self.outer.i.fingerprint())
+
+        # frozen configs cache their fingerprint and use it to compare
+        other = Complex()
+        self.comp.freeze()
+        other.freeze()
+        self.assertEqual(self.comp._fingerprint, fingerprint)
+        self.assertEqual(self.comp, other)
+        self.assertEqual(len({self.comp, other, copy.deepcopy(other)}), 1)
+        self.assertIsNotNone(self.comp.c._fingerprint)
+
+        # NaNs compare equal whether or not the configs are frozen
+        class NanConfig(pexConfig.Config):
+            ll = pexConfig.ListField("list of NaN", float, default=[float("nan")])
+            d = pexConfig.DictField("dict of NaN", str, float, default={"a": float("nan")})
+
+        c, d = NanConfig(), NanConfig()
+        c.ll = [float("nan")]
+        d.d = {"a": float("nan")}
+        self.assertEqual(c, d)
+        c.freeze()
+        d.freeze()
+        self.assertEqual(c, d)
+        c, d = NanConfig(), NanConfig()
+        c.ll.append(1.0)
+        self.assertNotEqual(c, d)
+        d.d["b"] = float("nan")
+        c.ll = [float("nan")]
+        self.assertNotEqual(c, d)
+
+    def testChangedFields(self):
+        self.assertEqual(Complex().changedFields(0), set())
+        self.assertEqual(self.outer.changedFields(0), {"i"})
+
+        checkpoint = self.comp.checkpoint()
+        self.comp.c.f = 1.0
+        self.assertEqual(self.comp.changedFields(checkpoint), {"c"})
+        self.assertEqual(self.comp.c.changedFields(checkpoint), {"f"})
+        self.comp.r["AAA"].ll.append(4)
+        self.comp.p.name = None
+        self.assertEqual(self.comp.changedFields(checkpoint), {"c", "r", "p"})
+        self.assertEqual(self.comp.r["AAA"].changedFields(checkpoint), {"ll"})
+        self.assertEqual(self.comp.changedFields(self.comp.checkpoint()), set())
+
+        # making a subconfig with its defaults on first read changes nothing
+        # but the subconfigs that toDict lists
+        for frozen in (False, True):
+            config = Complex()
+            self.assertNotIn("AAA", config.toDict()["p"]["values"])
+            if frozen:
+                config.freeze()
+            checkpoint = config.checkpoint()
+            fingerprint = config.fingerprint()
+            config.p["AAA"]
+            self.assertEqual(config.changedFields(checkpoint), set())
+            self.assertEqual(config._fingerprint, fingerprint)
+            self.assertIn("AAA", config.toDict()["p"]["values"])
+        config = Complex()
+        checkpoint = config.checkpoint()
+        config.p["AAA"].f = 4.0
+        self.assertEqual(config.changedFields(checkpoint), {"p"})
+        self.assertEqual(self.comp.copy().changedFields(checkpoint), set())
+
+    def testDiffSince(self):
+        self.comp.c.f = 1.0
+        checkpoint = self.comp.checkpoint()
+        self.assertEqual(self.comp.diffSince(checkpoint), {})
+        self.comp.r["AAA"].ll.append(4)
+        self.comp.r["BBB"].f = 2.0
+        self.comp.p = None
+        changes = self.comp.diffSince(checkpoint)
+        self.assertEqual(set(changes), {"r", "p"})
+
+        other = Complex()
+        other.c.f = 3.0
+        other.r["AAA"].f = 4.0
+        other.applyChanges(pickle.loads(pickle.dumps(changes)))
+        self.assertEqual(other.c.f, 3.0)
+        self.assertEqual(other.r["AAA"].f, 4.0)
+        self.assertEqual(other.r["AAA"].ll, [1, 2, 3, 4])
+        self.assertEqual(other.r["BBB"].f, 2.0)
+        self.assertIsNone(other.p.name)
+        self.assertEqual(other.history["p"][-1][2], "applyChanges")
+
+        # a config made since the checkpoint is replaced as a whole
+        self.comp.p["AAA"].f = 5.0
+        other.p["AAA"].i = 7
+        other.applyChanges(self.comp.diffSince(checkpoint))
+        self.assertEqual(other.p["AAA"].f, 5.0)
+        self.assertIsNone(other.p["AAA"].i)
+
+    def testIncrementalFingerprint(self):
+        """Test that cached fingerprints and dicts are only recomputed for
+        the subconfigs that change.
+        """
+        fingerprint = self.comp.fingerprint()
+        dict_ = self.comp.toDict()
+        dict_["c"]["f"] = 4.0
+        self.assertEqual(self.comp.toDict()["c"]["f"], 0.0)
+
+        self.comp.r["AAA"].ll.append(4)
+        self.assertIsNone(self.comp._fingerprint)
+        self.assertIsNotNone(self.comp.c._fingerprint)
+        self.assertNotEqual(self.comp.fingerprint(), fingerprint)
+        self.assertEqual(self.comp.toDict()["r"]["values"]["AAA"]["ll"], [1, 2, 3, 4])
+        del self.comp.r["AAA"].ll[3]
+        self.assertEqual(self.comp.fingerprint(), fingerprint)
+        self.assertEqual(self.comp.toDict()["r"]["values"]["AAA"]["ll"], [1, 2, 3])
+
+        other = self.comp.copy()
+        self.assertEqual(other._fingerprint, fingerprint)
+        other.c.f = 2.0
+        self.assertNotEqual(other.fingerprint(), fingerprint)
+        self.assertEqual(self.comp.fingerprint(), fingerprint)
+
     def testNames(self):
         """Check that the names() method returns valid keys
 
@@ -432,6 +961,14 @@ except ImportError:
         self.assertEqual(len(names), 8)
         for name in names:
             self.assertTrue(hasattr(self.simple, name))
+        self.assertEqual(list(self.simple.iterNames()), names)
+        self.assertEqual(next(self.simple.iterNames()), "i")
+
+        self.comp.r["BBB"]
+        self.assertEqual(self.comp.names(),
+                         ["c.f", "r['AAA'].i", "r['AAA'].f", "r['AAA'].b", "r['AAA'].c", "r['AAA'].r",
+                          "r['AAA'].ll", "r['AAA'].d", "r['AAA'].n", "r['BBB'].f", "r.name",
+                          "p['BBB'].f", "p.name"])
 
 
 class TestMemory(lsst.utils.tests.MemoryTestCase):
@@ -0,0 +1,138 @@
+#
+# LSST Data Management System
+# Copyright 2008, 2009, 2010 LSST Corporation.
+#
+# This product includes software developed by the
+# LSST Project (http://www.lsstcorp.org/).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the LSST License Statement and
+# the GNU General Public License along with this program.  If not,
+# see <http://www.lsstcorp.org/LegalNotices/>.
+#
+
+import os
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+import lsst.utils.tests
+import lsst.pex.config as pexConfig
+import lsst.pex.config.codeCache as pexConfigCodeCache
+
+
+class SimpleConfig(pexConfig.Config):
+    i = pexConfig.Field("An integer", int, default=0)
+
+
+class CodeCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cacheDir = os.path.join(self.directory, "cache")
+        self.oldCache = pexConfigCodeCache.setCache(self.cacheDir)
+
+    def tearDown(self):
+        pexConfigCodeCache.setCache(self.oldCache)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def writeOverrides(self, name, text):
+        filename = os.path.join(self.directory, name)
+        with open(filename, "w") as f:
+            f.write(text)
+        return filename
+
+    def cachedFiles(self):
+        return sorted(f for f in os.listdir(self.cacheDir) if f.endswith(".pyc"))
+
+    def testLoad(self):
+        filename = self.writeOverrides("overrides.py", "config.i = 1\n")
+        config = SimpleConfig()
+        config.load(filename)
+        self.assertEqual(config.i, 1)
+        files = self.cachedFiles()
+        self.assertEqual(len(files), 1)
+
+        config = SimpleConfig()
+        config.load(filename)
+        self.assertEqual(config.i, 1)
+        self.assertEqual(self.cachedFiles(), files)
+
+        # An edited file must not use the old code.
+        self.writeOverrides("overrides.py", "config.i = 22\n")
+        config = SimpleConfig()
+        config.load(filename)
+        self.assertEqual(config.i, 22)
+        self.assertEqual(len(self.cachedFiles()), 2)
+
+        # A damaged cache file is compiled again.
+        for name in self.cachedFiles():
+            with open(os.path.join(self.cacheDir, name), "wb") as f:
+                f.write(b"\0")
+        config = SimpleConfig()
+        config.load(filename)
+        self.assertEqual(config.i, 22)
+
+    def testEvict(self):
+        cache = pexConfigCodeCache.getCache()
+        filenames = [self.writeOverrides("overrides%d.py" % i, "config.i = %d\n" % i) for i in range(3)]
+        for filename in filenames:
+            SimpleConfig().load(filename)
+        self.assertEqual(len(self.cachedFiles()), 3)
+        size = os.path.getsize(os.path.join(self.cacheDir, self.cachedFiles()[0]))
+        cache.evict(2*size)
+        self.assertEqual(len(self.cachedFiles()), 2)
+        cache.evict()
+        self.assertEqual(self.cachedFiles(), [])
+
+        pexConfigCodeCache.setCache(pexConfigCodeCache.CodeCache(self.cacheDir, maxSize=0))
+        SimpleConfig().load(filenames[0])
+        self.assertEqual(self.cachedFiles(), [])
+
+    def testReadOnly(self):
+        """Test that a file that is read but cannot be touched is still
+        used.
+        """
+        cache = pexConfigCodeCache.getCache()
+        code = compile("config.i = 4\n", "overrides.py", "exec")
+        cache.put("key", code)
+        with unittest.mock.patch("os.utime", side_effect=PermissionError("read-only")):
+            self.assertEqual(cache.get("key"), code)
+
+    def testNoCache(self):
+        pexConfigCodeCache.setCache(None)
+        filename = self.writeOverrides("overrides.py", "config.i = 3\n")
+        config = SimpleConfig()
+        config.load(filename)
+        self.assertEqual(config.i, 3)
+        self.assertEqual(self.cachedFiles(), [])
+
+    def testBadDirectory(self):
+        """Test that a cache directory that cannot be made from the
+        environment only gives a warning.
+        """
+        directory = os.path.join(self.writeOverrides("file", ""), "cache")
+        with unittest.mock.patch.dict(os.environ, {"PEX_CONFIG_CODE_CACHE": directory}):
+            with self.assertWarns(UserWarning):
+                self.assertIsNone(pexConfigCodeCache._makeDefaultCache())
+
+
+class TestMemory(lsst.utils.tests.MemoryTestCase):
+    pass
+
+
+def setup_module(module):
+    lsst.utils.tests.init()
+
+
+if __name__ == "__main__":
+    lsst.utils.tests.init()
+    unittest.main()
@@ -21,6 +21,7 @@
 # the GNU General Public License along with this program.  If not,
 # see <http://www.lsstcorp.org/LegalNotices/>.
 #
+import io
 import os
 import unittest
 import lsst.utils.tests
@@ -85,6 +86,30 @@ class ConfigChoiceFieldTest(unittest.TestCase):
         self.assertEqual(self.config.a["AAA"].f, roundtrip.a["AAA"].f)
         self.assertEqual(self.config.a["BBB"].f, roundtrip.a["BBB"].f)
 
+    def testSaveActiveOnly(self):
+        self.config.a["AAA"].f = 1
+        self.config.a["BBB"].f = 1.0
+        self.config.a = "BBB"
+        self.config.b = None
+        self.config.c["CCC"].f = 2
+        self.config.c.names = ["BBB", "CCC"]
+        stream = io.StringIO()
+        self.config.saveToStream(stream, activeOnly=True)
+        self.assertNotIn("config.a['AAA']", stream.getvalue())
+        self.assertNotIn("config.c['AAA']", stream.getvalue())
+
+        roundtrip = Config3()
+        roundtrip.loadFromStream(stream.getvalue())
+        self.assertTrue(roundtrip.compare(self.config))
+        self.assertEqual(roundtrip.a["BBB"].f, 1.0)
+        self.assertEqual(roundtrip.c["CCC"].f, 2)
+        # unselected subconfigs keep their defaults
+        self.assertEqual(roundtrip.a["AAA"].f, 4)
+
+        stream = io.StringIO()
+        self.config.saveToStream(stream, canonical=True)
+        self.assertIn("config.c.names=['BBB', 'CCC']\n", stream.getvalue())
+
     def testValidate(self):
         self.config.validate()
         self.config.a = "AAA"
@@ -102,6 +127,45 @@ class ConfigChoiceFieldTest(unittest.TestCase):
         self.config.freeze()
         self.assertRaises(pexConfig.FieldValidationError, setattr, self.config.a, "name", "AAA")
         self.assertRaises(pexConfig.FieldValidationError, setattr, self.config.a["AAA"], "f", "1")
+        # configs created after freezing are frozen too
+        self.assertRaises(pexConfig.FieldValidationError, setattr, self.config.a["BBB"], "f", 1.0)
+
+    def testLazyConfigs(self):
+        """Test that only the configs that have been used are made, unless
+        they are all requested.
+        """
+        self.config.toDict()
+        self.config.saveToStream(io.StringIO())
+        self.assertEqual(set(self.config.a._dict), {"AAA"})
+        self.assertEqual(set(self.config.a), {"AAA", "BBB", "CCC"})
+
+        other = Config3()
+        self.assertEqual(self.config.a, other.a)
+        other.a["BBB"].f = 2.0
+        self.assertNotEqual(self.config.a, other.a)
+        self.assertEqual(set(self.config.a._dict), {"AAA"})
+        self.config.a = other.a
+        self.assertEqual(self.config.a["BBB"].f, 2.0)
+        other.a["BBB"].f = 0.5
+        self.config.a["CCC"].f = 3
+        self.config.a = other.a
+        self.assertEqual(self.config.a["CCC"].f, 4)
+
+        self.assertEqual(len(list(self.config.a.values())), 3)
+        self.assertEqual(set(self.config.toDict()["a"]["values"]), {"AAA", "BBB", "CCC"})
+
+    def testEqualFrozen(self):
+        """Test that configs that differ only in their selections compare
+        the same way whether or not they are frozen.
+        """
+        for name, value in (("a", "BBB"), ("c", ["AAA", "BBB"])):
+            other = Config3()
+            setattr(other, name, value)
+            self.assertNotEqual(self.config, other)
+            self.config.freeze()
+            other.freeze()
+            self.assertNotEqual(self.config, other)
+            self.config = Config3()
 
     def testNoArbitraryAttributes(self):
         self.assertRaises(pexConfig.FieldValidationError, setattr, self.config.a, "should", "fail")
@@ -22,7 +22,9 @@
 # see <http://www.lsstcorp.org/LegalNotices/>.
 #
 
+import io
 import os
+import pickle
 import unittest
 import lsst.utils.tests
 import lsst.pex.config as pexConf
@@ -131,6 +133,48 @@ class ConfigurableFieldTest(unittest.TestCase):
         self.assertEqual(c.c2.f, r.c2.f)
         self.assertEqual(c.c2.target, r.c2.target)
 
+        # only the retarget and the changed field are needed to reproduce it
+        stream = io.StringIO()
+        c.saveToStream(stream, minimal=True)
+        self.assertIn("config.c2.retarget(", stream.getvalue())
+        self.assertIn("config.c2.f=10.0\n", stream.getvalue())
+        self.assertNotIn("c1", stream.getvalue())
+        r = Config2()
+        r.loadFromStream(stream.getvalue())
+        self.assertTrue(r.compare(c))
+
+    def testEqualFrozen(self):
+        """Test that configs compare the same way whether or not they are
+        frozen.
+        """
+        for retarget, expected in ((False, True), (True, False)):
+            c, d = Config2(), Config2()
+            if retarget:
+                d.c2.retarget(Target1)
+            for freeze in (False, True):
+                if freeze:
+                    c.freeze()
+                    d.freeze()
+                self.assertEqual(c == d, expected)
+                self.assertEqual(c.c1 == d.c1, True)
+
+    def testNames(self):
+        c = Config2()
+        c.c2.retarget(Target1)
+        self.assertEqual(c.names(), ["c1.f", "c2.f"])
+
+    def testPickle(self):
+        c = Config2()
+        c.c1.f = 7
+        c.c2.retarget(Target1)
+        c.c2.f = 10
+        r = pickle.loads(pickle.dumps(c))
+        self.assertEqual(r.c1.f, 7)
+        self.assertEqual(r.c2.f, 10)
+        self.assertEqual(r.c2.target, Target1)
+        self.assertEqual(r.c2.ConfigClass, Config1)
+        self.assertEqual(r.c1.target, Target1)
+
 
 class TestMemory(lsst.utils.tests.MemoryTestCase):
     pass
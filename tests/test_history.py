@@ -26,12 +26,19 @@ import unittest
 import lsst.utils.tests
 import lsst.pex.config as pexConfig
 import lsst.pex.config.history as pexConfigHistory
+from lsst.pex.config.callStack import getCallStack, LazyCallStack, StackFrame
 
 
 class PexTestConfig(pexConfig.Config):
     a = pexConfig.Field('Parameter A', float, default=1.0)
 
 
+class ContainerConfig(pexConfig.Config):
+    lst = pexConfig.ListField('A list', int, default=[1, 2])
+    dct = pexConfig.DictField('A dict', str, int, default={"a": 1})
+    sub = pexConfig.ConfigField('A subconfig', PexTestConfig)
+
+
 class HistoryTest(unittest.TestCase):
     def testHistory(self):
         b = PexTestConfig()
@@ -45,16 +52,7 @@ class HistoryTest(unittest.TestCase):
 
         # For reference, this is the output from running with unittest.main()
         """a
-1.0 unittest.main()
-    self.runTests()
-    self.result = testRunner.run(self.test)
-    test(result)
-    return self.run(*args, **kwds)
-    test(result)
-    return self.run(*args, **kwds)
-    testMethod()
-    b = PexTestConfig()
-    a = pexConfig.Field('Parameter A', float, default=1.0)
+1.0 a = pexConfig.Field('Parameter A', float, default=1.0)
 4.0 unittest.main()
     self.runTests()
     self.result = testRunner.run(self.test)
@@ -65,17 +63,187 @@ class HistoryTest(unittest.TestCase):
     testMethod()
     b.update(a=4.0)"""
 
-        self.assertTrue(output.startswith("a\n1.0"))
-        self.assertIn("""return self.run(*args, **kwds)
-    testMethod()
-    b = PexTestConfig()
-    a = pexConfig.Field('Parameter A', float, default=1.0)
-4.0""", output)
+        self.assertTrue(output.startswith("a\n1.0 a = pexConfig.Field('Parameter A', float, "
+                                          "default=1.0)\n4.0"))
 
         self.assertIn("""    return self.run(*args, **kwds)
     testMethod()
     b.update(a=4.0)""", output)
 
+    def testLazyCallStack(self):
+        def record():
+            return getCallStack()
+
+        stack = record()
+        self.assertIsInstance(stack, LazyCallStack)
+        # Frames are only recorded as (code, lineno) until accessed
+        self.assertFalse(any(isinstance(entry, StackFrame) for entry in stack._entries))
+        frame = stack[-1]
+        self.assertIsInstance(frame, StackFrame)
+        self.assertIs(stack[-1], frame)
+        self.assertEqual(frame.function, "testLazyCallStack")
+        self.assertEqual(frame.content, "stack = record()")
+
+        # Behaves like a list of StackFrame
+        source = PexTestConfig.a.source
+        extended = stack + [source]
+        self.assertEqual(len(extended), len(stack) + 1)
+        self.assertIs(extended[-1], source)
+        self.assertIs(([source] + stack)[0], source)
+        stack.insert(0, source)
+        self.assertIs(stack[0], source)
+        self.assertEqual([f.function for f in stack[-2:]],
+                         [f.function for f in list(stack)[-2:]])
+
+        b = PexTestConfig()
+        b.a = 5.0
+        value, at, label = b.history["a"][-1]
+        self.assertEqual(at[-1].content, "b.a = 5.0")
+
+    def testSharedStackFrames(self):
+        def make():
+            b = PexTestConfig()
+            b.a = 2.0
+            return b
+
+        b1 = make()
+        b2 = make()
+        frames1 = list(b1.history["a"][-1][1])
+        frames2 = list(b2.history["a"][-1][1])
+        self.assertEqual(len(frames1), len(frames2))
+        # The same lines of code are represented by the same objects
+        self.assertIs(frames1[-1], frames2[-1])
+        self.assertEqual(frames1[-1].function, "make")
+        self.assertIsNot(frames1[-2], frames2[-2])
+        self.assertFalse(hasattr(frames1[-1], "__dict__"))
+        self.assertIs(StackFrame.intern("foo.py", 1, "bar"), StackFrame.intern("foo.py", 1, "bar"))
+        self.assertIsNot(StackFrame.intern("foo.py", 1, "bar"), StackFrame.intern("foo.py", 2, "bar"))
+
+    def testSharedDefaults(self):
+        b1 = PexTestConfig()
+        b2 = PexTestConfig()
+        self.assertIs(b1.history["a"][0], b2.history["a"][0])
+        self.assertEqual(b1.history["a"][0][2], "default")
+        b1.a = 2.0
+        self.assertEqual([h[0] for h in b1.history["a"]], [1.0, 2.0])
+        self.assertEqual([h[0] for h in b2.history["a"]], [1.0])
+
+        c1 = ContainerConfig()
+        c2 = ContainerConfig()
+        c1.lst.append(3)
+        c1.sub.a = 5.0
+        self.assertEqual([h[0] for h in c1.lst.history], [[1, 2], [1, 2, 3]])
+        self.assertEqual([h[0] for h in c2.lst.history], [[1, 2]])
+        self.assertEqual([h[0] for h in c2.sub.history["a"]], [1.0])
+
+    def testPolicyModes(self):
+        with self.assertRaises(ValueError):
+            pexConfigHistory.HistoryPolicy("sometimes")
+        with self.assertRaises(ValueError):
+            pexConfigHistory.HistoryPolicy("shallow")
+
+        oldPolicy = pexConfigHistory.setPolicy("off")
+        try:
+            self.assertEqual(pexConfigHistory.getPolicy().mode, "off")
+            c = ContainerConfig()
+            c.lst.append(3)
+            c.dct["b"] = 2
+            c.sub.a = 2.0
+            for name in ("lst", "dct", "sub"):
+                self.assertEqual(list(c.history[name]), [])
+            self.assertEqual(list(c.sub.history["a"]), [])
+            self.assertEqual(c.lst, [1, 2, 3])
+            self.assertEqual(c.sub.a, 2.0)
+            self.assertEqual(c.formatHistory("lst"), "lst")
+
+            pexConfigHistory.setPolicy("value")
+            c = ContainerConfig()
+            c.lst.append(3)
+            c.sub.a = 2.0
+            self.assertEqual([h[0] for h in c.lst.history], [[1, 2], [1, 2, 3]])
+            self.assertEqual([h[0] for h in c.sub.history["a"]], [1.0, 2.0])
+            self.assertEqual(len(c.sub.history["a"][-1][1]), 0)
+            self.assertIn("2.0", c.sub.formatHistory("a"))
+
+            pexConfigHistory.setPolicy(pexConfigHistory.HistoryPolicy("shallow", depth=2))
+            b = PexTestConfig()
+            b.a = 3.0
+            stack = b.history["a"][-1][1]
+            self.assertEqual(len(stack), 2)
+            self.assertEqual(stack[-1].content, "b.a = 3.0")
+        finally:
+            pexConfigHistory.setPolicy(oldPolicy)
+
+    def testRetention(self):
+        oldPolicy = pexConfigHistory.setPolicy(pexConfigHistory.HistoryPolicy("value", maxEvents=2))
+        try:
+            b = PexTestConfig()
+            for value in (2.0, 3.0, 4.0):
+                b.a = value
+            self.assertEqual([h[0] for h in b.history["a"]], [3.0, 4.0])
+            self.assertEqual(b.history["a"][-1][0], 4.0)
+            self.assertEqual(b.history["a"].discarded, 2)
+
+            c = ContainerConfig()
+            for i in range(10):
+                c.lst.append(i)
+            self.assertEqual(len(c.lst.history), 2)
+            self.assertEqual(c.lst.history[-1][0], c.lst)
+
+            pexConfigHistory.setPolicy(pexConfigHistory.HistoryPolicy(maxEvents=1, keepFirst=True))
+            b = PexTestConfig()
+            for value in (2.0, 3.0, 4.0):
+                b.a = value
+            self.assertEqual([h[0] for h in b.history["a"]], [1.0, 4.0])
+            output = b.formatHistory("a", writeSourceLine=False)
+            self.assertIn("b.a = value", output)
+            self.assertTrue(output.startswith("a\n1.0"))
+
+            with self.assertRaises(ValueError):
+                pexConfigHistory.HistoryPolicy(maxEvents=0)
+        finally:
+            pexConfigHistory.setPolicy(oldPolicy)
+
+    def testContainerDeltas(self):
+        c = ContainerConfig()
+        expected = [list(c.lst)]
+        for i in range(100):
+            c.lst.append(i)
+            expected.append(list(c.lst))
+        c.lst[3:5] = [7, 8, 9]
+        expected.append(list(c.lst))
+        del c.lst[0]
+        expected.append(list(c.lst))
+        self.assertEqual([h[0] for h in c.history["lst"]], expected)
+        self.assertTrue(any(isinstance(h, pexConfigHistory.DeltaEvent) for h in c.lst.history))
+        self.assertEqual(c.lst.history[-1][0], c.lst)
+        value, stack, label = c.lst.history[-1]
+        self.assertEqual(label, "delitem")
+        self.assertIn("del c.lst[0]", stack[-1].content)
+
+        c.dct["a"] = 1
+        c.dct["b"] = 2
+        oldPolicy = pexConfigHistory.setPolicy("off")
+        try:
+            c.dct["c"] = 3
+        finally:
+            pexConfigHistory.setPolicy(oldPolicy)
+        del c.dct["a"]
+        self.assertEqual([h[0] for h in c.dct.history][-3:], [{"a": 1}, {"a": 1, "b": 2}, {"b": 2, "c": 3}])
+
+    def testPolicyPerClass(self):
+        class QuietConfig(pexConfig.Config):
+            historyPolicy = pexConfigHistory.HistoryPolicy("off")
+            a = pexConfig.Field('Parameter A', float, default=1.0)
+
+        quiet = QuietConfig()
+        quiet.a = 2.0
+        self.assertEqual(quiet.history["a"], [])
+
+        loud = PexTestConfig()
+        loud.a = 2.0
+        self.assertEqual([h[0] for h in loud.history["a"]], [1.0, 2.0])
+
 
 class TestMemory(lsst.utils.tests.MemoryTestCase):
     pass
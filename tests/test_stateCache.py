@@ -0,0 +1,204 @@
+#
+# LSST Data Management System
+# Copyright 2008, 2009, 2010 LSST Corporation.
+#
+# This product includes software developed by the
+# LSST Project (http://www.lsstcorp.org/).
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the LSST License Statement and
+# the GNU General Public License along with this program.  If not,
+# see <http://www.lsstcorp.org/LegalNotices/>.
+#
+
+import os
+import pickle
+import shutil
+import stat
+import tempfile
+import unittest
+import unittest.mock
+import lsst.utils.tests
+import lsst.pex.config as pexConfig
+import lsst.pex.config.stateCache as pexConfigStateCache
+
+REGISTRY = pexConfig.makeRegistry("A registry for testing the state cache")
+
+
+class InnerConfig(pexConfig.Config):
+    f = pexConfig.Field("A float", float, default=1.0)
+
+
+class Inner:
+    ConfigClass = InnerConfig
+
+    def __init__(self, config):
+        self.config = config
+
+
+REGISTRY.register("inner", Inner)
+
+
+class OuterConfig(pexConfig.Config):
+    i = pexConfig.Field("An integer", int, default=0)
+    ll = pexConfig.ListField("A list", int, default=[1])
+    sub = pexConfig.ConfigField("A subconfig", InnerConfig)
+    reg = REGISTRY.makeField("A registry field", default="inner")
+
+
+class StateCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cacheDir = os.path.join(self.directory, "cache")
+        self.oldCache = pexConfigStateCache.setCache(self.cacheDir)
+
+    def tearDown(self):
+        pexConfigStateCache.setCache(self.oldCache)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def writeOverrides(self, name, text):
+        filename = os.path.join(self.directory, name)
+        with open(filename, "w") as f:
+            f.write(text)
+        return filename
+
+    def countEntries(self):
+        return len([f for f in os.listdir(self.cacheDir) if f.endswith(".pickle")])
+
+    def testLoadOverrides(self):
+        filename = self.writeOverrides("overrides.py",
+                                       "import colorsys\n"
+                                       "config.i = 1\n"
+                                       "config.ll.append(2)\n"
+                                       "config.reg['inner'].f = 3.0\n")
+        first = OuterConfig()
+        first.loadOverrides([filename], [("sub.f", 4.0)])
+        self.assertEqual(self.countEntries(), 1)
+        self.assertEqual(first.history["i"][-1][2], "assignment")
+
+        second = OuterConfig()
+        second.loadOverrides([filename], [("sub.f", 4.0)])
+        self.assertEqual(self.countEntries(), 1)
+        self.assertEqual(second.history["i"][-1][2], "loadOverrides")
+        self.assertTrue(second.compare(first))
+        self.assertEqual(second.ll, [1, 2])
+        self.assertEqual(second.sub.f, 4.0)
+        self.assertEqual(second.reg["inner"].f, 3.0)
+        self.assertEqual(second._imports, first._imports)
+
+        # Different overrides, or a different starting point, are not hits.
+        third = OuterConfig()
+        third.loadOverrides([filename], [("sub.f", 5.0)])
+        self.assertEqual(third.sub.f, 5.0)
+        self.assertEqual(self.countEntries(), 2)
+        fourth = OuterConfig()
+        fourth.ll = [7]
+        fourth.load(filename)
+        self.assertEqual(fourth.ll, [7, 2])
+        self.assertEqual(self.countEntries(), 3)
+
+        # An edited file is not a hit.
+        self.writeOverrides("overrides.py", "config.i = 2\n")
+        fifth = OuterConfig()
+        fifth.loadOverrides([filename], [("sub.f", 4.0)])
+        self.assertEqual(fifth.i, 2)
+        self.assertEqual(fifth.ll, [1])
+        self.assertEqual(self.countEntries(), 4)
+
+    def testNestedLoad(self):
+        """Test that a change to a file loaded by an override file is not a
+        hit.
+        """
+        inner = self.writeOverrides("inner.py", "config.i = 5\n")
+        outer = self.writeOverrides("outer.py", "config.load(%r)\nconfig.sub.f = 2.0\n" % inner)
+        first = OuterConfig()
+        first.load(outer)
+        self.assertEqual(first.i, 5)
+
+        second = OuterConfig()
+        second.load(outer)
+        self.assertEqual(second.history["i"][-1][2], "loadOverrides")
+        self.assertEqual(second.i, 5)
+
+        self.writeOverrides("inner.py", "config.i = 7\n")
+        third = OuterConfig()
+        third.load(outer)
+        self.assertEqual(third.i, 7)
+        self.assertEqual(third.sub.f, 2.0)
+
+        os.remove(inner)
+        with self.assertRaises(FileNotFoundError):
+            OuterConfig().load(outer)
+
+    def testDefinitions(self):
+        """Test that a change to a registry changes the key of the cache.
+        """
+        filename = self.writeOverrides("overrides.py", "config.i = 1\n")
+        OuterConfig().load(filename)
+        OuterConfig().load(filename)
+        self.assertEqual(self.countEntries(), 1)
+
+        class OtherConfig(pexConfig.Config):
+            g = pexConfig.Field("Another float", float, default=2.0)
+
+        REGISTRY.register("other", Inner, ConfigClass=OtherConfig)
+        try:
+            OuterConfig().load(filename)
+            self.assertEqual(self.countEntries(), 2)
+        finally:
+            del REGISTRY._dict["other"]
+
+    def testNoCache(self):
+        pexConfigStateCache.setCache(None)
+        filename = self.writeOverrides("overrides.py", "config.i = 3\n")
+        config = OuterConfig()
+        config.loadOverrides([filename], [("i", 4)])
+        self.assertEqual(config.i, 4)
+        self.assertEqual(self.countEntries(), 0)
+
+    def testUnsafe(self):
+        """Test that directories other users can write to are not used, and
+        that entries that were not written by the cache are not loaded.
+        """
+        directory = os.path.join(self.directory, "shared")
+        os.makedirs(directory)
+        os.chmod(directory, 0o777)
+        self.assertRaises(PermissionError, pexConfigStateCache.StateCache, directory)
+
+        cache = pexConfigStateCache.getCache()
+        self.assertEqual(stat.S_IMODE(os.stat(self.cacheDir).st_mode) & 0o077, 0)
+        cache.put("key", [1])
+        self.assertEqual(cache.get("key"), [1])
+        with open(os.path.join(self.cacheDir, "key.pickle"), "wb") as f:
+            pickle.dump([2], f)
+        self.assertIsNone(cache.get("key"))
+        cache.put("key", [3])
+        self.assertEqual(pexConfigStateCache.StateCache(self.cacheDir).get("key"), [3])
+
+    def testBadDirectory(self):
+        directory = os.path.join(self.writeOverrides("file", ""), "cache")
+        with unittest.mock.patch.dict(os.environ, {"PEX_CONFIG_STATE_CACHE": directory}):
+            with self.assertWarns(UserWarning):
+                self.assertIsNone(pexConfigStateCache._makeDefaultCache())
+
+
+class TestMemory(lsst.utils.tests.MemoryTestCase):
+    pass
+
+
+def setup_module(module):
+    lsst.utils.tests.init()
+
+
+if __name__ == "__main__":
+    lsst.utils.tests.init()
+    unittest.main()